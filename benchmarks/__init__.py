@@ -0,0 +1 @@
+"""Performance benchmarks for the Discord Team Lane Management Bot."""
@@ -0,0 +1,53 @@
+"""
+Fill empty rosters of growing size with load-balanced placement.
+
+Compares one assign_random call per member against a single auto_fill of the
+whole waiting list, in memory and on a snapshot-mode JSON roster where every
+individual assign rewrites the file.
+
+Usage: python -m benchmarks.bench_auto_fill [rounds]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from core.models import GridConfig
+from core.repository import InMemoryAssignmentRepository, PersistentAssignmentRepository
+from core.services import AssignmentService
+
+GRIDS = (GridConfig(3, 8), GridConfig(30, 20), GridConfig(100, 50))
+# One snapshot rewrite per member grows quadratically; skip it past this many lanes
+MAX_INDIVIDUAL_WRITES = 1000
+
+
+def main(rounds: int = 5):
+    with tempfile.TemporaryDirectory() as tmp:
+        for grid in GRIDS:
+            members = [f"member{n}" for n in range(grid.size)]
+            print(f"{grid.teams}x{grid.lanes} ({grid.size} lanes)")
+            for backend in ("memory", "json"):
+                timings = {"assign_random": 0.0, "auto_fill": 0.0}
+                if backend == "json" and grid.size > MAX_INDIVIDUAL_WRITES:
+                    del timings["assign_random"]
+                for n in range(rounds):
+                    for method in timings:
+                        if backend == "memory":
+                            repo = InMemoryAssignmentRepository(grid)
+                        else:
+                            repo = PersistentAssignmentRepository(str(Path(tmp) / f"{method}{n}.json"), grid=grid)
+                        service = AssignmentService(repo)
+                        start = time.perf_counter()
+                        if method == "auto_fill":
+                            service.auto_fill(members)
+                        else:
+                            for member in members:
+                                service.assign_random(member)
+                        timings[method] += time.perf_counter() - start
+                        repo.close()
+                for name, total in timings.items():
+                    print(f"{backend:>8} {name:>14}: {total / rounds * 1000:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
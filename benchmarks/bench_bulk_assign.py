@@ -0,0 +1,42 @@
+"""
+Compare filling a roster with one bulk command against N individual assigns.
+
+Both run against a PersistentAssignmentRepository in snapshot mode, where
+every individual assign rewrites the file.
+
+Usage: python -m benchmarks.bench_bulk_assign [rounds]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from core.models import LANES_PER_TEAM, TEAMS
+from core.repository import PersistentAssignmentRepository
+from core.services import AssignmentService
+from interfaces.command_parser import CommandParser
+
+
+def main(rounds: int = 20):
+    entries = [(f"member{t}_{l}", t, l) for t in range(1, TEAMS + 1) for l in range(1, LANES_PER_TEAM + 1)]
+    bulk_command = "bulk " + " ".join(f"{m}:{t}:{l}" for m, t, l in entries)
+    timings = {"individual": 0.0, "bulk": 0.0}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in range(rounds):
+            parser = CommandParser(AssignmentService(PersistentAssignmentRepository(str(Path(tmp) / f"i{n}.json"))))
+            start = time.perf_counter()
+            for member, team, lane in entries:
+                parser.parse_and_execute(f"assign --member {member} --team {team} --lane {lane}", "admin", True)
+            timings["individual"] += time.perf_counter() - start
+
+            parser = CommandParser(AssignmentService(PersistentAssignmentRepository(str(Path(tmp) / f"b{n}.json"))))
+            start = time.perf_counter()
+            parser.parse_and_execute(bulk_command, "admin", True)
+            timings["bulk"] += time.perf_counter() - start
+
+    for name, total in timings.items():
+        print(f"{name:>10}: {total / rounds * 1000:8.3f} ms to fill {len(entries)} lanes")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,63 @@
+"""
+Measure cold start: importing the domain layers, importing bot.py, and
+running bot.main() up to the point where it would connect to Discord.
+
+Each run is a fresh interpreter. ``Bot.run`` is replaced so the bot stops
+right before connecting; no token or network is needed.
+
+Usage: python -m benchmarks.bench_cold_start [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAYERS_PROBE = """
+import time
+start = time.perf_counter()
+import core.services, interfaces.command_parser, infrastructure.discord_adapter
+print(time.perf_counter() - start)
+"""
+
+BOT_PROBE = """
+import time
+start = time.perf_counter()
+import bot
+imported = time.perf_counter()
+from discord.ext import commands
+
+def connect(self, *args, **kwargs):
+    print(imported - start, time.perf_counter() - start)
+    raise SystemExit(0)
+
+commands.Bot.run = connect
+bot.main()
+"""
+
+
+def probe(code: str, workdir: str):
+    env = dict(os.environ, PYTHONPATH=ROOT, DISCORD_TOKEN="cold-start", DISCORD_GUILD_ID="1")
+    env.pop("METRICS_PORT", None)
+    out = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env, capture_output=True, text=True,
+                         check=True).stdout
+    return [float(value) for value in out.split()]
+
+
+def main(runs: int = 5):
+    phases = {"import core+interfaces+infrastructure": [], "import bot": [], "bot.main() until connect": []}
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            phases["import core+interfaces+infrastructure"].extend(probe(LAYERS_PROBE, workdir))
+            imported, ready = probe(BOT_PROBE, workdir)
+            phases["import bot"].append(imported)
+            phases["bot.main() until connect"].append(ready)
+    for name, samples in phases.items():
+        print(f"{name:>38}: median {statistics.median(samples) * 1000:7.1f} ms, "
+              f"best {min(samples) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
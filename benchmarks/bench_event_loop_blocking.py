@@ -0,0 +1,63 @@
+"""
+Compare event-loop blocking between save-per-mutation and deferred persistence.
+
+Simulates a signup burst of slash-command handlers running on one asyncio loop
+and reports how long the loop was blocked inside repository calls, plus the
+worst heartbeat lag seen by a concurrent task.
+
+Usage: python -m benchmarks.bench_event_loop_blocking [mutations]
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from core.repository import PersistentAssignmentRepository
+from core.services import AssignmentService
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list, period: float = 0.001):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(period)
+        lags.append(time.perf_counter() - start - period)
+
+
+async def _burst(service: AssignmentService, mutations: int) -> float:
+    blocked = 0.0
+    for i in range(mutations):
+        start = time.perf_counter()
+        if i % 3 == 2:
+            service.remove_user(f"user{i - 1}")
+        else:
+            service.assign_random(f"user{i}")
+        blocked += time.perf_counter() - start
+        # Yield like a real handler awaiting its response
+        await asyncio.sleep(0)
+    return blocked
+
+
+async def _measure(mode: str, path: str, mutations: int) -> dict:
+    repo = PersistentAssignmentRepository(path, mode=mode, flush_interval=0.05)
+    service = AssignmentService(repo)
+    stop = asyncio.Event()
+    lags = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+    blocked = await _burst(service, mutations)
+    stop.set()
+    await heartbeat
+    repo.close()
+    return {"mode": mode, "blocked_ms": blocked * 1000, "max_lag_ms": max(lags, default=0.0) * 1000}
+
+
+def main(mutations: int = 3000):
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("snapshot", "deferred"):
+            result = asyncio.run(_measure(mode, str(Path(tmp) / f"{mode}.json"), mutations))
+            print(f"{result['mode']:>9}: blocked {result['blocked_ms']:8.2f} ms over {mutations} mutations, "
+                  f"max heartbeat lag {result['max_lag_ms']:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
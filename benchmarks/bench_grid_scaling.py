@@ -0,0 +1,48 @@
+"""
+Measure assign, suggest and list against rosters of growing size.
+
+Each roster is filled to all but its last lane, so suggestions have to look
+past every occupied lane.
+
+Usage: python -m benchmarks.bench_grid_scaling [rounds]
+"""
+import sys
+import time
+
+from core.models import GridConfig
+from core.repository import InMemoryAssignmentRepository
+from core.services import AssignmentService
+from interfaces.command_parser import CommandParser
+
+GRIDS = (GridConfig(3, 8), GridConfig(30, 20), GridConfig(100, 50))
+
+
+def main(rounds: int = 20):
+    for grid in GRIDS:
+        timings = {"fill": 0.0, "suggest": 0.0, "list": 0.0}
+        for _ in range(rounds):
+            repo = InMemoryAssignmentRepository(grid)
+            service = AssignmentService(repo)
+            parser = CommandParser(service)
+            start = time.perf_counter()
+            for team in range(1, grid.teams + 1):
+                for lane in range(1, grid.lanes + 1):
+                    if (team, lane) != (grid.teams, grid.lanes):
+                        repo.assign(f"member{team}_{lane}", team, lane)
+            timings["fill"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            service.assign_user("latecomer", 1, 1)
+            timings["suggest"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            parser.parse_and_execute("list", "admin")
+            timings["list"] += time.perf_counter() - start
+
+        print(f"{grid.teams}x{grid.lanes} ({grid.size} lanes)")
+        for name, total in timings.items():
+            print(f"{name:>10}: {total / rounds * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,65 @@
+"""
+Measure rebuilding roster state from recorded events.
+
+A roster on a 100x50 grid takes a mix of assigns, moves, removes and
+waitlist changes. One history holds every event in memory, so rebuilding
+the latest state replays all of them; another keeps the default capacity
+of 1000 and rebuilds older states from its spill file, which adds reading
+and parsing the file.
+
+Usage: python -m benchmarks.bench_history_replay [events]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from core.history import History
+from core.models import GridConfig
+from core.repository import InMemoryAssignmentRepository
+
+
+def record_events(repo: InMemoryAssignmentRepository, count: int, seed: int = 7):
+    rng = random.Random(seed)
+    grid = repo.grid
+    users = [f"member{n}" for n in range(grid.size)]
+    while repo.history.last_seq < count:
+        user = rng.choice(users)
+        roll = rng.random()
+        if roll < 0.6:
+            repo.assign(user, rng.randint(1, grid.teams), rng.randint(1, grid.lanes))
+        elif roll < 0.85:
+            repo.remove(user)
+        elif roll < 0.95:
+            repo.join_waitlist(user)
+        else:
+            repo.leave_waitlist(user)
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(count: int = 100_000):
+    grid = GridConfig(100, 50)
+    # Everything in memory and no checkpoint past the start: state_at() replays every event
+    repo = InMemoryAssignmentRepository(grid, History(count + 1))
+    print(f"{'record':>18}: {_time(lambda: record_events(repo, count)):8.3f} s for {count} events")
+    replayed = _time(lambda: repo.history.state_at(repo.history.last_seq))
+    print(f"{'replay in memory':>18}: {replayed:8.3f} s ({replayed / count * 1e9:.0f} ns/event)")
+    print(f"{'undo 100':>18}: {_time(lambda: repo.undo(100)):8.3f} s")
+
+    # The default capacity: older states are rebuilt from the spill file
+    with tempfile.TemporaryDirectory() as workdir:
+        history = History(spill_path=os.path.join(workdir, "roster.history"))
+        record_events(InMemoryAssignmentRepository(grid, history), count)
+        print(f"{'replay from spill':>18}: {_time(lambda: history.state_at(history.base_seq - 1)):8.3f} s")
+        print(f"{'replay from memory':>18}: {_time(lambda: history.state_at(history.last_seq)):8.3f} s")
+        history.close()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
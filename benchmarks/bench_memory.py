@@ -0,0 +1,59 @@
+"""
+Measure the memory a roster takes, with tracemalloc.
+
+Many InMemoryAssignmentRepository rosters are built and kept, the way a bot
+serving many guilds and channels holds one per roster. Every figure is a
+whole repository: grid, reverse index, member table, waitlist, history and
+lock. Rosters draw their members from a shared pool of names, but names are
+fresh strings for every roster, as they are when each roster is loaded from
+its own JSON file.
+
+"empty" is a roster with no lane taken, "full" one with every lane taken,
+and "per lane" what each held lane adds.
+
+Usage: python -m benchmarks.bench_memory [rosters] [members]
+"""
+import sys
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from core.models import GridConfig
+from core.repository import InMemoryAssignmentRepository
+
+
+def lanes(grid: GridConfig, roster: int, members: int) -> List[Tuple[str, int, int]]:
+    # "".join builds a new string object each time, like json.load does per file
+    return [("".join(("member", str((roster * 7 + n) % members))), n // grid.lanes + 1, n % grid.lanes + 1)
+            for n in range(grid.size)]
+
+
+def repository(grid: GridConfig, entries: List[Tuple[str, int, int]]) -> InMemoryAssignmentRepository:
+    repo = InMemoryAssignmentRepository(grid)
+    with repo.batch():
+        for user, team, lane in entries:
+            repo.assign(user, team, lane)
+    return repo
+
+
+def footprint(build: Callable[[int], object], rosters: int) -> float:
+    """Bytes still allocated per roster once ``rosters`` of them are built and kept."""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    kept = [build(roster) for roster in range(rosters)]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del kept
+    return used / rosters
+
+
+def main(rosters: int = 200, members: int = 2000):
+    for grid in (GridConfig(3, 8), GridConfig(30, 20)):
+        empty = footprint(lambda n: repository(grid, []), rosters)
+        full = footprint(lambda n: repository(grid, lanes(grid, n, members)), rosters)
+        print(f"{grid.teams}x{grid.lanes} {'empty':>8}: {empty / 1024:8.1f} KiB/roster")
+        print(f"{grid.teams}x{grid.lanes} {'full':>8}: {full / 1024:8.1f} KiB/roster")
+        print(f"{grid.teams}x{grid.lanes} {'per lane':>8}: {(full - empty) / grid.size:8.0f} B")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,44 @@
+"""
+Measure repeated /list rendering with and without the render cache.
+
+Usage: python -m benchmarks.bench_render_cache [iterations]
+"""
+import sys
+import time
+
+from core.repository import InMemoryAssignmentRepository
+from core.services import AssignmentService
+from interfaces.command_parser import CommandParser
+from interfaces.presentation import format_assignments, to_discord_embed
+from interfaces.render_cache import RenderCache
+
+
+def _time(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int = 20000):
+    repo = InMemoryAssignmentRepository()
+    service = AssignmentService(repo)
+    for i in range(20):
+        service.assign_random(f"member{i}")
+    cache = RenderCache()
+    parser = CommandParser(service, cache)
+
+    cases = {
+        "text uncached": lambda: format_assignments(list(repo.assignments.values())),
+        "text cached": lambda: cache.render(repo, "text"),
+        "embed uncached": lambda: to_discord_embed(list(repo.assignments.values())),
+        "embed cached": lambda: cache.render(repo, "embed"),
+        "parser list": lambda: parser.parse_and_execute("list", "member0"),
+    }
+    for name, fn in cases.items():
+        print(f"{name:>15}: {_time(fn, iterations):8.2f} us/call")
+    print(f"cache stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,236 @@
+"""
+Offline load test of the bot: replay a stream of commands through the real
+handlers of bot.py, DiscordAdapter and CommandParser, without a network.
+
+Commands are JSON objects, one per line when read from a script:
+
+    {"command": "assign", "user": "ann", "guild": 1, "channel": 10, "params": {"team": 1, "lane": 2}}
+    {"kind": "text", "command": "remove", "user": "ann", "guild": 1, "args": "--member ann"}
+
+``kind`` is "slash" (the default; ``params`` are the slash options) or
+"text" (``args`` is the text after the command). ``attachment`` holds the
+text of an uploaded file for bulk and fill. Without a script a synthetic
+signup storm is generated. ``concurrency`` commands are in flight at once on
+one asyncio loop; the report gives throughput, latency percentiles from
+invocation to reply, and the lag of a heartbeat task on the same loop.
+
+Usage: python -m benchmarks.load_generator [--commands 5000] [--concurrency 100] [--guilds 4]
+                                           [--grid 3x8] [--seed 0] [--script FILE] [--save FILE]
+                                           [--mode snapshot]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import discord
+
+from tests.fake_discord import FakeAttachment, FakeChannel, FakeContext, FakeInteraction
+from bot import build_bot
+from core.models import DEFAULT_GRID, GridConfig
+from infrastructure.discord_adapter import DiscordAdapter, reply_outcome
+from infrastructure.outbox import Outbox
+
+
+class CountingOutbox(Outbox):
+    """An outbox noting every text reply as it is queued, since merged messages hide where each one ends."""
+
+    def __init__(self, outbox: Outbox):
+        super().__init__(outbox.window, outbox.deadline, clock=outbox.clock, sleep=outbox.sleep,
+                         limiter=outbox.limiter)
+        self.replies: List[Optional[str]] = []
+
+    async def send(self, channel, content: Optional[str] = None, **kwargs):
+        self.replies.append(content)
+        return await super().send(channel, content, **kwargs)
+
+
+class OfflineBot:
+    """The bot built by bot.py, invoked through fake interactions and contexts."""
+
+    def __init__(self, adapter: DiscordAdapter, guild_id: int = 1):
+        self.adapter = adapter
+        adapter.outbox = CountingOutbox(adapter.outbox)
+        self.bot = build_bot(adapter, guild_id)
+        self.slash = {command.name: command for command in self.bot.tree.get_commands(guild=discord.Object(guild_id))}
+        self.channels: Dict[int, FakeChannel] = {}
+
+    async def dispatch(self, command: Dict[str, Any]):
+        """Run one command through its handler; return the interaction or context holding the replies."""
+        channel_id = command.get("channel", 1)
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            channel = self.channels[channel_id] = FakeChannel(channel_id)
+        user, guild = command.get("user", "member"), command.get("guild", 1)
+        attachment = FakeAttachment(command["attachment"]) if "attachment" in command else None
+        if command.get("kind", "slash") == "text":
+            ctx = FakeContext(user, guild, channel, [attachment] if attachment else None)
+            args = {"args": command["args"]} if "args" in command else {}
+            await self.bot.get_command(command["command"]).callback(ctx, **args)
+            return ctx
+        interaction = FakeInteraction(user, guild, channel)
+        params = dict(command.get("params", {}), **({"file": attachment} if attachment else {}))
+        await self.slash[command["command"]].callback(interaction, **params)
+        return interaction
+
+    async def close(self):
+        await self.adapter.drain()
+        self.adapter.close()
+
+
+def signup_storm(count: int, guilds: int = 4, grid: GridConfig = DEFAULT_GRID, members: Optional[int] = None,
+                 seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    A signup rush on ``guilds`` rosters: mostly lane claims, with some
+    waitlist joins, removals, board reads and legacy text commands. By
+    default a quarter more members than lanes compete for each roster.
+    """
+    rng = random.Random(seed)
+    members = members or grid.size + grid.size // 4
+    teams, lanes = grid.teams, grid.lanes
+    for _ in range(count):
+        guild = rng.randrange(guilds) + 1
+        command = {"guild": guild, "channel": guild * 10, "user": f"member{rng.randrange(members)}"}
+        roll = rng.random()
+        if roll < 0.45:
+            command.update(command="assign", params={"random": True})
+        elif roll < 0.7:
+            command.update(command="assign", params={"team": rng.randint(1, teams), "lane": rng.randint(1, lanes)})
+        elif roll < 0.8:
+            command.update(command="waitlist", params={"action": "join"})
+        elif roll < 0.88:
+            command.update(command="remove", params={"member": command["user"]})
+        elif roll < 0.95:
+            command.update(command="list")
+        else:
+            command.update(kind="text", command="assign",
+                           args=f"--team {rng.randint(1, teams)} --lane {rng.randint(1, lanes)}")
+        yield command
+
+
+def read_script(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``samples``, 0 when there are none."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list, period: float = 0.001):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(period)
+        lags.append(time.perf_counter() - start - period)
+
+
+async def run_load(bot: OfflineBot, commands: Iterable[Dict[str, Any]], concurrency: int = 100) -> Dict[str, Any]:
+    """Replay ``commands`` with up to ``concurrency`` in flight and measure them."""
+    pending = iter(commands)
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+    errors: List[str] = []
+    interactions: List[FakeInteraction] = []
+
+    async def worker():
+        for command in pending:
+            start = time.perf_counter()
+            try:
+                invocation = await bot.dispatch(command)
+            except Exception as e:
+                outcomes["error"] += 1
+                errors.append(f"{command.get('command')}: {type(e).__name__}: {e}")
+                continue
+            latencies.append(time.perf_counter() - start)
+            # Text command replies are counted from the outbox
+            if isinstance(invocation, FakeInteraction):
+                interactions.append(invocation)
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await heartbeat
+    messages = 0
+    for interaction in interactions:
+        messages += len(interaction.sent)
+        for reply in interaction.sent:
+            outcomes[reply_outcome(reply["content"] or "")] += 1
+    for reply in bot.adapter.outbox.replies:
+        outcomes[reply_outcome(reply or "")] += 1
+    messages += sum(len(channel.sent) for channel in bot.channels.values())
+    handled = len(latencies) + outcomes["error"]
+    return {
+        "commands": handled,
+        "seconds": elapsed,
+        "throughput": handled / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "lag_p99_ms": percentile(lags, 0.99) * 1000,
+        "lag_max_ms": max(lags, default=0.0) * 1000,
+        "messages": messages,
+        "outcomes": dict(outcomes),
+        "errors": errors,
+    }
+
+
+async def _replay(commands: List[Dict[str, Any]], concurrency: int, mode: str, grid: GridConfig) -> Dict[str, Any]:
+    bot = OfflineBot(DiscordAdapter(persistence_mode=mode, flush_interval=0.05, grid=grid))
+    try:
+        return await run_load(bot, commands, concurrency)
+    finally:
+        await bot.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--commands", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--guilds", type=int, default=4)
+    parser.add_argument("--grid", type=GridConfig.parse, default=DEFAULT_GRID, help="Roster size, e.g. 30x20")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--script", help="JSONL file of commands to replay instead of a synthetic storm")
+    parser.add_argument("--save", help="Write the commands replayed to this JSONL file")
+    parser.add_argument("--mode", default="snapshot", choices=("snapshot", "deferred", "journal"))
+    args = parser.parse_args(argv)
+
+    commands = read_script(args.script) if args.script else list(signup_storm(args.commands, args.guilds, args.grid,
+                                                                             seed=args.seed))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(command) + "\n" for command in commands)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # Rosters, backups and the legacy store are all relative to the working directory
+        os.chdir(workdir)
+        try:
+            report = asyncio.run(_replay(commands, args.concurrency, args.mode, args.grid))
+        finally:
+            os.chdir(cwd)
+
+    print(f"{report['commands']} commands, concurrency {args.concurrency}, {args.mode} persistence: "
+          f"{report['throughput']:.0f} commands/s over {report['seconds']:.2f} s")
+    print(f"latency p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, max {report['max_ms']:.2f} ms")
+    print(f"event-loop lag p99 {report['lag_p99_ms']:.2f} ms, max {report['lag_max_ms']:.2f} ms")
+    print(f"{report['messages']} messages sent; replies: " + ", ".join(f"{outcome} {count}" for outcome, count in sorted(report["outcomes"].items())))
+    for error in report["errors"][:5]:
+        print(f"ERROR {error}")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
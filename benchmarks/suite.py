@@ -0,0 +1,244 @@
+"""
+Benchmark suite over the hot paths, at several roster sizes.
+
+Every case builds its fixture once and returns a callable doing one
+operation; the runner times it with timeit and keeps the best of a few
+repeats, in microseconds per operation. Results are written as JSON and
+compared against a committed baseline, failing when any case slowed down
+by more than the threshold. A case over the threshold is timed again with
+more repeats before it counts as a regression, so one noisy round does not
+fail the run. The baseline's ``tolerances`` map case names to thresholds of
+their own, for cases such as file I/O that vary more than the rest.
+
+``--update-baseline`` merges the cases run into the baseline, so a commit
+changing one measured path can refresh just those cases with ``--filter``.
+
+Usage: python -m benchmarks.suite [--output PATH] [--baseline PATH] [--threshold 0.25]
+                                  [--update-baseline] [--filter TEXT]
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+
+from core.history import History
+from core.models import GridConfig
+from core.repository import InMemoryAssignmentRepository, PersistentAssignmentRepository
+from core.services import AssignmentService
+from interfaces.autocomplete import Autocomplete
+from interfaces.command_parser import CommandParser
+from interfaces.presentation import format_assignments, to_discord_embed
+
+SIZES = (GridConfig(3, 8), GridConfig(30, 20), GridConfig(100, 50))
+BASELINE = Path(__file__).with_name("baseline.json")
+REPEATS = 3
+# Repeats for timing a case again when it looks like a regression
+RECHECK_REPEATS = 15
+
+# name -> factory(grid, workdir) -> one operation
+CASES: Dict[str, Callable[[GridConfig, Path], Callable[[], object]]] = {}
+
+
+def case(name: str):
+    def register(factory):
+        CASES[name] = factory
+        return factory
+    return register
+
+
+def filled(grid: GridConfig, fraction: float = 1.0, repo=None):
+    """A roster with ``fraction`` of its lanes taken, team by team; the last lane is always left free."""
+    repo = repo if repo is not None else InMemoryAssignmentRepository(grid)
+    count = min(int(grid.size * fraction), grid.size - 1)
+    with repo.batch():
+        for n in range(count):
+            repo.assign(f"member{n}", n // grid.lanes + 1, n % grid.lanes + 1)
+    return repo
+
+
+@case("repo.assign+remove")
+def _assign_remove(grid, workdir):
+    repo = filled(grid, 0.5)
+    slot = repo.find_first_empty()
+    return lambda: (repo.assign("bench", *slot), repo.remove("bench"))
+
+
+@case("repo.find_assignment")
+def _find_assignment(grid, workdir):
+    repo = filled(grid, 0.5)
+    user = f"member{grid.size // 4}"
+    return lambda: repo.find_assignment(user)
+
+
+@case("repo.find_first_empty")
+def _find_first_empty(grid, workdir):
+    repo = filled(grid)
+    return repo.find_first_empty
+
+
+@case("service.assign_user_taken")
+def _assign_user_taken(grid, workdir):
+    service = AssignmentService(filled(grid, 0.9))
+    return lambda: service.assign_user("bench", 1, 1)
+
+
+@case("service.assign_random+remove")
+def _assign_random(grid, workdir):
+    service = AssignmentService(filled(grid, 0.5))
+    return lambda: (service.assign_random("bench"), service.remove_user("bench"))
+
+
+@case("service.bulk_assign")
+def _bulk_assign(grid, workdir):
+    entries = [(f"member{n}", n // grid.lanes + 1, n % grid.lanes + 1) for n in range(grid.size)]
+    return lambda: AssignmentService(InMemoryAssignmentRepository(grid)).bulk_assign(entries)
+
+
+@case("parser.assign_taken")
+def _parser_assign(grid, workdir):
+    parser = CommandParser(AssignmentService(filled(grid, 0.9)))
+    return lambda: parser.parse_and_execute('assign --member "Jo Ann" --team 1 --lane 1', "admin", True)
+
+
+@case("parser.list")
+def _parser_list(grid, workdir):
+    parser = CommandParser(AssignmentService(filled(grid, 0.5)))
+    return lambda: parser.parse_and_execute("list", "admin")
+
+
+@case("render.format_assignments")
+def _format_assignments(grid, workdir):
+    assignments = list(filled(grid).assignments.values())
+    return lambda: format_assignments(assignments, grid)
+
+
+@case("render.to_discord_embed")
+def _to_discord_embed(grid, workdir):
+    assignments = list(filled(grid).assignments.values())
+    return lambda: to_discord_embed(assignments, grid)
+
+
+@case("autocomplete.known_members")
+def _known_members(grid, workdir):
+    repo = InMemoryAssignmentRepository(grid)
+    with repo.batch():
+        for n in range(50_000):
+            repo.join_waitlist(f"member{n}")
+    autocomplete = Autocomplete()
+    return lambda: autocomplete.known_members(repo, "member12")
+
+
+@case("autocomplete.assigned_members")
+def _assigned_members(grid, workdir):
+    repo = filled(grid, 0.5)
+    autocomplete = Autocomplete()
+    return lambda: autocomplete.assigned_members(repo, "member1")
+
+
+@case("autocomplete.free_lanes")
+def _free_lanes(grid, workdir):
+    repo = filled(grid, 0.5)
+    autocomplete = Autocomplete()
+    return lambda: autocomplete.free_lanes(repo, grid.teams)
+
+
+@case("history.state_at")
+def _state_at(grid, workdir):
+    history = History(capacity=100_000)
+    repo = InMemoryAssignmentRepository(grid, history=history)
+    with repo.batch():
+        for n in range(50_000):
+            repo.assign(f"member{n % 997}", n % grid.teams + 1, n % grid.lanes + 1)
+            repo.remove(f"member{n % 997}")
+    # A checkpoint is taken at the 100,000th event; the state just before it replays all the others
+    return lambda: history.state_at(history.last_seq - 1)
+
+
+@case("persist.save")
+def _save(grid, workdir):
+    repo = filled(grid, repo=PersistentAssignmentRepository(str(workdir / f"save-{grid.size}.json"), grid=grid))
+    return repo.save
+
+
+@case("persist.load")
+def _load(grid, workdir):
+    path = str(workdir / f"load-{grid.size}.json")
+    filled(grid, repo=PersistentAssignmentRepository(path, grid=grid))
+    return lambda: PersistentAssignmentRepository(path, grid=grid)
+
+
+def run(name_filter: str = "", keys: Optional[Collection[str]] = None, repeats: int = REPEATS) -> Dict[str, float]:
+    """Time every case at every size, or only ``keys``; keys are ``<case>@<teams>x<lanes>``."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, factory in CASES.items():
+            for grid in SIZES:
+                key = f"{name}@{grid.teams}x{grid.lanes}"
+                if name_filter not in key or (keys is not None and key not in keys):
+                    continue
+                timer = timeit.Timer(factory(grid, Path(tmp)))
+                number, _ = timer.autorange()
+                best = min(timer.repeat(repeats, number)) / number
+                results[key] = round(best * 1e6, 3)
+                print(f"{key:<45} {results[key]:>12.3f} µs", flush=True)
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float,
+            tolerances: Optional[Dict[str, float]] = None) -> List[Tuple[str, float, float]]:
+    """
+    Cases slower than their baseline by more than ``threshold`` (0.25 = 25%),
+    or than the tolerance ``tolerances`` gives their case name.
+    """
+    tolerances = tolerances or {}
+    return [(key, baseline[key], value) for key, value in results.items()
+            if key in baseline and value > baseline[key] * (1 + tolerances.get(key.partition("@")[0], threshold))]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--filter", default="")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter)
+    try:
+        stored = json.loads(Path(args.baseline).read_text())
+    except FileNotFoundError:
+        stored = None
+    tolerances = stored.get("tolerances", {}) if stored else {}
+    if stored and not args.update_baseline:
+        suspects = [key for key, _, _ in compare(results, stored["results"], args.threshold, tolerances)]
+        if suspects:
+            print(f"Timing {len(suspects)} cases again", flush=True)
+            for key, value in run(args.filter, suspects, RECHECK_REPEATS).items():
+                results[key] = min(results[key], value)
+    report = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    Path(args.output).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    if args.update_baseline:
+        merged = dict(stored["results"], **results) if stored else results
+        baseline = dict(report, results=merged, tolerances=tolerances)
+        Path(args.baseline).write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if stored is None:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    regressions = compare(results, stored["results"], args.threshold, tolerances)
+    for key, before, after in regressions:
+        print(f"REGRESSION {key}: {before:.3f} µs -> {after:.3f} µs ({after / before - 1:+.0%})")
+    if regressions:
+        return 1
+    print(f"No case regressed by more than {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,90 +2,442 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from dotenv import load_dotenv
+import asyncio
+import io
 import os
+from typing import Awaitable, Optional
 
-from core.models import Assignment
+from core.metrics import METRICS, instrumented
+from core.models import GridConfig
+from core.profiling import PROFILER
 from infrastructure.discord_adapter import DiscordAdapter
+from infrastructure.metrics_server import MetricsServer
+from interfaces.command_grammar import quote
+from interfaces.command_parser import WAITLIST_HINT, format_promotions, format_suggestions
 
-def main():
-    ### bot.py
-    load_dotenv()
-    TOKEN = os.getenv("DISCORD_TOKEN")
-    GUILD_ID = discord.Object(id=int(os.getenv("DISCORD_GUILD_ID")))
+def adapter_from_env(home_guild: Optional[int] = None) -> DiscordAdapter:
+    """The adapter configured by the environment, as the bot runs it."""
+    return DiscordAdapter(
+        backend=os.getenv("STORAGE_BACKEND", "json"),
+        persistence_mode=os.getenv("PERSISTENCE_MODE", "snapshot"),
+        flush_interval=float(os.getenv("PERSISTENCE_FLUSH_INTERVAL", "1.0")),
+        home_guild=home_guild,
+        per_channel=os.getenv("ROSTER_PER_CHANNEL", "").lower() in ("1", "true", "yes"),
+        idle_timeout=float(os.getenv("ROSTER_IDLE_TIMEOUT", "3600")),
+        max_resident=int(os.getenv("ROSTER_MAX_RESIDENT", "1000")),
+        live_board=os.getenv("LIVE_BOARD", "").lower() in ("1", "true", "yes"),
+        board_window=float(os.getenv("LIVE_BOARD_WINDOW", "2.0")),
+        grid=GridConfig.parse(os.getenv("ROSTER_GRID", "3x8")),
+        # e.g. ROSTER_GRIDS="1234=12x20,1234-5678=4x10"
+        roster_grids={name: GridConfig.parse(spec) for name, _, spec in
+                      (item.partition("=") for item in os.getenv("ROSTER_GRIDS", "").split(",") if item)},
+        suggestion_policies=os.getenv("SUGGESTION_POLICIES", "nearest,least_loaded,any").split(","),
+        backup_dir=os.getenv("BACKUP_DIR", "backups"),
+        backup_keep_hourly=int(os.getenv("BACKUP_KEEP_HOURLY", "24")),
+        backup_keep_daily=int(os.getenv("BACKUP_KEEP_DAILY", "7")),
+        reply_window=float(os.getenv("REPLY_WINDOW", "0.5")),
+    )
+
+
+def metrics_dump():
+    """The current metrics as message kwargs: a code block, or a file when too long for one."""
+    if not METRICS.enabled:
+        return {"content": "❗ Metrics are disabled. Set METRICS=1 or METRICS_PORT to collect them."}
+    text = METRICS.render()
+    if len(text) < 1900:
+        return {"content": f"```\n{text}```"}
+    return {"file": discord.File(io.BytesIO(text.encode()), filename="metrics.txt")}
+
+
+async def truncated(reply: Awaitable[str], limit: int = 2000) -> str:
+    """The reply cut to what fits in one message."""
+    return (await reply)[:limit]
 
+
+class RosterBot(commands.Bot):
+    """The bot, draining the adapter's queued commands and replies before it disconnects."""
+
+    def __init__(self, adapter: DiscordAdapter, **kwargs):
+        super().__init__(**kwargs)
+        self.adapter = adapter
+
+    async def close(self):
+        await self.adapter.drain()
+        await super().close()
+
+
+def build_bot(adapter: DiscordAdapter, guild_id: int, backup_interval: float = 0,
+              evict_interval: float = 0) -> commands.Bot:
+    """
+    The bot with every slash and text command registered against ``adapter``.
+
+    Nothing connects until ``run`` is called, so the handlers can also be
+    driven offline, as benchmarks/load_generator.py does.
+    """
+    GUILD_ID = discord.Object(id=guild_id)
     intents = discord.Intents.default()
     intents.message_content = True
-    bot = commands.Bot(command_prefix="raid-", intents=intents)
-    adapter = DiscordAdapter()
+    bot = RosterBot(adapter, command_prefix="raid-", intents=intents)
+    # Replies go through the outbox: rate limited per channel, one-line text replies merged
+    outbox = adapter.outbox
+    background = {}
+
+    async def back_up_periodically():
+        while True:
+            await asyncio.sleep(backup_interval)
+            try:
+                await adapter.backup_changed()
+            except Exception as e:
+                print(f"❌ Automatic backup failed: {e}")
+
+    async def sweep_periodically():
+        # Idle rosters would otherwise stay resident until some other roster is used
+        while True:
+            await asyncio.sleep(evict_interval)
+            await adapter.sweep()
 
     @bot.event
     async def on_ready():
         await bot.tree.sync(guild=GUILD_ID)
+        # on_ready fires again after every reconnect
+        if backup_interval > 0 and "backups" not in background:
+            background["backups"] = asyncio.create_task(back_up_periodically())
+        if evict_interval > 0 and "eviction" not in background:
+            background["eviction"] = asyncio.create_task(sweep_periodically())
         print(f"✅ Bot connected as {bot.user}")
 
     # Slash Command: /assign
     @bot.tree.command(name="assign", description="Assign a user to a team lane", guild=GUILD_ID)
     @app_commands.describe(
-        team="Team number (1–3)",
-        lane="Lane number (1–8)",
+        team="Team number",
+        lane="Lane number",
         member="Optional: user to assign",
         random="Assign to any available lane"
     )
+    @instrumented("slash", "assign")
     async def assign(interaction: discord.Interaction, team: int = None, lane: int = None, member: str = None,
                      random: bool = False):
         user = member or interaction.user.name
-        if random:
-            slot = adapter.service.assign_random(user)
-            msg = f"✅ {user} assigned to Team {slot[0]} Lane {slot[1]}" if slot else "❌ No empty lanes available."
-            await interaction.response.send_message(msg)
-            return
+        roster = (interaction.guild_id, interaction.channel_id)
 
-        if team and lane:
-            success, suggestion = adapter.service.assign_user(user, team, lane)
+        async def reply() -> str:
+            if random:
+                slot = await adapter.execute(*roster, lambda: adapter.service_for(*roster).assign_random(user))
+                return f"✅ {user} assigned to Team {slot[0]} Lane {slot[1]}" if slot else \
+                    f"❌ No empty lanes available. {WAITLIST_HINT}"
+            if not (team and lane):
+                return "❗ You must provide either `team` and `lane`, or `random`."
+            try:
+                adapter.repo_for(*roster).grid.validate(team, lane)
+            except ValueError as e:
+                return f"❗ {e}"
+            success, suggestions = await adapter.execute(
+                *roster, lambda: adapter.service_for(*roster).assign_user(user, team, lane))
             if success:
-                await interaction.response.send_message(f"✅ {user} assigned to Team {team} Lane {lane}")
-            elif suggestion:
-                await interaction.response.send_message(
-                    f"❌ Lane taken. Suggested: Team {suggestion[0]} Lane {suggestion[1]}")
-            else:
-                await interaction.response.send_message("❌ All lanes are full.")
-        else:
-            await interaction.response.send_message("❗ You must provide either `team` and `lane`, or `random`.")
+                return f"✅ {user} assigned to Team {team} Lane {lane}"
+            if suggestions:
+                return f"❌ Lane taken. {format_suggestions(suggestions)}"
+            return f"❌ All lanes are full. {WAITLIST_HINT}"
+
+        await outbox.respond(interaction, reply())
+
+    # Autocomplete runs on every keystroke; answered from in-memory indexes, never the writer queue
+    @assign.autocomplete("member")
+    async def assign_member_choices(interaction: discord.Interaction, current: str):
+        repo = adapter.repo_for(interaction.guild_id, interaction.channel_id)
+        return [app_commands.Choice(name=name, value=name)
+                for name in adapter.autocomplete.known_members(repo, current)]
+
+    @assign.autocomplete("team")
+    async def assign_team_choices(interaction: discord.Interaction, current: str):
+        repo = adapter.repo_for(interaction.guild_id, interaction.channel_id)
+        return [app_commands.Choice(name=f"Team {team} ({free} free)", value=team)
+                for team, free in adapter.autocomplete.open_teams(repo, str(current or ""))]
+
+    @assign.autocomplete("lane")
+    async def assign_lane_choices(interaction: discord.Interaction, current: str):
+        repo = adapter.repo_for(interaction.guild_id, interaction.channel_id)
+        # The team chosen so far, if any; a half-typed option can arrive as text
+        team = interaction.namespace.team
+        team = int(team) if str(team).isdigit() else None
+        return [app_commands.Choice(name=f"Lane {lane}", value=lane)
+                for lane in adapter.autocomplete.free_lanes(repo, team, str(current or ""))]
 
     # Slash Command: /remove
     @bot.tree.command(name="remove", description="Remove a user from their assigned lane", guild=GUILD_ID)
     @app_commands.describe(member="User to remove")
+    @instrumented("slash", "remove")
     async def remove(interaction: discord.Interaction, member: str):
-        removed = adapter.service.remove_user(member)
-        msg = f"✅ {member} removed from lane." if removed else f"❌ {member} was not assigned to any lane."
-        await interaction.response.send_message(msg)
+        roster = (interaction.guild_id, interaction.channel_id)
+
+        async def reply() -> str:
+            result = await adapter.execute(*roster, lambda: adapter.service_for(*roster).release_user(member))
+            return f"✅ {member} removed from lane." + format_promotions(result.promoted) if result.removed else \
+                f"❌ {member} was not assigned to any lane."
+
+        await outbox.respond(interaction, reply())
+
+    @remove.autocomplete("member")
+    async def remove_member_choices(interaction: discord.Interaction, current: str):
+        repo = adapter.repo_for(interaction.guild_id, interaction.channel_id)
+        return [app_commands.Choice(name=name, value=name)
+                for name in adapter.autocomplete.assigned_members(repo, current)]
+
+    # Slash Command: /waitlist
+    @bot.tree.command(name="waitlist", description="Queue for the next free lane", guild=GUILD_ID)
+    @app_commands.describe(
+        action="join, leave or show the waitlist",
+        member="Optional: user to queue or take off the queue"
+    )
+    @app_commands.choices(action=[app_commands.Choice(name=name, value=name) for name in ("join", "leave", "show")])
+    @instrumented("slash", "waitlist")
+    async def waitlist(interaction: discord.Interaction, action: str = "join", member: str = None):
+        args = ("" if action == "join" else f"--{action}") + (f" --member {quote(member)}" if member else "")
+        await outbox.respond(interaction, adapter.execute(interaction.guild_id, interaction.channel_id,
+                                                          lambda: adapter.handle_waitlist(interaction, args)))
+
+    # Slash Command: /board
+    @bot.tree.command(name="board", description="Post a roster message that updates itself", guild=GUILD_ID)
+    @instrumented("slash", "board")
+    async def board(interaction: discord.Interaction):
+        if not adapter.live_board:
+            await interaction.response.send_message("❗ The live board is not enabled.", ephemeral=True)
+            return
+        await interaction.response.send_message("📌 Live board posted.", ephemeral=True)
+        key = adapter.roster_key(interaction.guild_id, interaction.channel_id)
+        await adapter.live_board.attach(key, interaction.channel)
+
+    # Slash Command: /bulk
+    @bot.tree.command(name="bulk", description="Assign many members at once", guild=GUILD_ID)
+    @app_commands.describe(
+        entries="Entries as member:team:lane separated by spaces or commas",
+        file="Text file of member:team:lane entries"
+    )
+    @app_commands.default_permissions(manage_guild=True)
+    @instrumented("slash", "bulk")
+    async def bulk(interaction: discord.Interaction, entries: str = None, file: discord.Attachment = None):
+        text = entries or ""
+        if file:
+            text += "\n" + (await file.read()).decode("utf-8", errors="replace")
+        await outbox.respond(interaction, adapter.execute(interaction.guild_id, interaction.channel_id,
+                                                          lambda: adapter.handle_bulk(interaction, text)))
+
+    # Slash Command: /fill
+    @bot.tree.command(name="fill", description="Place a waiting list on the least-filled teams", guild=GUILD_ID)
+    @app_commands.describe(
+        members="Member names separated by spaces or commas",
+        file="Text file of member names"
+    )
+    @app_commands.default_permissions(manage_guild=True)
+    @instrumented("slash", "fill")
+    async def fill(interaction: discord.Interaction, members: str = None, file: discord.Attachment = None):
+        text = members or ""
+        if file:
+            text += "\n" + (await file.read()).decode("utf-8", errors="replace")
+        await outbox.respond(interaction, adapter.execute(interaction.guild_id, interaction.channel_id,
+                                                          lambda: adapter.handle_fill(interaction, text)))
+
+    # Slash Command: /metrics
+    @bot.tree.command(name="metrics", description="Show command and persistence metrics", guild=GUILD_ID)
+    @app_commands.default_permissions(manage_guild=True)
+    @instrumented("slash", "metrics")
+    async def metrics(interaction: discord.Interaction):
+        await interaction.response.send_message(**metrics_dump(), ephemeral=True)
+
+    # Slash Command: /profile
+    @bot.tree.command(name="profile", description="Sample command handlers with cProfile and tracemalloc",
+                      guild=GUILD_ID)
+    @app_commands.describe(
+        action="on, off or status",
+        rate="Fraction of calls to sample, e.g. 0.05"
+    )
+    @app_commands.choices(action=[app_commands.Choice(name=name, value=name) for name in ("status", "on", "off")])
+    @app_commands.default_permissions(manage_guild=True)
+    @instrumented("slash", "profile")
+    async def profile(interaction: discord.Interaction, action: str = "status", rate: float = None):
+        args = ("" if action == "status" else f"--{action}") + (f" --rate {rate}" if rate is not None else "")
+        result = adapter.handle_profile(interaction, args)
+        await interaction.response.send_message(result[:2000], ephemeral=True)
+
+    # Slash Command: /backup
+    @bot.tree.command(name="backup", description="Save a compressed backup of this roster", guild=GUILD_ID)
+    @app_commands.default_permissions(manage_guild=True)
+    @instrumented("slash", "backup")
+    async def backup(interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        await interaction.followup.send(await adapter.handle_backup(interaction), ephemeral=True)
+
+    # Slash Command: /restore
+    @bot.tree.command(name="restore", description="List this roster's backups or restore one", guild=GUILD_ID)
+    @app_commands.describe(
+        backup="Backup to restore; leave empty to list them",
+        latest="Restore the newest backup"
+    )
+    @app_commands.default_permissions(manage_guild=True)
+    @instrumented("slash", "restore")
+    async def restore(interaction: discord.Interaction, backup: str = None, latest: bool = False):
+        args = (f"--backup {quote(backup)}" if backup else "") + (" --latest" if latest else "")
+        await interaction.response.defer(ephemeral=True)
+        await interaction.followup.send(await adapter.handle_restore(interaction, args), ephemeral=True)
+
+    # Slash Command: /undo
+    @bot.tree.command(name="undo", description="Roll back the latest roster changes", guild=GUILD_ID)
+    @app_commands.describe(steps="How many changes to roll back")
+    @app_commands.default_permissions(manage_guild=True)
+    @instrumented("slash", "undo")
+    async def undo(interaction: discord.Interaction, steps: int = 1):
+        await outbox.respond(interaction, truncated(adapter.execute(
+            interaction.guild_id, interaction.channel_id, lambda: adapter.handle_undo(interaction, f"--steps {steps}"))))
+
+    # Slash Command: /redo
+    @bot.tree.command(name="redo", description="Reapply roster changes that were undone", guild=GUILD_ID)
+    @app_commands.describe(steps="How many undone changes to reapply")
+    @app_commands.default_permissions(manage_guild=True)
+    @instrumented("slash", "redo")
+    async def redo(interaction: discord.Interaction, steps: int = 1):
+        await outbox.respond(interaction, truncated(adapter.execute(
+            interaction.guild_id, interaction.channel_id, lambda: adapter.handle_redo(interaction, f"--steps {steps}"))))
+
+    # Slash Command: /history
+    @bot.tree.command(name="history", description="List the latest roster changes", guild=GUILD_ID)
+    @app_commands.describe(limit="How many changes to list")
+    @app_commands.default_permissions(manage_guild=True)
+    @instrumented("slash", "history")
+    async def history(interaction: discord.Interaction, limit: int = 20):
+        result = adapter.handle_history(interaction, f"--limit {limit}")
+        await interaction.response.send_message(result[:2000], ephemeral=True)
 
     # Optional: Legacy Text Commands
     @bot.command(name="assign")
+    @instrumented("text", "assign")
     async def legacy_assign(ctx, *, args: str):
-        result = adapter.handle_assign(ctx, args)
-        await ctx.send(result)
+        result = await adapter.execute_for_ctx(ctx, lambda: adapter.handle_assign(ctx, args))
+        await outbox.send(ctx.channel, result)
 
     @bot.command(name="remove")
+    @instrumented("text", "remove")
     async def legacy_remove(ctx, *, args: str):
-        result = adapter.handle_remove(ctx, args)
-        await ctx.send(result)
+        result = await adapter.execute_for_ctx(ctx, lambda: adapter.handle_remove(ctx, args))
+        await outbox.send(ctx.channel, result)
+
+    @bot.command(name="waitlist")
+    @instrumented("text", "waitlist")
+    async def legacy_waitlist(ctx, *, args: str = ""):
+        result = await adapter.execute_for_ctx(ctx, lambda: adapter.handle_waitlist(ctx, args))
+        await outbox.send(ctx.channel, result)
+
+    @bot.command(name="bulk")
+    @commands.has_permissions(manage_guild=True)
+    @instrumented("text", "bulk")
+    async def legacy_bulk(ctx, *, args: str = ""):
+        for attachment in ctx.message.attachments:
+            args += "\n" + (await attachment.read()).decode("utf-8", errors="replace")
+        result = await adapter.execute_for_ctx(ctx, lambda: adapter.handle_bulk(ctx, args))
+        await outbox.send(ctx.channel, result)
 
-    # Slash command: /list
+    @bot.command(name="fill")
+    @commands.has_permissions(manage_guild=True)
+    @instrumented("text", "fill")
+    async def legacy_fill(ctx, *, args: str = ""):
+        for attachment in ctx.message.attachments:
+            args += "\n" + (await attachment.read()).decode("utf-8", errors="replace")
+        result = await adapter.execute_for_ctx(ctx, lambda: adapter.handle_fill(ctx, args))
+        await outbox.send(ctx.channel, result)
+
+    @bot.command(name="backup")
+    @commands.has_permissions(manage_guild=True)
+    @instrumented("text", "backup")
+    async def legacy_backup(ctx):
+        await outbox.send(ctx.channel, await adapter.handle_backup(ctx))
+
+    @bot.command(name="restore")
+    @commands.has_permissions(manage_guild=True)
+    @instrumented("text", "restore")
+    async def legacy_restore(ctx, *, args: str = ""):
+        await outbox.send(ctx.channel, await adapter.handle_restore(ctx, args))
+
+    @bot.command(name="undo")
+    @commands.has_permissions(manage_guild=True)
+    @instrumented("text", "undo")
+    async def legacy_undo(ctx, *, args: str = ""):
+        result = await adapter.execute_for_ctx(ctx, lambda: adapter.handle_undo(ctx, args))
+        await outbox.send(ctx.channel, result[:2000])
+
+    @bot.command(name="redo")
+    @commands.has_permissions(manage_guild=True)
+    @instrumented("text", "redo")
+    async def legacy_redo(ctx, *, args: str = ""):
+        result = await adapter.execute_for_ctx(ctx, lambda: adapter.handle_redo(ctx, args))
+        await outbox.send(ctx.channel, result[:2000])
+
+    @bot.command(name="history")
+    @commands.has_permissions(manage_guild=True)
+    @instrumented("text", "history")
+    async def legacy_history(ctx, *, args: str = ""):
+        await outbox.send(ctx.channel, adapter.handle_history(ctx, args)[:2000])
+
+    @bot.command(name="metrics")
+    @commands.has_permissions(manage_guild=True)
+    @instrumented("text", "metrics")
+    async def legacy_metrics(ctx):
+        await outbox.send(ctx.channel, **metrics_dump())
+
+    @bot.command(name="profile")
+    @commands.has_permissions(manage_guild=True)
+    @instrumented("text", "profile")
+    async def legacy_profile(ctx, *, args: str = ""):
+        await outbox.send(ctx.channel, adapter.handle_profile(ctx, args)[:2000])
+
+    # Slash command: /list (reads skip the writer queue)
     @bot.tree.command(name="list", description="Show all current team lane assignments", guild=GUILD_ID)
+    @instrumented("slash", "list")
     async def list_assignments(interaction: discord.Interaction):
-        assignments = list(adapter.service.list_all_assignments().values())
-        embed = Assignment.to_discord_embed(assignments)
+        repo = adapter.repo_for(interaction.guild_id, interaction.channel_id)
+        embed = adapter.render_cache.render(repo, "embed")
         await interaction.response.send_message(embed=embed)
 
     # Text command: raid-list
     @bot.command(name="list")
+    @instrumented("text", "list")
     async def legacy_list(ctx):
-        assignments = list(adapter.service.list_all_assignments().values())
-        output = "```\n" + Assignment.format_assignments(assignments) + "\n```"
-        await ctx.send(output)
+        repo = adapter.repo_for(ctx.guild.id if ctx.guild else None, ctx.channel.id)
+        output = "```\n" + adapter.render_cache.render(repo, "text") + "\n```"
+        await outbox.send(ctx.channel, output)
+
+    return bot
+
+
+def main():
+    ### bot.py
+    load_dotenv()
+    TOKEN = os.getenv("DISCORD_TOKEN")
+    guild_id = int(os.getenv("DISCORD_GUILD_ID"))
+    adapter = adapter_from_env(home_guild=guild_id)
+    # Seconds between automatic backups of changed rosters; 0 turns them off
+    backup_interval = float(os.getenv("BACKUP_INTERVAL", "3600"))
+    # Seconds between sweeps dropping rosters idle past ROSTER_IDLE_TIMEOUT
+    evict_interval = float(os.getenv("ROSTER_EVICT_INTERVAL", "60"))
+    # Metrics cost nothing until enabled; METRICS_PORT also serves them to a local Prometheus
+    metrics_server = None
+    if os.getenv("METRICS", "").lower() in ("1", "true", "yes") or os.getenv("METRICS_PORT"):
+        METRICS.enable()
+    if os.getenv("METRICS_PORT"):
+        metrics_server = MetricsServer(METRICS, os.getenv("METRICS_HOST", "127.0.0.1"), int(os.getenv("METRICS_PORT")))
+        metrics_server.start()
+
+    # Sampling profiler; also switched at runtime with /profile
+    PROFILER.directory = os.getenv("PROFILE_DIR", "profiles")
+    PROFILER.keep = int(os.getenv("PROFILE_KEEP", "20"))
+    if os.getenv("PROFILE_RATE"):
+        PROFILER.enable(float(os.getenv("PROFILE_RATE")))
 
-    bot.run(TOKEN)
+    bot = build_bot(adapter, guild_id, backup_interval, evict_interval)
+    try:
+        bot.run(TOKEN)
+    finally:
+        adapter.close()
+        if metrics_server:
+            metrics_server.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,133 @@
+import gzip
+import json
+import os
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+# <roster>-<UTC time to the microsecond>.json.gz, so names sort by age within a roster
+_NAME = re.compile(r"^(?P<roster>.+)-(?P<taken>\d{8}T\d{12})Z\.json\.gz$")
+_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+@dataclass(frozen=True)
+class Backup:
+    name: str
+    roster: str
+    taken_at: datetime
+
+
+class BackupManager:
+    """
+    Timestamped, gzip-compressed backups of roster state.
+
+    ``snapshot`` copies a roster's assignments and waitlist inside one
+    ``repo.reading()``, so the copy is consistent and writes nothing; compressing and
+    writing it happens on a single worker thread and never holds the roster.
+    After each backup the roster's older files are pruned: the newest backup
+    of each of the last ``keep_hourly`` hours and of each of the last
+    ``keep_daily`` days that have one are kept, everything else is deleted.
+    """
+
+    def __init__(self, directory: str = "backups", keep_hourly: int = 24, keep_daily: int = 7,
+                 clock: Callable[[], float] = time.time, executor: Optional[ThreadPoolExecutor] = None):
+        self.directory = directory
+        self.keep_hourly = keep_hourly
+        self.keep_daily = keep_daily
+        self.clock = clock
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup")
+
+    @staticmethod
+    def snapshot(repo) -> Dict[str, Any]:
+        """A consistent copy of ``repo``'s state, as stored in a backup."""
+        with repo.reading():
+            return {
+                "grid": [repo.grid.teams, repo.grid.lanes],
+                "version": repo.version,
+                "assignments": [a.to_dict() for a in repo.assignments.values()],
+                "waitlist": repo.waiting(),
+            }
+
+    def create(self, repo, roster: str) -> "Future[Backup]":
+        """Snapshot ``repo`` now and write the backup in the background."""
+        data = self.snapshot(repo)
+        taken_at = datetime.fromtimestamp(self.clock(), timezone.utc)
+        return self._executor.submit(self._write, roster, taken_at, data)
+
+    def backups(self, roster: str) -> List[Backup]:
+        """Backups of ``roster``, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        backups = []
+        for name in os.listdir(self.directory):
+            match = _NAME.match(name)
+            if match and match["roster"] == roster:
+                taken_at = datetime.strptime(match["taken"], _TIME_FORMAT).replace(tzinfo=timezone.utc)
+                backups.append(Backup(name, roster, taken_at))
+        return sorted(backups, key=lambda backup: backup.taken_at, reverse=True)
+
+    def load(self, roster: str, name: Optional[str] = None) -> Dict[str, Any]:
+        """Read backup ``name`` of ``roster``, or its newest backup if no name is given."""
+        backups = self.backups(roster)
+        backup = next((b for b in backups if b.name == name), None) if name else next(iter(backups), None)
+        if backup is None:
+            raise FileNotFoundError(f"No backup named {name}." if name else "There are no backups yet.")
+        with gzip.open(os.path.join(self.directory, backup.name), "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def restore(repo, data: Dict[str, Any]):
+        """Replace ``repo``'s assignments and waitlist with a backup's, as one mutation."""
+        entries = [(entry["user"], entry["team"], entry["lane"]) for entry in data["assignments"]]
+        # Check everything first so a backup from a larger grid changes nothing
+        for _, team, lane in entries:
+            repo.grid.validate(team, lane)
+        with repo.batch():
+            repo.clear()
+            # Clearing keeps the queue; the backup's waiters must not line up behind today's
+            for user in repo.waiting():
+                repo.leave_waitlist(user)
+            for user, team, lane in entries:
+                repo.assign(user, team, lane)
+            for user in data.get("waitlist", ()):
+                repo.join_waitlist(user)
+
+    def prune(self, roster: str) -> List[str]:
+        """Delete the backups of ``roster`` the retention policy no longer keeps; return their names."""
+        backups = self.backups(roster)
+        keep = {backups[0].name} if backups else set()
+        for period, count in (("%Y%m%d%H", self.keep_hourly), ("%Y%m%d", self.keep_daily)):
+            periods = set()
+            for backup in backups:
+                period_key = backup.taken_at.strftime(period)
+                if period_key in periods:
+                    continue
+                if len(periods) == count:
+                    break
+                periods.add(period_key)
+                keep.add(backup.name)
+        removed = [backup.name for backup in backups if backup.name not in keep]
+        for name in removed:
+            os.remove(os.path.join(self.directory, name))
+        return removed
+
+    def close(self):
+        """Wait for pending backups to be written."""
+        self._executor.shutdown(wait=True)
+
+    def _write(self, roster: str, taken_at: datetime, data: Dict[str, Any]) -> Backup:
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{roster}-{taken_at.strftime(_TIME_FORMAT)}Z.json.gz"
+        path = os.path.join(self.directory, name)
+        # Write to a temporary file first so a crash never leaves a truncated backup
+        with open(f"{path}.tmp", "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as f:
+                f.write(json.dumps(data).encode())
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(f"{path}.tmp", path)
+        self.prune(roster)
+        return Backup(name, roster, taken_at)
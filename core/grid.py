@@ -0,0 +1,132 @@
+from array import array
+from typing import Iterator, List, Optional, Tuple
+
+from core.members import MemberTable
+from core.models import Assignment, GridConfig
+
+
+class Grid:
+    """
+    Flat lane table for one roster.
+
+    Lane ``(team, lane)`` lives in cell ``config.index(team, lane)`` of an
+    unsigned int array, holding its member's id in ``members``, the roster's
+    own table unless one is given, or 0 while
+    the lane is free; Assignments are only built when a lane is read. Each
+    team also keeps a bitmap of its free lanes (bit n for lane n + 1) and a
+    count of filled lanes, so free-lane queries never walk the cells. Across teams, ``open`` has bit t - 1 set
+    while team t has a free lane, and ``loads[n]`` is a bitmap of the teams
+    with exactly n filled lanes, a bucket queue for the least-loaded team.
+    """
+
+    __slots__ = ("config", "members", "cells", "free", "filled", "open", "loads", "_min_load")
+
+    def __init__(self, config: GridConfig, members: Optional[MemberTable] = None):
+        self.config = config
+        self.members = members if members is not None else MemberTable()
+        self.clear()
+
+    def get(self, team: int, lane: int) -> Optional[Assignment]:
+        if not (1 <= team <= self.config.teams and 1 <= lane <= self.config.lanes):
+            return None
+        return self.at(self.config.index(team, lane))
+
+    def at(self, index: int) -> Optional[Assignment]:
+        """The assignment in cell ``index``, None if the lane is free."""
+        member = self.cells[index]
+        if not member:
+            return None
+        team, lane = self.config.slot(index)
+        return Assignment(self.members.names[member], team, lane, self.config)
+
+    def is_free(self, team: int, lane: int) -> bool:
+        return bool(self.free[team - 1] >> (lane - 1) & 1)
+
+    def place(self, assignment: Assignment) -> int:
+        """Put the assignment's member in its lane; return the cell index."""
+        team, lane = assignment.team, assignment.lane
+        index = self.config.index(team, lane)
+        self.cells[index] = self.members.intern(assignment.user)
+        self.free[team - 1] &= ~(1 << (lane - 1))
+        if not self.free[team - 1]:
+            self.open &= ~(1 << (team - 1))
+        self._move_load(team, +1)
+        return index
+
+    def vacate(self, team: int, lane: int):
+        self.cells[self.config.index(team, lane)] = 0
+        self.free[team - 1] |= 1 << (lane - 1)
+        self.open |= 1 << (team - 1)
+        self._move_load(team, -1)
+
+    def first_free(self, team: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """Lowest free lane of ``team``, or of the lowest team with room."""
+        if team is None:
+            if not self.open:
+                return None
+            team = (self.open & -self.open).bit_length()
+        free = self.free[team - 1]
+        # Lowest set bit is the lowest free lane
+        return (team, (free & -free).bit_length()) if free else None
+
+    def nearest_free(self, team: int, lane: int) -> Iterator[Tuple[int, int]]:
+        """Free lanes of ``team`` by distance from ``lane``, the lower lane first on a tie."""
+        free = self.free[team - 1]
+        above = free >> lane << lane
+        below = free & ((1 << (lane - 1)) - 1)
+        while above or below:
+            up = (above & -above).bit_length() if above else None
+            down = below.bit_length() if below else None
+            if up is None or (down is not None and lane - down <= up - lane):
+                below &= ~(1 << (down - 1))
+                yield (team, down)
+            else:
+                above &= ~(1 << (up - 1))
+                yield (team, up)
+
+    def least_loaded(self) -> Iterator[int]:
+        """Teams with a free lane, fewest filled lanes first, then by team number."""
+        while self._min_load < self.config.lanes and not self.loads[self._min_load]:
+            self._min_load += 1
+        for load in range(self._min_load, self.config.lanes):
+            teams = self.loads[load]
+            while teams:
+                low = teams & -teams
+                teams ^= low
+                yield low.bit_length()
+
+    def open_teams(self) -> Iterator[int]:
+        """Teams with a free lane, in team order."""
+        teams = self.open
+        while teams:
+            low = teams & -teams
+            teams ^= low
+            yield low.bit_length()
+
+    def row(self, team: int) -> Tuple[Optional[str], ...]:
+        """The user in each lane of ``team``, None for empty lanes."""
+        start = (team - 1) * self.config.lanes
+        names = self.members.names
+        return tuple(names[member] for member in self.cells[start:start + self.config.lanes])
+
+    def clear(self):
+        config = self.config
+        self.cells = array("I", [0]) * config.size
+        # Index team - 1
+        self.free: List[int] = [(1 << config.lanes) - 1] * config.teams
+        self.filled: List[int] = [0] * config.teams
+        self.open = (1 << config.teams) - 1
+        self.loads: List[int] = [0] * (config.lanes + 1)
+        self.loads[0] = self.open
+        self._min_load = 0
+
+    def _move_load(self, team: int, delta: int):
+        bit = 1 << (team - 1)
+        load = self.filled[team - 1]
+        self.loads[load] &= ~bit
+        self.loads[load + delta] |= bit
+        self.filled[team - 1] = load + delta
+        self._min_load = min(self._min_load, load + delta)
+
+    def __iter__(self) -> Iterator[Assignment]:
+        return (self.at(index) for index, member in enumerate(self.cells) if member)
@@ -0,0 +1,293 @@
+import json
+import os
+from array import array
+from itertools import islice
+from typing import IO, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from core.members import MemberTable
+from core.models import GridConfig
+
+Slot = Tuple[int, int]
+Promotion = Tuple[str, int, int]
+
+DEFAULT_CAPACITY = 1000
+# Events per spill file before it is rotated
+DEFAULT_SPILL_LIMIT = 100_000
+
+# Reused for every spilled event; json.dumps builds a new encoder per call otherwise
+_ENCODE = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class Event(NamedTuple):
+    """
+    One roster mutation, numbered by ``seq`` from the start of the history.
+
+    ``kind`` is assign, move (an assign by a user who already held a lane),
+    remove, reset, wait or unwait. A named tuple rather than a dataclass, so
+    building the hundred thousands read back from a spill file stays cheap.
+    """
+    seq: int
+    kind: str
+    user: str = ""
+    slot: Optional[Slot] = None
+    previous: Optional[Slot] = None
+    promoted: Tuple[Promotion, ...] = ()
+
+    @classmethod
+    def from_list(cls, values: list) -> "Event":
+        """Rebuild an event from its JSON form, the event's fields in order."""
+        seq, kind, user, slot, previous, promoted = values
+        return cls(seq, kind, user, slot and tuple(slot), previous and tuple(previous),
+                   tuple(map(tuple, promoted)) if promoted else ())
+
+
+class RosterState:
+    """Plain lanes-and-queue state that events are replayed onto."""
+
+    __slots__ = ("slots", "waiting")
+
+    def __init__(self, slots: Optional[Dict[str, Slot]] = None, waiting: Iterable[str] = ()):
+        # user -> (team, lane)
+        self.slots: Dict[str, Slot] = dict(slots or {})
+        # Waiting members in queue order; a dict is an insertion-ordered set
+        self.waiting: Dict[str, None] = dict.fromkeys(waiting)
+
+    def copy(self) -> "RosterState":
+        return RosterState(self.slots, self.waiting)
+
+    def apply(self, event: Event):
+        kind = event.kind
+        if kind == "assign" or kind == "move":
+            self.slots[event.user] = event.slot
+            self.waiting.pop(event.user, None)
+        elif kind == "remove":
+            self.slots.pop(event.user, None)
+        elif kind == "reset":
+            self.slots.clear()
+        elif kind == "wait":
+            self.waiting.setdefault(event.user)
+        elif kind == "unwait":
+            self.waiting.pop(event.user, None)
+        for user, team, lane in event.promoted:
+            self.slots[user] = (team, lane)
+            self.waiting.pop(user, None)
+
+    def to_dict(self) -> dict:
+        return {"slots": [[user, *slot] for user, slot in self.slots.items()], "waiting": list(self.waiting)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RosterState":
+        return cls({user: (team, lane) for user, team, lane in data["slots"]}, data["waiting"])
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, RosterState) and self.slots == other.slots
+                and list(self.waiting) == list(other.waiting))
+
+
+class PackedState(RosterState):
+    """
+    RosterState kept as a copy of a grid's member-id array.
+
+    Checkpoints hold one of these per roster, so they cost four bytes per
+    lane; ``slots`` is only expanded into a dict when the state is read.
+    """
+
+    __slots__ = ("_cells", "_config", "_names")
+
+    def __init__(self, cells: array, config: GridConfig, names: Sequence[Optional[str]], waiting: Iterable[str] = ()):
+        self._cells = cells
+        self._config = config
+        # The member table's names, indexed by the ids in ``cells``
+        self._names = names
+        self.waiting = dict.fromkeys(waiting)
+
+    @property
+    def slots(self) -> Dict[str, Slot]:
+        names, slot = self._names, self._config.slot
+        return {names[member]: slot(index) for index, member in enumerate(self._cells) if member}
+
+
+class History:
+    """
+    Bounded, linear history of a roster's mutations with an undo cursor.
+
+    Mutations are kept as small tuples, with members as ids in ``members``,
+    the roster's member table, and only typed into events when read. Every ``capacity``
+    events the live roster state is checkpointed; once a third checkpoint
+    exists, the oldest one and the events it leads are dropped, so between
+    ``capacity`` and twice that many events stay in memory. Given a
+    ``spill_path``, dropped events are appended to a JSON-lines file that
+    starts with the state before its first event. Once it holds
+    ``spill_limit`` events it is rotated to ``<spill_path>.1``, replacing the
+    previous one, and a new file is started, so at most twice that many
+    events are kept on disk and at least that many can be rebuilt. The state
+    after any event is rebuilt by replaying from the nearest checkpoint
+    before it, or from a spill file for events no longer in memory.
+
+    ``cursor`` is the last event in effect. Undo and redo move it over the
+    events in memory; recording a new event drops the events that were undone.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, spill_path: Optional[str] = None,
+                 members: Optional[MemberTable] = None, spill_limit: int = DEFAULT_SPILL_LIMIT):
+        if capacity < 1:
+            raise ValueError(f"History capacity must be at least 1, got {capacity}.")
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.spill_limit = spill_limit
+        self.members = members if members is not None else MemberTable()
+        # (op, member id, team, lane, previous lane, promoted) for events base_seq + 1 through last_seq
+        self._entries: List[tuple] = []
+        # (seq, state after that event), oldest first; the first is the base
+        self._checkpoints: List[Tuple[int, RosterState]] = []
+        self._spill: Optional[IO[str]] = None
+        # Event the open spill file starts after, and how many it holds
+        self._spill_seq = 0
+        self._spilled = 0
+        self.reset(RosterState())
+
+    @property
+    def first_seq(self) -> int:
+        """Oldest event index whose state can still be rebuilt."""
+        return self._origin_seq
+
+    @property
+    def base_seq(self) -> int:
+        """Event the events in memory start after; undo cannot go back further."""
+        return self._checkpoints[0][0]
+
+    @property
+    def last_seq(self) -> int:
+        return self._checkpoints[0][0] + len(self._entries)
+
+    def reset(self, state: RosterState, seq: int = 0):
+        """Start the history over from ``state``, as of event ``seq``; ``state`` is kept, not copied."""
+        self.close()
+        self._entries.clear()
+        self._checkpoints[:] = [(seq, state)]
+        # The spill file is only started once events are first dropped
+        self._origin = state if self.spill_path else None
+        self._origin_seq = self.cursor = seq
+
+    def record(self, record: dict, previous: Optional[Slot], state: Callable[[], RosterState]):
+        """
+        Append a persistence record at the cursor, discarding any undone events.
+
+        ``previous`` is the lane the user held before the mutation. ``state``
+        returns the roster state with the mutation applied; it is only called
+        when a checkpoint is due.
+        """
+        cursor = self.cursor
+        if cursor != self.last_seq:
+            self._truncate()
+        op, user = record["op"], record.get("user")
+        member = self.members.intern(user) if user else 0
+        # Only claims name a lane; only removals and resets promote
+        if op == "assign":
+            self._entries.append((op, member, record["team"], record["lane"], previous, None))
+        else:
+            self._entries.append((op, member, None, None, previous, record.get("promoted")))
+        self.cursor = cursor + 1
+        if self.cursor - self._checkpoints[-1][0] >= self.capacity:
+            self._checkpoint(state())
+
+    def undo(self) -> Optional[Event]:
+        """Step the cursor back over one event still in memory and return it."""
+        if self.cursor <= self.base_seq:
+            return None
+        self.cursor -= 1
+        return self._event(self.cursor + 1)
+
+    def redo(self) -> Optional[Event]:
+        """Step the cursor forward over one undone event and return it."""
+        if self.cursor >= self.last_seq:
+            return None
+        self.cursor += 1
+        return self._event(self.cursor)
+
+    def state_at(self, seq: Optional[int] = None) -> RosterState:
+        """The roster state right after event ``seq``, the cursor by default."""
+        seq = self.cursor if seq is None else seq
+        if not self._origin_seq <= seq <= self.last_seq:
+            raise ValueError(f"Event {seq} is not in the history, which covers {self._origin_seq}-{self.last_seq}.")
+        if seq < self.base_seq:
+            return self.replay(*self._read_spill(seq))
+        checkpoint_seq, state = next(c for c in reversed(self._checkpoints) if c[0] <= seq)
+        return self.replay(state, map(self._event, range(checkpoint_seq + 1, seq + 1)))
+
+    def events(self, limit: Optional[int] = None) -> List[Event]:
+        """Events in memory, oldest first; the last ``limit`` of them if given."""
+        first = self.base_seq + 1 if limit is None else max(self.base_seq + 1, self.last_seq - limit + 1)
+        return [self._event(seq) for seq in range(first, self.last_seq + 1)]
+
+    def close(self):
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+
+    @staticmethod
+    def replay(state: RosterState, events: Iterable[Event]) -> RosterState:
+        """A copy of ``state`` with ``events`` applied in order."""
+        state = state.copy()
+        apply = state.apply
+        for event in events:
+            apply(event)
+        return state
+
+    def _event(self, seq: int) -> Event:
+        op, member, team, lane, previous, promoted = self._entries[seq - self._checkpoints[0][0] - 1]
+        promoted = tuple(map(tuple, promoted)) if promoted else ()
+        if op == "assign":
+            return Event(seq, "move" if previous else op, self.members.names[member], (team, lane), previous, promoted)
+        return Event(seq, op, self.members.names[member] or "", None, previous, promoted)
+
+    def _truncate(self):
+        """Drop the undone events and any checkpoint taken after the cursor."""
+        del self._entries[self.cursor - self.base_seq:]
+        while self._checkpoints[-1][0] > self.cursor:
+            self._checkpoints.pop()
+
+    def _checkpoint(self, state: RosterState):
+        self._checkpoints.append((self.cursor, state))
+        if len(self._checkpoints) <= 2:
+            return
+        base_seq = self._checkpoints[0][0]
+        dropped = self._checkpoints[1][0] - base_seq
+        if self.spill_path:
+            if self._spill is None:
+                # A rotated file left by an earlier run belongs to another history
+                if os.path.exists(self._rotated_path):
+                    os.remove(self._rotated_path)
+                self._start_spill(self._origin_seq, self._origin)
+                self._origin = None
+            elif self._spilled >= self.spill_limit:
+                self._spill.close()
+                os.replace(self.spill_path, self._rotated_path)
+                self._origin_seq = self._spill_seq
+                self._start_spill(base_seq, self._checkpoints[0][1])
+            self._spill.writelines(_ENCODE(self._event(seq)) + "\n"
+                                   for seq in range(base_seq + 1, base_seq + dropped + 1))
+            self._spilled += dropped
+        del self._entries[:dropped]
+        del self._checkpoints[0]
+        if not self.spill_path:
+            # Nothing older than the base can be rebuilt without the spill file
+            self._origin_seq = self.base_seq
+
+    @property
+    def _rotated_path(self) -> str:
+        return f"{self.spill_path}.1"
+
+    def _start_spill(self, seq: int, state: RosterState):
+        self._spill = open(self.spill_path, "w")
+        self._spill.write(json.dumps({"seq": seq, "state": state.to_dict()}) + "\n")
+        self._spill_seq = seq
+        self._spilled = 0
+
+    def _read_spill(self, seq: int) -> Tuple[RosterState, List[Event]]:
+        self._spill.flush()
+        with open(self.spill_path if seq >= self._spill_seq else self._rotated_path) as f:
+            header = json.loads(next(f))
+            # One parse of the whole range is several times faster than one per line
+            lines = ",".join(islice(f, seq - header["seq"]))
+        return RosterState.from_dict(header["state"]), [Event.from_list(values) for values in json.loads(f"[{lines}]")]
@@ -0,0 +1,121 @@
+import glob
+import json
+import os
+import time
+from typing import List
+
+from core.metrics import METRICS
+from core.profiling import profiled
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+class AssignmentJournal:
+    """
+    Append-only log of repository mutations, one JSON record per line.
+
+    Records are only considered committed once their trailing newline is on
+    disk; a torn record at the end of the active file is dropped on replay.
+    Sealed segments are named ``<path>.<last seq>`` and are kept until a
+    snapshot covering them has been written.
+    """
+
+    def __init__(self, path: str, fsync: str = "always", fsync_interval: float = 1.0):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync policy must be one of {', '.join(FSYNC_POLICIES)}, got {fsync}.")
+        self.path = path
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._last_fsync = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        return self._file.tell() if self._file else 0
+
+    def replay(self) -> List[dict]:
+        """
+        Read every committed record from sealed segments and the active file.
+
+        A torn tail is truncated away so later appends start on a clean line.
+        Must be called before the first append.
+        """
+        records = []
+        for segment in self._segments():
+            records.extend(self._read(segment, truncate=False))
+        records.extend(self._read(self.path, truncate=True))
+        return records
+
+    @profiled("persist.journal")
+    def append(self, record: dict, sync: bool = True):
+        """Append a record; ``sync=False`` leaves the fsync to a later ``sync()``."""
+        started = time.perf_counter()
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        self._file.write(line)
+        self._file.flush()
+        if sync:
+            if self.fsync == "always":
+                os.fsync(self._file.fileno())
+            elif self.fsync == "interval":
+                now = time.monotonic()
+                if now - self._last_fsync >= self.fsync_interval:
+                    os.fsync(self._file.fileno())
+                    self._last_fsync = now
+        METRICS.record_write("journal", time.perf_counter() - started, len(line))
+
+    def sync(self):
+        """Flush and fsync the active file regardless of policy."""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+
+    def seal(self, last_seq: int):
+        """Close the active file as a segment ending at ``last_seq``."""
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+        if os.path.exists(self.path):
+            os.replace(self.path, f"{self.path}.{last_seq:012d}")
+
+    def discard_through(self, seq: int):
+        """Delete sealed segments whose records are all covered by a snapshot."""
+        for segment in self._segments():
+            if int(segment.rsplit(".", 1)[1]) <= seq:
+                os.remove(segment)
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def _segments(self) -> List[str]:
+        segments = [p for p in glob.glob(glob.escape(self.path) + ".*") if p.rsplit(".", 1)[1].isdigit()]
+        return sorted(segments, key=lambda p: int(p.rsplit(".", 1)[1]))
+
+    @staticmethod
+    def _read(path: str, truncate: bool) -> List[dict]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        records = []
+        committed = 0
+        while True:
+            end = data.find(b"\n", committed)
+            if end == -1:
+                break
+            try:
+                records.append(json.loads(data[committed:end]))
+            except ValueError:
+                break
+            committed = end + 1
+        if truncate and committed < len(data):
+            with open(path, "r+b") as f:
+                f.truncate(committed)
+        return records
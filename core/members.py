@@ -0,0 +1,97 @@
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional
+
+
+class PrefixIndex:
+    """
+    Names sorted case-insensitively, for prefix lookups.
+
+    A lookup bisects to the first match and reads on until the prefix stops
+    matching, so it costs O(log n + limit) however many names are indexed.
+    """
+
+    __slots__ = ("_keys", "_names")
+
+    def __init__(self, names: Iterable[str] = ()):
+        pairs = sorted((name.casefold(), name) for name in names)
+        self._keys = [key for key, _ in pairs]
+        self._names = [name for _, name in pairs]
+
+    def add(self, name: str):
+        key = name.casefold()
+        index = bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self._names.insert(index, name)
+
+    def complete(self, prefix: str, limit: int = 25) -> List[str]:
+        """Up to ``limit`` names starting with ``prefix``, ignoring case, in order."""
+        key = prefix.casefold()
+        keys = self._keys
+        start = bisect_left(keys, key)
+        end = min(start + limit, len(keys))
+        stop = start
+        while stop < end and keys[stop].startswith(key):
+            stop += 1
+        return self._names[start:stop]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class MemberTable:
+    """
+    Intern table giving every member name of one roster a small integer id.
+
+    Grids store ids rather than names, so a lane costs one array element and
+    a member holding a lane and appearing in the roster's history is a
+    single string in memory. Ids start at 1; 0 marks an empty lane. Each
+    roster has its own table: names are never dropped while the roster is
+    resident, so an id stays valid for its grid and history, and the table
+    goes away with the roster when it is evicted. The names are put in a
+    PrefixIndex for autocomplete on the first lookup.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        # Index id; id 0 is the empty lane, so it reads back as None
+        self.names: List[Optional[str]] = [None]
+        # Built on the first completion and caught up on later ones
+        self._index: Optional[PrefixIndex] = None
+        self._lock = threading.Lock()
+
+    def intern(self, name: str) -> int:
+        """The id of ``name``, allocating one on first sight."""
+        member = self._ids.get(name)
+        if member is None:
+            with self._lock:
+                member = self._ids.get(name)
+                if member is None:
+                    member = len(self.names)
+                    self.names.append(name)
+                    self._ids[name] = member
+        return member
+
+    def find(self, name: str) -> int:
+        """The id of ``name``, 0 if it was never interned."""
+        return self._ids.get(name, 0)
+
+    def complete(self, prefix: str, limit: int = 25) -> List[str]:
+        """Known names starting with ``prefix``, ignoring case."""
+        index = self._index
+        # Only catching up takes the lock; completions themselves run on the event loop
+        if index is None or len(index) < len(self.names) - 1:
+            with self._lock:
+                if self._index is None:
+                    self._index = PrefixIndex(self.names[1:])
+                else:
+                    for name in self.names[len(self._index) + 1:]:
+                        self._index.add(name)
+                index = self._index
+        return index.complete(prefix, limit)
+
+    def name(self, member: int) -> Optional[str]:
+        return self.names[member]
+
+    def __len__(self) -> int:
+        return len(self.names) - 1
@@ -0,0 +1,211 @@
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds in seconds, from a cached render to a slow fsync
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, as Prometheus expects."""
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # labels -> [count per bucket..., +Inf count], sum
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {total[0]}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(labels)} {value}"
+
+
+class Gauge:
+    """A gauge read from a callback at scrape time, returning ``{labels: value}``."""
+
+    def __init__(self, name: str, help: str, collect: Callable[[], Dict[Labels, float]]):
+        self.name = name
+        self.help = help
+        self.collect = collect
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in sorted(self.collect().items()):
+            yield f"{self.name}{_format_labels(labels)} {value}"
+
+
+class _NullTimer:
+    """Stand-in handed out while metrics are disabled; does nothing."""
+
+    outcome = "ok"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("metrics", "entry", "command", "outcome", "start")
+
+    def __init__(self, metrics: "Metrics", entry: str, command: str):
+        self.metrics = metrics
+        self.entry = entry
+        self.command = command
+        self.outcome = "ok"
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = "error" if exc_type else self.outcome
+        self.metrics.record_command(self.entry, self.command, outcome, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Process-wide command, persistence and queue metrics.
+
+    Disabled until ``enable()`` is called; until then every hook is a single
+    attribute check, so instrumented code pays next to nothing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.gauges: Dict[str, Gauge] = {}
+        self.reset()
+
+    def reset(self):
+        """Forget every recorded value; registered gauges stay."""
+        with self._lock:
+            self.command_latency = Histogram("roster_command_latency_seconds", "Time spent handling a command.")
+            self.commands = Counter("roster_commands_total", "Commands handled, by outcome.")
+            self.write_latency = Histogram("roster_persistence_write_seconds", "Time spent writing roster state.")
+            self.write_bytes = Counter("roster_persistence_write_bytes_total", "Bytes written for roster state.")
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def timed(self, entry: str, command: str):
+        """Context manager timing one command; set ``.outcome`` on it to label the result."""
+        return _Timer(self, entry, command) if self.enabled else _NULL_TIMER
+
+    def record_command(self, entry: str, command: str, outcome: str, seconds: float):
+        with self._lock:
+            self.command_latency.observe(seconds, entry=entry, command=command)
+            self.commands.inc(entry=entry, command=command, outcome=outcome)
+
+    def record_write(self, kind: str, seconds: float, size: int = 0):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.write_latency.observe(seconds, kind=kind)
+            if size:
+                self.write_bytes.inc(size, kind=kind)
+
+    def register_gauge(self, name: str, help: str, collect: Callable[[], Dict[Labels, float]]):
+        """Add a gauge computed at scrape time; registering a name again replaces it."""
+        self.gauges[name] = Gauge(name, help, collect)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [*self.command_latency.render(), *self.commands.render(),
+                     *self.write_latency.render(), *self.write_bytes.render()]
+        for gauge in list(self.gauges.values()):
+            lines.extend(gauge.render())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def instrumented(entry: str, command: str, outcome: Optional[Callable[[object], str]] = None):
+    """
+    Time every call of the decorated function or coroutine under ``entry``/``command``.
+
+    ``outcome`` maps the return value to an outcome label; exceptions count as "error".
+    """
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                if not METRICS.enabled:
+                    return await fn(*args, **kwargs)
+                with METRICS.timed(entry, command) as timer:
+                    result = await fn(*args, **kwargs)
+                    if outcome:
+                        timer.outcome = outcome(result)
+                    return result
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not METRICS.enabled:
+                    return fn(*args, **kwargs)
+                with METRICS.timed(entry, command) as timer:
+                    result = fn(*args, **kwargs)
+                    if outcome:
+                        timer.outcome = outcome(result)
+                    return result
+        return wrapper
+    return decorate
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -1,48 +1,101 @@
-from dataclasses import dataclass
-from typing import ClassVar
-import discord
+from dataclasses import dataclass, field
+from typing import ClassVar, Dict, Iterable, Optional, Tuple
 
-# Constants for team and lane structure
+# Constants for the default team and lane structure
 TEAMS: ClassVar[int] = 3
 LANES_PER_TEAM: ClassVar[int] = 8
 
-@dataclass
+# Outcomes of a repository claim
+CLAIMED = "claimed"  # the user had no lane and now holds the slot
+MOVED = "moved"  # the user left their previous lane for the slot
+TAKEN = "taken"  # the slot is already held, possibly by the same user
+STALE = "stale"  # the roster changed since the caller's expected version
+
+@dataclass(frozen=True)
+class GridConfig:
+    """Dimensions of one roster's team/lane grid."""
+    teams: int = TEAMS
+    lanes: int = LANES_PER_TEAM
+
+    def __post_init__(self):
+        if self.teams < 1 or self.lanes < 1:
+            raise ValueError(f"A grid needs at least one team and one lane, got {self.teams}x{self.lanes}.")
+
+    @property
+    def size(self) -> int:
+        return self.teams * self.lanes
+
+    @classmethod
+    def parse(cls, text: str) -> "GridConfig":
+        """Read a ``<teams>x<lanes>`` specification such as ``"12x20"``."""
+        teams, _, lanes = text.lower().partition("x")
+        return cls(int(teams), int(lanes))
+
+    def validate(self, team: int, lane: int):
+        if not (1 <= team <= self.teams):
+            raise ValueError(f"Team number must be between 1 and {self.teams}, got {team}.")
+        if not (1 <= lane <= self.lanes):
+            raise ValueError(f"Lane number must be between 1 and {self.lanes}, got {lane}.")
+
+    def index(self, team: int, lane: int) -> int:
+        """Position of a lane in a flat, team-major array of the grid."""
+        return (team - 1) * self.lanes + (lane - 1)
+
+    def slot(self, index: int) -> Tuple[int, int]:
+        """The ``(team, lane)`` at a position of the flat array; the inverse of ``index``."""
+        team, lane = divmod(index, self.lanes)
+        return team + 1, lane + 1
+
+
+DEFAULT_GRID = GridConfig()
+
+
+@dataclass(frozen=True, slots=True)
 class Assignment:
+    """
+    One member in one lane.
+
+    Frozen and slotted: a roster keeps one per held lane next to its grid
+    of member ids and hands it out as is, so it must be a small immutable
+    value that no caller can change behind the grid's back.
+    """
     user: str
     team: int
     lane: int
+    grid: GridConfig = field(default=DEFAULT_GRID, repr=False, compare=False)
 
     def __post_init__(self):
-        if not (1 <= self.team <= TEAMS):
-            raise ValueError(f"Team number must be between 1 and {TEAMS}, got {self.team}.")
-        if not (1 <= self.lane <= LANES_PER_TEAM):
-            raise ValueError(f"Lane number must be between 1 and {LANES_PER_TEAM}, got {self.lane}.")
+        self.grid.validate(self.team, self.lane)
 
-    @staticmethod
-    def format_assignments(assignments: list["Assignment"]) -> str:
-        layout = {t: ["⬜" for _ in range(LANES_PER_TEAM)] for t in range(1, TEAMS + 1)}
-        for a in assignments:
-            layout[a.team][a.lane - 1] = a.user
-        output = []
-        for team, lanes in layout.items():
-            row = f"Team {team}: " + " | ".join(f"{lane}" for lane in lanes)
-            output.append(row)
-        return "\n".join(output)
+    def to_dict(self) -> Dict[str, object]:
+        """Serializable form, as stored in assignments.json."""
+        return {"user": self.user, "team": self.team, "lane": self.lane}
 
     @staticmethod
-    def to_discord_embed(assignments: list["Assignment"]) -> discord.Embed:
-        layout = {t: ["⬜" for _ in range(LANES_PER_TEAM)] for t in range(1, TEAMS + 1)}
+    def team_layout(assignments: Iterable["Assignment"],
+                    grid: GridConfig = DEFAULT_GRID) -> Dict[int, Tuple[Optional[str], ...]]:
+        """Map each team to the user in each of its lanes, None for empty lanes."""
+        layout = {t: [None] * grid.lanes for t in range(1, grid.teams + 1)}
         for a in assignments:
             layout[a.team][a.lane - 1] = a.user
+        return {team: tuple(lanes) for team, lanes in layout.items()}
+
+
+@dataclass(frozen=True)
+class ClaimResult:
+    """Definite outcome of a claim and the roster version after it."""
+    status: str
+    version: int
+    previous: Optional[Tuple[int, int]] = None
 
-        embed = discord.Embed(
-            title="📋 Team Lane Assignments",
-            description="Current team layout:",
-            color=discord.Color.green()
-        )
+    @property
+    def ok(self) -> bool:
+        return self.status in (CLAIMED, MOVED)
 
-        for team, lanes in layout.items():
-            display = " | ".join(lanes)
-            embed.add_field(name=f"Team {team}", value=display, inline=False)
 
-        return embed
+@dataclass(frozen=True)
+class ReleaseResult:
+    """Outcome of a removal and the waiting members promoted into the freed lanes."""
+    removed: bool
+    version: int
+    promoted: Tuple[Tuple[str, int, int], ...] = ()
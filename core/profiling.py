@@ -0,0 +1,145 @@
+import functools
+import glob
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Optional
+
+# cProfile, pstats and tracemalloc are imported on the first sample, keeping core cheap to import
+if TYPE_CHECKING:
+    import cProfile
+    import pstats
+    import tracemalloc
+
+
+class Profiler:
+    """
+    Sampling cProfile and tracemalloc wrapper for command handlers.
+
+    While enabled, each call of a ``@profiled`` function is sampled with
+    probability ``rate``. A sampled call runs under cProfile with tracemalloc
+    tracing, and leaves three files in ``directory``:
+    ``profile-<time>-<seq>-<name>.pstats``, a ``.tracemalloc`` snapshot and a
+    ``.txt`` top-N summary. Only the newest ``keep`` samples are kept on disk.
+    Only one call is sampled at a time, so calls nested in a sampled call and
+    calls from other threads simply run unprofiled.
+
+    Disabled by default; the hooks then cost one attribute check per call.
+    """
+
+    def __init__(self, directory: str = "profiles", rate: float = 0.1, keep: int = 20, top: int = 10):
+        self.enabled = False
+        self.directory = directory
+        self.rate = rate
+        self.keep = keep
+        self.top = top
+        self.samples = 0
+        self.recent: Deque[str] = deque(maxlen=5)
+        self._active = threading.Lock()
+        self._random = random.Random()
+
+    def enable(self, rate: Optional[float] = None):
+        if rate is not None:
+            if not 0 < rate <= 1:
+                raise ValueError(f"Sample rate must be above 0 and at most 1, got {rate}.")
+            self.rate = rate
+        os.makedirs(self.directory, exist_ok=True)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def status(self) -> str:
+        if not self.enabled:
+            return f"Profiling is off. {self.samples} samples taken since start."
+        return (f"Profiling {self.rate:.0%} of calls into {self.directory}/, "
+                f"keeping the newest {self.keep}. {self.samples} samples taken since start.")
+
+    def call(self, name: str, fn, *args, **kwargs):
+        """Run ``fn``, sampling it if profiling is on and the dice say so."""
+        if self._random.random() >= self.rate or not self._active.acquire(blocking=False):
+            return fn(*args, **kwargs)
+        try:
+            return self._sample(name, fn, args, kwargs)
+        finally:
+            self._active.release()
+
+    def _sample(self, name: str, fn, args, kwargs):
+        import cProfile
+        import tracemalloc
+
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            return profile.runcall(fn, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            # Leave the profiler's own frames out of the allocation report
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)))
+            if not was_tracing:
+                tracemalloc.stop()
+            self._write(name, elapsed, peak, profile, snapshot)
+
+    def _write(self, name: str, elapsed: float, peak: int, profile: "cProfile.Profile",
+               snapshot: "tracemalloc.Snapshot"):
+        import pstats
+
+        self.samples += 1
+        base = os.path.join(self.directory, f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{self.samples:06d}-{name}")
+        profile.dump_stats(f"{base}.pstats")
+        snapshot.dump(f"{base}.tracemalloc")
+        summary = summarize(name, elapsed, peak, pstats.Stats(profile), snapshot, self.top)
+        with open(f"{base}.txt", "w") as f:
+            f.write(summary)
+        self.recent.append(summary)
+        self._rotate()
+
+    def _rotate(self):
+        bases = sorted({path.rsplit(".", 1)[0] for path in glob.glob(os.path.join(self.directory, "profile-*"))})
+        for base in bases[:max(len(bases) - self.keep, 0)]:
+            for path in glob.glob(f"{glob.escape(base)}.*"):
+                os.remove(path)
+
+
+def summarize(name: str, elapsed: float, peak: int, stats: "pstats.Stats", snapshot: "tracemalloc.Snapshot",
+              top: int = 10) -> str:
+    """Short report of the slowest functions and largest allocation sites of one sample."""
+    lines = [f"{name}: {elapsed * 1000:.3f} ms, peak traced memory {peak / 1024:.1f} KiB",
+             f"Top {top} by cumulative time:"]
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    for (filename, line, func), (_, calls, _, cumulative, _) in rows[:top]:
+        lines.append(f"  {cumulative * 1000:9.3f} ms {calls:7d}x  {_short(filename)}:{line}({func})")
+    lines.append(f"Top {top} allocation sites:")
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        lines.append(f"  {stat.size / 1024:9.1f} KiB {stat.count:7d}x  {_short(frame.filename)}:{frame.lineno}")
+    return "\n".join(lines) + "\n"
+
+
+def _short(filename: str) -> str:
+    # Paths inside the project read better relative to it
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.relpath(filename, root) if filename.startswith(root) else filename
+
+
+PROFILER = Profiler()
+
+
+def profiled(name: str):
+    """Let ``PROFILER`` sample calls of the decorated function under ``name``."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return fn(*args, **kwargs)
+            return PROFILER.call(name, fn, *args, **kwargs)
+        return wrapper
+    return decorate
+
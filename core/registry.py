@@ -0,0 +1,109 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+
+class RepositoryRegistry:
+    """
+    Lazily opened, LRU-evicted set of per-roster repositories.
+
+    A roster's repository is created by ``factory`` the first time its key is
+    requested. Rosters idle for longer than ``idle_timeout`` seconds, or the
+    least recently used ones once more than ``max_resident`` rosters or
+    ``max_entries`` assignments are held, are flushed, closed and dropped; they
+    are reloaded from storage on their next use.
+
+    The assignment total for ``max_entries`` is kept running: only rosters
+    handed out since the last check are counted again, since only they can
+    have changed.
+    """
+
+    def __init__(self, factory: Callable[[Hashable], object], idle_timeout: Optional[float] = None,
+                 max_resident: Optional[int] = None, max_entries: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 on_evict: Optional[Callable[[Hashable], None]] = None):
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self.max_resident = max_resident
+        self.max_entries = max_entries
+        self.clock = clock
+        self.on_evict = on_evict
+        # key -> repository, least recently used first
+        self._repos: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._last_used: Dict[Hashable, float] = {}
+        # key -> assignments at its last count, and their sum
+        self._counts: Dict[Hashable, int] = {}
+        self._entries = 0
+        # Rosters handed out since their last count
+        self._touched: Set[Hashable] = set()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._repos
+
+    def __len__(self) -> int:
+        return len(self._repos)
+
+    def items(self) -> List[Tuple[Hashable, object]]:
+        """Resident (key, repository) pairs, least recently used first."""
+        return list(self._repos.items())
+
+    def get(self, key: Hashable):
+        """Return the repository for ``key``, loading it if it is not resident."""
+        repo = self._repos.get(key)
+        if repo is None:
+            repo = self._repos[key] = self.factory(key)
+        else:
+            self._repos.move_to_end(key)
+        self._last_used[key] = self.clock()
+        self._touched.add(key)
+        self._enforce_budget(keep=key)
+        return repo
+
+    def evict_idle(self):
+        """Drop every roster that has been idle past ``idle_timeout``."""
+        self._enforce_budget(keep=None)
+
+    def flush_all(self):
+        for repo in self._repos.values():
+            repo.flush()
+
+    def close_all(self):
+        while self._repos:
+            self._evict(next(iter(self._repos)))
+
+    def _enforce_budget(self, keep: Optional[Hashable]):
+        if self.idle_timeout is not None:
+            cutoff = self.clock() - self.idle_timeout
+            while self._repos:
+                oldest = next(iter(self._repos))
+                if oldest == keep or self._last_used[oldest] > cutoff:
+                    break
+                self._evict(oldest)
+        if self.max_resident is not None:
+            while len(self._repos) > self.max_resident and next(iter(self._repos)) != keep:
+                self._evict(next(iter(self._repos)))
+        if self.max_entries is not None:
+            self._recount(keep)
+            while self._entries > self.max_entries and next(iter(self._repos)) != keep:
+                self._evict(next(iter(self._repos)))
+
+    def _recount(self, keep: Optional[Hashable]):
+        for key in self._touched:
+            repo = self._repos.get(key)
+            if repo is not None:
+                count = repo.assignment_count()
+                self._entries += count - self._counts.get(key, 0)
+                self._counts[key] = count
+        self._touched.clear()
+        # The roster being handed out is about to change, so count it again next time
+        if keep is not None:
+            self._touched.add(keep)
+
+    def _evict(self, key: Hashable):
+        repo = self._repos.pop(key)
+        del self._last_used[key]
+        self._entries -= self._counts.pop(key, 0)
+        self._touched.discard(key)
+        repo.close()
+        if self.on_evict is not None:
+            self.on_evict(key)
@@ -1,71 +1,475 @@
 import json
-from typing import Dict, Optional, Tuple
-from core.models import Assignment, TEAMS, LANES_PER_TEAM
+import os
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from core.journal import AssignmentJournal
+from core.grid import Grid
+from core.history import DEFAULT_CAPACITY, Event, History, PackedState, RosterState
+from core.metrics import METRICS
+from core.profiling import profiled
+from core.models import Assignment, ClaimResult, CLAIMED, DEFAULT_GRID, GridConfig, MOVED, ReleaseResult, STALE, TAKEN
+from core.waitlist import Waitlist
+
+# A (team, lane) pair identifying one lane in the grid
+Slot = Tuple[int, int]
+# A waiting member and the (team, lane) they were promoted into
+Promotion = Tuple[str, int, int]
+
+
+class AssignmentView(Mapping):
+    """
+    Read-only ``"team-lane"`` keyed view over the repository's grid.
+
+    The repository stores assignments in a flat grid indexed by slot; this
+    view keeps the historical string keys working for callers of
+    ``assignments`` without building them on every lookup.
+    """
+
+    __slots__ = ("_repo",)
+
+    def __init__(self, repo: "InMemoryAssignmentRepository"):
+        self._repo = repo
+
+    def __getitem__(self, key: str) -> Assignment:
+        team, _, lane = str(key).partition("-")
+        try:
+            assignment = self._repo._grid.get(int(team), int(lane))
+        except ValueError:
+            assignment = None
+        if assignment is None:
+            raise KeyError(key)
+        return assignment
+
+    def __iter__(self) -> Iterator[str]:
+        return (f"{a.team}-{a.lane}" for a in self._repo._placed.values())
+
+    def __len__(self) -> int:
+        return len(self._repo._placed)
+
+    def values(self):
+        return list(self._repo._placed.values())
+
+    def items(self):
+        return [(f"{a.team}-{a.lane}", a) for a in self.values()]
+
 
 class InMemoryAssignmentRepository:
-    def __init__(self):
-        # key: "team-lane" -> value: Assignment
-        self.assignments: Dict[str, Assignment] = {}
+    def __init__(self, grid: GridConfig = DEFAULT_GRID, history: Optional[History] = None):
+        self.grid = grid
+        # Every mutation as a typed event, for undo and for rebuilding past states
+        self.history = history if history is not None else History()
+        # Flat table of member ids with per-team free-lane bitmaps; the canonical roster.
+        # It shares the history's member table, so each name is held once per roster
+        self._grid = Grid(grid, self.history.members)
+        self._members = self._grid.members
+        # key: user -> value: their Assignment, built once when placed; reverse index of the grid
+        self._placed: Dict[str, Assignment] = {}
+        self.assignments = AssignmentView(self)
+        self.waitlist = Waitlist()
+        # Bumped on every mutation; lets callers detect concurrent changes
+        self._version = 0
+        self._lock = threading.RLock()
+
+    @property
+    def version(self) -> int:
+        return self._version
 
     def assign(self, user: str, team: int, lane: int) -> bool:
-        key = f"{team}-{lane}"
-        # Check if lane is free
-        if key not in self.assignments:
-            # Ensure user isn't already assigned elsewhere
-            self.remove(user)
-            self.assignments[key] = Assignment(user, team, lane)
-            return True
-        return False
+        return self.claim(user, (team, lane)).ok
+
+    def claim(self, user: str, slot: Slot, expected_version: Optional[int] = None) -> ClaimResult:
+        """
+        Atomically put ``user`` into ``slot``, moving them out of any previous lane.
+
+        The claim fails without changing anything if the slot is held or, when
+        ``expected_version`` is given, if the roster has changed since then.
+        """
+        assignment = Assignment(user, *slot, grid=self.grid)
+        with self._lock:
+            if expected_version is not None and expected_version != self._version:
+                return ClaimResult(STALE, self._version)
+            if not self._grid.is_free(assignment.team, assignment.lane):
+                return ClaimResult(TAKEN, self._version)
+            previous = self._release(user)
+            self._place(assignment)
+            self._version += 1
+            self._log({"op": "assign", "user": user, "team": assignment.team, "lane": assignment.lane}, previous)
+            return ClaimResult(MOVED if previous else CLAIMED, self._version, previous)
+
+    def assignment_count(self) -> int:
+        return len(self._placed)
 
     def find_assignment(self, user: str) -> Optional[Assignment]:
-        for a in self.assignments.values():
-            if a.user == user:
-                return a
-        return None
+        return self._placed.get(user)
 
     def remove(self, user: str) -> bool:
-        found = False
-        for k, v in list(self.assignments.items()):
-            if v.user == user:
-                del self.assignments[k]
-                found = True
-        return found
-
-    def find_first_empty(self) -> Optional[Tuple[int, int]]:
-        for t in range(1, TEAMS + 1):
-            for l in range(1, LANES_PER_TEAM + 1):
-                if f"{t}-{l}" not in self.assignments:
-                    return (t, l)
-        return None
+        return self.release(user).removed
+
+    def release(self, user: str, promote: bool = False) -> ReleaseResult:
+        """
+        Take ``user`` out of their lane.
+
+        With ``promote``, the head of the waitlist moves into the freed lane
+        in the same mutation.
+        """
+        with self._lock:
+            slot = self._release(user)
+            if slot is None:
+                return ReleaseResult(False, self._version)
+            promoted = self._promote(iter([slot])) if promote else ()
+            self._version += 1
+            self._log(self._with_promoted({"op": "remove", "user": user}, promoted), slot)
+            return ReleaseResult(True, self._version, promoted)
+
+    def join_waitlist(self, user: str) -> Optional[int]:
+        """Queue ``user`` for the next free lane; return their 1-based position, None if they hold one."""
+        with self._lock:
+            if user in self._placed:
+                return None
+            if user not in self.waitlist:
+                self.waitlist.join(user)
+                self._version += 1
+                self._log({"op": "wait", "user": user})
+            return self.waitlist.position(user)
+
+    def leave_waitlist(self, user: str) -> bool:
+        with self._lock:
+            if not self.waitlist.leave(user):
+                return False
+            self._version += 1
+            self._log({"op": "unwait", "user": user})
+            return True
+
+    def waitlist_position(self, user: str) -> Optional[int]:
+        return self.waitlist.position(user)
+
+    def waiting(self) -> List[str]:
+        """Waiting members, head of the queue first."""
+        return list(self.waitlist)
+
+    def find_first_empty(self, team: Optional[int] = None) -> Optional[Slot]:
+        """Lowest free lane of ``team``, or of the whole grid if no team is given."""
+        return self._grid.first_free(team)
+
+    def find_least_loaded(self) -> Optional[Slot]:
+        """Lowest free lane of the team with the fewest filled lanes, the lower team on a tie."""
+        team = next(self._grid.least_loaded(), None)
+        return self._grid.first_free(team) if team else None
+
+    def team_rows(self) -> Dict[int, Tuple[Optional[str], ...]]:
+        """The user in each lane of every team, None for empty lanes."""
+        return {team: self._grid.row(team) for team in range(1, self.grid.teams + 1)}
+
+    def occupancy(self) -> Grid:
+        """The live grid, for read-only free-lane queries."""
+        return self._grid
+
+    def clear(self, promote: bool = False) -> Tuple[Promotion, ...]:
+        """
+        Empty every lane.
+
+        With ``promote``, waiting members then fill the emptied grid from the
+        head of the queue, least-filled team first, in the same mutation.
+        """
+        with self._lock:
+            self._reset()
+            promoted = self._promote(iter(self.find_least_loaded, None)) if promote else ()
+            self._version += 1
+            self._log(self._with_promoted({"op": "reset"}, promoted))
+            return promoted
+
+    def undo(self, steps: int = 1) -> List[Event]:
+        """Roll back up to ``steps`` of the latest events still in memory; return the undone events."""
+        return self._travel(self.history.undo, steps)
+
+    def redo(self, steps: int = 1) -> List[Event]:
+        """Reapply up to ``steps`` undone events; return them."""
+        return self._travel(self.history.redo, steps)
+
+    def state(self) -> RosterState:
+        """Current lanes and queue, in the form history replays produce."""
+        with self._lock:
+            return PackedState(self._grid.cells[:], self.grid, self._members.names, self.waitlist)
+
+    def events(self, limit: Optional[int] = None) -> Tuple[List[Event], int]:
+        """The latest ``limit`` events still in memory, oldest first, and the index of the one in effect."""
+        with self._lock:
+            return self.history.events(limit), self.history.cursor
+
+    @contextmanager
+    def batch(self):
+        """Group several mutations into one atomic unit of persistence."""
+        with self._lock:
+            yield self
+
+    @contextmanager
+    def reading(self):
+        """Hold the roster still while several reads are taken together; never writes."""
+        with self._lock:
+            yield self
+
+    def flush(self):
+        """Nothing to write for an in-memory repository."""
+
+    def close(self):
+        """Nothing to release for an in-memory repository."""
+
+    def _log(self, record: dict, previous: Optional[Slot] = None):
+        """Record a mutation in the history, then persist it."""
+        self.history.record(record, previous, self.state)
+        self._persist(record)
+
+    def _persist(self, record: dict):
+        """Store a mutation; in-memory rosters keep nothing."""
+
+    def _travel(self, step, steps: int) -> List[Event]:
+        with self._lock:
+            events = []
+            for _ in range(steps):
+                event = step()
+                if event is None:
+                    break
+                events.append(event)
+            if events:
+                self._load_state(self.history.state_at())
+            return events
+
+    def _load_state(self, state: RosterState):
+        """Replace lanes and queue with ``state`` as one mutation, persisted but kept out of the history."""
+        with self.batch():
+            for user in list(self.waitlist):
+                self.waitlist.leave(user)
+                self._persist({"op": "unwait", "user": user})
+            self._reset()
+            self._persist({"op": "reset"})
+            for user, (team, lane) in state.slots.items():
+                self._place(Assignment(user, team, lane, grid=self.grid))
+                self._persist({"op": "assign", "user": user, "team": team, "lane": lane})
+            for user in state.waiting:
+                self.waitlist.join(user)
+                self._persist({"op": "wait", "user": user})
+            self._version += 1
+
+    def _reset(self):
+        self._grid.clear()
+        self._placed.clear()
+
+    def _place(self, assignment: Assignment):
+        self._grid.place(assignment)
+        self._placed[assignment.user] = assignment
+        # Holding a lane ends the wait
+        self.waitlist.leave(assignment.user)
+
+    def _promote(self, slots: Iterator[Slot]) -> Tuple[Promotion, ...]:
+        """Move waiting members into ``slots`` in queue order."""
+        promoted = []
+        while self.waitlist:
+            slot = next(slots, None)
+            if slot is None:
+                break
+            assignment = Assignment(self.waitlist.pop(), *slot, grid=self.grid)
+            self._place(assignment)
+            promoted.append((assignment.user, assignment.team, assignment.lane))
+        return tuple(promoted)
+
+    @staticmethod
+    def _with_promoted(record: dict, promoted: Iterable[Promotion]) -> dict:
+        if promoted:
+            record["promoted"] = [list(p) for p in promoted]
+        return record
+
+    def _release(self, user: str) -> Optional[Slot]:
+        """Vacate the lane ``user`` holds; return it, None if they hold none."""
+        assignment = self._placed.pop(user, None)
+        if assignment is None:
+            return None
+        slot = assignment.team, assignment.lane
+        self._grid.vacate(*slot)
+        return slot
+
 
 class PersistentAssignmentRepository(InMemoryAssignmentRepository):
-    def __init__(self, path='assignments.json'):
+    """
+    Repository persisted to a JSON file.
+
+    In ``snapshot`` mode (the default) the whole file is rewritten after every
+    mutation. In ``journal`` mode each mutation is appended to
+    ``<path>.journal`` instead, fsynced according to ``fsync``, and the journal
+    is compacted into the snapshot on a background thread once it grows past
+    ``compact_bytes``. In ``deferred`` mode mutations only mark the repository
+    dirty and a background thread writes one snapshot per ``flush_interval``
+    seconds; call ``flush()`` to force the write.
+    """
+
+    MODES = ("snapshot", "journal", "deferred")
+
+    def __init__(self, path='assignments.json', mode='snapshot', fsync='always', fsync_interval=1.0,
+                 compact_bytes=1 << 20, flush_interval=1.0, grid: GridConfig = DEFAULT_GRID,
+                 history_size: int = DEFAULT_CAPACITY):
+        if mode not in self.MODES:
+            raise ValueError(f"Persistence mode must be one of {', '.join(self.MODES)}, got {mode}.")
         self.path = path
-        super().__init__()
+        self.mode = mode
+        self.compact_bytes = compact_bytes
+        self.flush_interval = flush_interval
+        # Sequence number of the last mutation applied to this repository
+        self._seq = 0
+        self._dirty = False
+        self._batch_depth = 0
+        # Serializes snapshot writes so an older snapshot never replaces a newer one
+        self._write_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._journal = AssignmentJournal(f"{path}.journal", fsync, fsync_interval) if mode == 'journal' else None
+        # Events no longer held in memory spill to <path>.history, restarted from each load
+        super().__init__(grid, History(history_size, f"{path}.history"))
         self.load()
+        self.history.reset(self.state())
+        self._stop_flusher = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if mode == 'deferred':
+            self._flusher = threading.Thread(target=self._run_flusher, name="assignment-flusher", daemon=True)
+            self._flusher.start()
 
-    def assign(self, user, team, lane):
-        if super().assign(user, team, lane):
-            self.save()
-            return True
-        return False
-
-    def remove(self, user):
-        changed = super().remove(user)
-        if changed:
-            self.save()
-        return changed
+    @contextmanager
+    def batch(self):
+        """Hold back snapshot writes and journal fsyncs until the outermost batch exits."""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    if self._journal and self._journal.fsync != "never":
+                        self._journal.sync()
+                    elif self._dirty and not self._flusher:
+                        self.save()
 
     def save(self):
-        with open(self.path, 'w') as f:
-            json.dump([a.__dict__ for a in self.assignments.values()], f)
+        with self._write_lock:
+            with self._lock:
+                data = self._snapshot()
+                self._dirty = False
+            try:
+                self._write_snapshot(data)
+            except BaseException:
+                # Still unwritten; the next save or flush tries again
+                self._dirty = True
+                raise
+
+    def flush(self):
+        """Force pending mutations to disk."""
+        if self._journal:
+            with self._lock:
+                self._journal.sync()
+        elif self._dirty:
+            self.save()
 
     def load(self):
         try:
             with open(self.path) as f:
                 data = json.load(f)
-                for entry in data:
-                    a = Assignment(**entry)
-                    self.assignments[f"{a.team}-{a.lane}"] = a
         except FileNotFoundError:
-            pass
+            data = []
+        # Legacy snapshots are a bare list; newer ones carry their sequence number and waitlist
+        waiting = []
+        if isinstance(data, dict):
+            self._seq = data.get("seq", 0)
+            waiting = data.get("waitlist", [])
+            data = data["assignments"]
+        for entry in data:
+            self._apply({"op": "assign", **entry})
+        for user in waiting:
+            self.waitlist.join(user)
+        if self._journal:
+            for record in self._journal.replay():
+                if record["seq"] > self._seq:
+                    self._apply(record)
+                    self._seq = record["seq"]
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot and drop the covered segments."""
+        if not self._journal:
+            return
+        with self._write_lock:
+            with self._lock:
+                self._journal.seal(self._seq)
+                data = self._snapshot()
+            self._write_snapshot(data)
+            self._journal.discard_through(data["seq"])
+
+    def close(self):
+        """Stop background work and write everything still pending to disk."""
+        if self._flusher:
+            self._stop_flusher.set()
+            self._flusher.join()
+            self._flusher = None
+        compactor = self._compactor
+        if compactor:
+            compactor.join()
+        self.flush()
+        self.history.close()
+        if self._journal:
+            with self._lock:
+                self._journal.close()
+
+    def _persist(self, record: dict):
+        self._seq += 1
+        if not self._journal:
+            if self._flusher or self._batch_depth:
+                self._dirty = True
+            else:
+                self.save()
+            return
+        self._journal.append({"seq": self._seq, **record}, sync=not self._batch_depth)
+        if self._journal.size >= self.compact_bytes and not (self._compactor and self._compactor.is_alive()):
+            self._compactor = threading.Thread(target=self.compact, name="journal-compactor", daemon=True)
+            self._compactor.start()
+
+    def _run_flusher(self):
+        while not self._stop_flusher.wait(self.flush_interval):
+            self.flush()
+
+    def _apply(self, record: dict):
+        """Apply a journal record without persisting it again."""
+        op = record["op"]
+        if op == "assign":
+            a = Assignment(record["user"], record["team"], record["lane"], grid=self.grid)
+            # Last record wins if a user or lane appears twice
+            self._release(a.user)
+            occupant = self._grid.get(a.team, a.lane)
+            if occupant:
+                self._release(occupant.user)
+            self._place(a)
+        elif op == "remove":
+            self._release(record["user"])
+        elif op == "reset":
+            self._reset()
+        elif op == "wait":
+            self.waitlist.join(record["user"])
+        elif op == "unwait":
+            self.waitlist.leave(record["user"])
+        for user, team, lane in record.get("promoted", ()):
+            self._place(Assignment(user, team, lane, grid=self.grid))
+
+    def _snapshot(self):
+        assignments = [a.to_dict() for a in self.assignments.values()]
+        if self._journal or self.waitlist:
+            return {"seq": self._seq, "assignments": assignments, "waitlist": list(self.waitlist)}
+        return assignments
+
+    @profiled("persist.snapshot")
+    def _write_snapshot(self, data):
+        # Write to a temporary file first so a crash never leaves a truncated snapshot
+        started = time.perf_counter()
+        payload = json.dumps(data)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        METRICS.record_write("snapshot", time.perf_counter() - started, len(payload))
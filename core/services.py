@@ -1,40 +1,226 @@
+from dataclasses import dataclass, field
+from core.history import Event
 from core.repository import InMemoryAssignmentRepository
-from core.models import Assignment
-from typing import Optional, Tuple
+from core.models import Assignment, ReleaseResult
+from core.profiling import profiled
+from core.suggestions import SuggestionEngine
+from typing import Iterable, List, Optional, Tuple
+
+
+@dataclass
+class BulkConflict:
+    user: str
+    team: int
+    lane: int
+    reason: str
+    suggestion: Optional[Tuple[int, int]] = None
+
+
+@dataclass
+class BulkResult:
+    """Outcome of a bulk assignment: who was placed and which entries were refused."""
+    assigned: List[Tuple[str, int, int]] = field(default_factory=list)
+    conflicts: List[BulkConflict] = field(default_factory=list)
+
+
+@dataclass
+class FillResult:
+    """Outcome of an auto-fill: who was placed, who already had a lane and who did not fit."""
+    assigned: List[Tuple[str, int, int]] = field(default_factory=list)
+    already_assigned: List[str] = field(default_factory=list)
+    unplaced: List[str] = field(default_factory=list)
+
 
 class AssignmentService:
-    def __init__(self, repo: InMemoryAssignmentRepository):
+    def __init__(self, repo: InMemoryAssignmentRepository, suggestions: Optional[SuggestionEngine] = None):
         self.repo = repo
+        self.suggestions = suggestions or SuggestionEngine()
+
+    @profiled("service.assign_user")
+    def assign_user(self, user: str, team: int, lane: int) -> Tuple[bool, List[Tuple[int, int]]]:
+        """
+        Try to assign a user to a specific lane. If it's unavailable, leave
+        the roster untouched and return ranked alternatives instead.
+        """
+        if self.repo.claim(user, (team, lane)).ok:
+            return True, []
+        return False, self.suggest(team, lane)
 
-    def assign_user(self, user: str, team: int, lane: int) -> Tuple[bool, Optional[Tuple[int, int]]]:
+    def suggest(self, team: int, lane: int, limit: int = 3) -> List[Tuple[int, int]]:
         """
-        Try to assign a user to a specific lane. If it's unavailable,
-        return a suggestion in the same team or elsewhere.
+        Rank free lanes to offer instead of ``(team, lane)``, best first.
         """
-        if self.repo.assign(user, team, lane):
-            return True, None
-        # Try other lanes on the same team
-        for l in range(1, 9):
-            if l != lane and self.repo.assign(user, team, l):
-                return False, (team, l)
-        # Try any lane globally
-        alt = self.repo.find_first_empty()
-        return False, alt
+        return self.suggestions.suggest(self.repo.occupancy(), team, lane, limit)
 
+    @profiled("service.assign_random")
     def assign_random(self, user: str) -> Optional[Tuple[int, int]]:
         """
-        Assign the user to the first available lane found.
+        Assign the user to a free lane of the least-filled team.
+
+        The lane is claimed against the roster version it was found at, so a
+        concurrent change makes the claim fail and the search start over
+        instead of double-booking the lane.
         """
-        slot = self.repo.find_first_empty()
-        if slot:
-            self.repo.assign(user, *slot)
-        return slot
+        while True:
+            version = self.repo.version
+            slot = self.repo.find_least_loaded()
+            if slot is None:
+                return None
+            if self.repo.claim(user, slot, expected_version=version).ok:
+                return slot
+
+    @profiled("service.auto_fill")
+    def auto_fill(self, users: Iterable[str]) -> FillResult:
+        """
+        Place a waiting list of users on the least-filled teams in one batch.
+
+        Users who already hold a lane keep it. Everyone placed is written to
+        storage in a single persistence write; whoever does not fit is
+        reported as unplaced.
+        """
+        result = FillResult()
+        seen = set()
+        with self.repo.batch():
+            for user in users:
+                if user in seen:
+                    continue
+                seen.add(user)
+                if self.repo.find_assignment(user):
+                    result.already_assigned.append(user)
+                    continue
+                slot = self.repo.find_least_loaded()
+                if slot is None:
+                    result.unplaced.append(user)
+                    continue
+                self.repo.claim(user, slot)
+                result.assigned.append((user, *slot))
+        return result
+
+    @profiled("service.bulk_assign")
+    def bulk_assign(self, entries: Iterable[Tuple[str, int, int]]) -> BulkResult:
+        """
+        Assign many users at once as a single atomic batch.
+
+        Every entry is validated against the roster before anything changes.
+        Entries that fit are applied together in one persistence write; users
+        may swap lanes within the batch. The rest are reported as conflicts,
+        each with a distinct free lane suggested where one is left.
+        """
+        result = BulkResult()
+        candidates = []
+        users, slots = set(), set()
+        for user, team, lane in entries:
+            try:
+                self.repo.grid.validate(team, lane)
+            except ValueError as e:
+                result.conflicts.append(BulkConflict(user, team, lane, str(e)))
+                continue
+            if user in users:
+                result.conflicts.append(BulkConflict(user, team, lane, f"{user} is listed more than once."))
+            elif (team, lane) in slots:
+                result.conflicts.append(BulkConflict(user, team, lane, f"Team {team} Lane {lane} is listed more than once."))
+            else:
+                users.add(user)
+                slots.add((team, lane))
+                candidates.append((user, team, lane))
+
+        with self.repo.batch():
+            current = self.repo.assignments
+            # A lane held by someone who moves within the batch counts as free;
+            # drop blocked entries until the remaining moves are consistent.
+            while True:
+                movers = {user for user, _, _ in candidates}
+                blocked = []
+                for user, team, lane in candidates:
+                    occupant = current.get(f"{team}-{lane}")
+                    if occupant and occupant.user != user and occupant.user not in movers:
+                        blocked.append((user, team, lane, occupant.user))
+                if not blocked:
+                    break
+                for user, team, lane, holder in blocked:
+                    candidates.remove((user, team, lane))
+                    result.conflicts.append(BulkConflict(user, team, lane, f"Lane taken by {holder}."))
+
+            moves = [(user, team, lane) for user, team, lane in candidates
+                     if not (current.get(f"{team}-{lane}") and current[f"{team}-{lane}"].user == user)]
+            # Free every lane being vacated first so swaps inside the batch succeed
+            for user, _, _ in moves:
+                self.repo.remove(user)
+            for user, team, lane in moves:
+                self.repo.claim(user, (team, lane))
+            result.assigned = candidates
+
+            # Hand out each remaining free lane at most once
+            grid = self.repo.occupancy()
+            suggested = set()
+            for conflict in result.conflicts:
+                best = self.suggestions.suggest(grid, conflict.team, conflict.lane, 1, exclude=suggested)
+                if best:
+                    conflict.suggestion = best[0]
+                    suggested.add(best[0])
+        return result
 
     def remove_user(self, user: str) -> bool:
         """
-        Remove the user from their assigned lane.
+        Remove the user from their assigned lane; the head of the waitlist takes it.
+        """
+        return self.release_user(user).removed
+
+    @profiled("service.release_user")
+    def release_user(self, user: str) -> ReleaseResult:
+        """
+        Remove the user from their lane and report who was promoted into it.
+        """
+        return self.repo.release(user, promote=True)
+
+    @profiled("service.reset")
+    def reset(self) -> Tuple[Tuple[str, int, int], ...]:
+        """
+        Empty the roster and fill it again from the waitlist.
+        """
+        return self.repo.clear(promote=True)
+
+    @profiled("service.undo")
+    def undo(self, steps: int = 1) -> List[Event]:
+        """
+        Roll the roster back over its latest events; return the events undone, newest first.
+        """
+        return self.repo.undo(steps)
+
+    @profiled("service.redo")
+    def redo(self, steps: int = 1) -> List[Event]:
+        """
+        Reapply events that were undone; return them, oldest first.
+        """
+        return self.repo.redo(steps)
+
+    def history(self, limit: Optional[int] = None) -> Tuple[List[Event], int]:
+        """
+        Return the latest events, oldest first, and the index of the event in effect.
+        """
+        return self.repo.events(limit)
+
+    @profiled("service.join_waitlist")
+    def join_waitlist(self, user: str) -> Optional[int]:
+        """
+        Queue the user for the next free lane.
+
+        Returns their 1-based position, or None if they already hold a lane.
+        """
+        return self.repo.join_waitlist(user)
+
+    @profiled("service.leave_waitlist")
+    def leave_waitlist(self, user: str) -> bool:
+        return self.repo.leave_waitlist(user)
+
+    def waitlist_position(self, user: str) -> Optional[int]:
+        return self.repo.waitlist_position(user)
+
+    def waiting(self) -> List[str]:
+        """
+        Return the waiting members, head of the queue first.
         """
-        return self.repo.remove(user)
+        return self.repo.waiting()
 
     def find_user_assignment(self, user: str) -> Optional[Assignment]:
         """
@@ -0,0 +1,399 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.grid import Grid
+from core.history import DEFAULT_CAPACITY, Event, History, RosterState
+from core.members import MemberTable
+from core.metrics import METRICS
+from core.models import Assignment, ClaimResult, CLAIMED, DEFAULT_GRID, GridConfig, MOVED, ReleaseResult, STALE, TAKEN
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assignments (
+    roster TEXT NOT NULL,
+    team INTEGER NOT NULL,
+    lane INTEGER NOT NULL,
+    user TEXT NOT NULL,
+    UNIQUE (roster, team, lane)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_assignments_user ON assignments (roster, user);
+CREATE TABLE IF NOT EXISTS roster_versions (
+    roster TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS waitlist (
+    ticket INTEGER PRIMARY KEY AUTOINCREMENT,
+    roster TEXT NOT NULL,
+    user TEXT NOT NULL,
+    UNIQUE (roster, user)
+);
+CREATE INDEX IF NOT EXISTS idx_waitlist_ticket ON waitlist (roster, ticket);
+"""
+
+# Statements are kept as module constants so sqlite3's statement cache reuses
+# the prepared form on every call.
+SELECT_BY_SLOT = "SELECT user FROM assignments WHERE roster = ? AND team = ? AND lane = ?"
+SELECT_BY_USER = "SELECT team, lane FROM assignments WHERE roster = ? AND user = ?"
+SELECT_ALL = "SELECT user, team, lane FROM assignments WHERE roster = ? ORDER BY team, lane"
+COUNT_ALL = "SELECT COUNT(*) FROM assignments WHERE roster = ?"
+INSERT = "INSERT INTO assignments (roster, team, lane, user) VALUES (?, ?, ?, ?)"
+DELETE_BY_USER = "DELETE FROM assignments WHERE roster = ? AND user = ?"
+DELETE_ROSTER = "DELETE FROM assignments WHERE roster = ?"
+CLEAR_WAITLIST = "DELETE FROM waitlist WHERE roster = ?"
+JOIN_WAITLIST = "INSERT OR IGNORE INTO waitlist (roster, user) VALUES (?, ?)"
+LEAVE_WAITLIST = "DELETE FROM waitlist WHERE roster = ? AND user = ?"
+POP_WAITLIST = "DELETE FROM waitlist WHERE ticket = ?"
+SELECT_WAITLIST_HEAD = "SELECT ticket, user FROM waitlist WHERE roster = ? ORDER BY ticket LIMIT 1"
+SELECT_WAITLIST = "SELECT user FROM waitlist WHERE roster = ? ORDER BY ticket"
+SELECT_WAITLIST_POSITION = """
+SELECT COUNT(*) FROM waitlist
+WHERE roster = :roster AND ticket <= (SELECT ticket FROM waitlist WHERE roster = :roster AND user = :user)
+"""
+SELECT_VERSION = "SELECT version FROM roster_versions WHERE roster = ?"
+BUMP_VERSION = """
+INSERT INTO roster_versions (roster, version) VALUES (?, 1)
+ON CONFLICT (roster) DO UPDATE SET version = version + 1
+"""
+# Walks slot numbers in team/lane order and probes the unique index for each
+SELECT_FIRST_EMPTY = """
+WITH RECURSIVE slots(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM slots WHERE n + 1 < :slots)
+SELECT n / :lanes + 1, n % :lanes + 1 FROM slots
+WHERE NOT EXISTS (
+    SELECT 1 FROM assignments
+    WHERE roster = :roster AND team = n / :lanes + 1 AND lane = n % :lanes + 1
+)
+LIMIT 1
+"""
+SELECT_FIRST_EMPTY_IN_TEAM = """
+WITH RECURSIVE lanes(lane) AS (SELECT 1 UNION ALL SELECT lane + 1 FROM lanes WHERE lane < :lanes)
+SELECT :team, lane FROM lanes
+WHERE NOT EXISTS (SELECT 1 FROM assignments WHERE roster = :roster AND team = :team AND lane = lanes.lane)
+LIMIT 1
+"""
+# Counts every team's rows, including teams with none, and keeps the emptiest with room
+SELECT_LEAST_LOADED_TEAM = """
+WITH RECURSIVE teams(team) AS (SELECT 1 UNION ALL SELECT team + 1 FROM teams WHERE team < :teams)
+SELECT teams.team FROM teams
+LEFT JOIN assignments ON assignments.roster = :roster AND assignments.team = teams.team
+GROUP BY teams.team
+HAVING COUNT(assignments.user) < :lanes
+ORDER BY COUNT(assignments.user), teams.team
+LIMIT 1
+"""
+
+
+class SqliteAssignmentRepository:
+    """
+    Repository backed by a local SQLite database in WAL mode.
+
+    Several rosters can share one database file; each repository instance
+    works on the rows of its own ``roster``.
+
+    Mutations made through this instance are recorded in an in-memory
+    ``History``, restarted from each open like the JSON backend's, so undo
+    and redo cover the latest changes; there is no spill file. A transaction
+    that rolls back after recording events restarts the history from the
+    rows as they are.
+    """
+
+    def __init__(self, path: str = 'assignments.db', roster: str = 'default', grid: GridConfig = DEFAULT_GRID,
+                 history_size: int = DEFAULT_CAPACITY):
+        self.path = path
+        self.roster = roster
+        self.grid = grid
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Names of the roster's members, for its history and occupancy snapshots
+        self.members = MemberTable()
+        self.history = History(history_size, members=self.members)
+        state = self.state()
+        for user in (*state.slots, *state.waiting):
+            self.members.intern(user)
+        self.history.reset(state)
+
+    @property
+    def assignments(self) -> Dict[str, Assignment]:
+        """Snapshot of the roster keyed by ``"team-lane"``."""
+        with self._lock:
+            rows = self._conn.execute(SELECT_ALL, (self.roster,)).fetchall()
+        return {f"{team}-{lane}": Assignment(user, team, lane, grid=self.grid) for user, team, lane in rows}
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return self._read_version(self._conn)
+
+    def assign(self, user: str, team: int, lane: int) -> bool:
+        return self.claim(user, (team, lane)).ok
+
+    def claim(self, user: str, slot: Tuple[int, int], expected_version: Optional[int] = None) -> ClaimResult:
+        """
+        Atomically put ``user`` into ``slot``, moving them out of any previous lane.
+
+        Runs in an immediate transaction, so the check and the move are atomic
+        across every connection and process sharing the database.
+        """
+        team, lane = slot
+        self.grid.validate(team, lane)
+        with self._transaction() as conn:
+            version = self._read_version(conn)
+            if expected_version is not None and expected_version != version:
+                return ClaimResult(STALE, version)
+            if conn.execute(SELECT_BY_SLOT, (self.roster, team, lane)).fetchone():
+                return ClaimResult(TAKEN, version)
+            previous = conn.execute(SELECT_BY_USER, (self.roster, user)).fetchone()
+            conn.execute(DELETE_BY_USER, (self.roster, user))
+            conn.execute(INSERT, (self.roster, team, lane, user))
+            conn.execute(LEAVE_WAITLIST, (self.roster, user))
+            conn.execute(BUMP_VERSION, (self.roster,))
+            previous = tuple(previous) if previous else None
+            self.history.record({"op": "assign", "user": user, "team": team, "lane": lane}, previous, self.state)
+            return ClaimResult(MOVED if previous else CLAIMED, version + 1, previous)
+
+    def assignment_count(self) -> int:
+        with self._lock:
+            return self._conn.execute(COUNT_ALL, (self.roster,)).fetchone()[0]
+
+    def find_assignment(self, user: str) -> Optional[Assignment]:
+        with self._lock:
+            row = self._conn.execute(SELECT_BY_USER, (self.roster, user)).fetchone()
+        return Assignment(user, *row, grid=self.grid) if row else None
+
+    def remove(self, user: str) -> bool:
+        return self.release(user).removed
+
+    def release(self, user: str, promote: bool = False) -> ReleaseResult:
+        """
+        Take ``user`` out of their lane.
+
+        With ``promote``, the head of the waitlist moves into the freed lane
+        in the same transaction.
+        """
+        with self._transaction() as conn:
+            slot = conn.execute(SELECT_BY_USER, (self.roster, user)).fetchone()
+            if slot is None:
+                return ReleaseResult(False, self._read_version(conn))
+            conn.execute(DELETE_BY_USER, (self.roster, user))
+            promoted = self._promote(conn, iter([tuple(slot)])) if promote else ()
+            conn.execute(BUMP_VERSION, (self.roster,))
+            self.history.record(self._with_promoted({"op": "remove", "user": user}, promoted), tuple(slot),
+                                self.state)
+            return ReleaseResult(True, self._read_version(conn), promoted)
+
+    def join_waitlist(self, user: str) -> Optional[int]:
+        """Queue ``user`` for the next free lane; return their 1-based position, None if they hold one."""
+        with self._transaction() as conn:
+            if conn.execute(SELECT_BY_USER, (self.roster, user)).fetchone():
+                return None
+            if conn.execute(JOIN_WAITLIST, (self.roster, user)).rowcount:
+                conn.execute(BUMP_VERSION, (self.roster,))
+                self.history.record({"op": "wait", "user": user}, None, self.state)
+            return self.waitlist_position(user)
+
+    def leave_waitlist(self, user: str) -> bool:
+        with self._transaction() as conn:
+            if conn.execute(LEAVE_WAITLIST, (self.roster, user)).rowcount == 0:
+                return False
+            conn.execute(BUMP_VERSION, (self.roster,))
+            self.history.record({"op": "unwait", "user": user}, None, self.state)
+            return True
+
+    def waitlist_position(self, user: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(SELECT_WAITLIST_POSITION, {"roster": self.roster, "user": user}).fetchone()
+        return row[0] or None
+
+    def waiting(self) -> List[str]:
+        """Waiting members, head of the queue first."""
+        with self._lock:
+            return [user for user, in self._conn.execute(SELECT_WAITLIST, (self.roster,))]
+
+    def find_first_empty(self, team: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """Lowest free lane of ``team``, or of the whole grid if no team is given."""
+        params = {"slots": self.grid.size, "lanes": self.grid.lanes, "roster": self.roster, "team": team}
+        with self._lock:
+            row = self._conn.execute(SELECT_FIRST_EMPTY if team is None else SELECT_FIRST_EMPTY_IN_TEAM,
+                                     params).fetchone()
+        return tuple(row) if row else None
+
+    def find_least_loaded(self) -> Optional[Tuple[int, int]]:
+        """Lowest free lane of the team with the fewest filled lanes, the lower team on a tie."""
+        params = {"teams": self.grid.teams, "lanes": self.grid.lanes, "roster": self.roster}
+        with self._lock:
+            row = self._conn.execute(SELECT_LEAST_LOADED_TEAM, params).fetchone()
+            return self.find_first_empty(row[0]) if row else None
+
+    def team_rows(self) -> Dict[int, Tuple[Optional[str], ...]]:
+        """The user in each lane of every team, None for empty lanes."""
+        return Assignment.team_layout(self.assignments.values(), self.grid)
+
+    def occupancy(self) -> Grid:
+        """A snapshot of the roster's free lanes for read-only queries."""
+        grid = Grid(self.grid, self.members)
+        for assignment in self.assignments.values():
+            grid.place(assignment)
+        return grid
+
+    def clear(self, promote: bool = False) -> Tuple[Tuple[str, int, int], ...]:
+        """
+        Empty every lane.
+
+        With ``promote``, waiting members then fill the emptied grid from the
+        head of the queue, least-filled team first, in the same transaction.
+        """
+        with self._transaction() as conn:
+            conn.execute(DELETE_ROSTER, (self.roster,))
+            promoted = self._promote(conn, iter(self.find_least_loaded, None)) if promote else ()
+            conn.execute(BUMP_VERSION, (self.roster,))
+            self.history.record(self._with_promoted({"op": "reset"}, promoted), None, self.state)
+            return promoted
+
+    def undo(self, steps: int = 1) -> List[Event]:
+        """Roll back up to ``steps`` of the latest events still in memory; return the undone events."""
+        return self._travel(self.history.undo, steps)
+
+    def redo(self, steps: int = 1) -> List[Event]:
+        """Reapply up to ``steps`` undone events; return them."""
+        return self._travel(self.history.redo, steps)
+
+    def state(self) -> RosterState:
+        """Current lanes and queue, in the form history replays produce."""
+        with self._lock:
+            rows = self._conn.execute(SELECT_ALL, (self.roster,)).fetchall()
+            return RosterState({user: (team, lane) for user, team, lane in rows}, self.waiting())
+
+    def events(self, limit: Optional[int] = None) -> Tuple[List[Event], int]:
+        """The latest events in memory, oldest first, and the index of the event in effect."""
+        with self._lock:
+            return self.history.events(limit), self.history.cursor
+
+    def import_json(self, json_path: str) -> int:
+        """
+        Replace this roster with the contents of a JSON assignment store.
+
+        Returns:
+            int: The number of imported assignments
+        """
+        # Imported lazily; only needed for the one-shot migration
+        from core.repository import PersistentAssignmentRepository
+
+        source = PersistentAssignmentRepository(json_path, grid=self.grid)
+        try:
+            rows = [(self.roster, a.team, a.lane, a.user) for a in source.assignments.values()]
+            waiting = list(source.waitlist)
+        finally:
+            source.close()
+        with self._transaction() as conn:
+            conn.execute(DELETE_ROSTER, (self.roster,))
+            conn.executemany(INSERT, rows)
+            conn.execute(CLEAR_WAITLIST, (self.roster,))
+            conn.executemany(JOIN_WAITLIST, [(self.roster, user) for user in waiting])
+            conn.execute(BUMP_VERSION, (self.roster,))
+            self.history.reset(self.state())
+        return len(rows)
+
+    def batch(self):
+        """Run several mutations in one transaction."""
+        return self._transaction()
+
+    @contextmanager
+    def reading(self):
+        """Hold the roster still while several reads are taken together, in a read-only transaction."""
+        with self._lock:
+            if self._depth:
+                # Already inside a transaction, which sees one state throughout
+                yield self
+                return
+            # Deferred: takes no write lock and has nothing to sync when it ends
+            self._conn.execute("BEGIN")
+            try:
+                yield self
+            finally:
+                self._conn.execute("COMMIT")
+
+    def flush(self):
+        """Committed rows are already durable; fold the WAL back into the database."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _travel(self, step, steps: int) -> List[Event]:
+        with self._transaction() as conn:
+            events = []
+            for _ in range(steps):
+                event = step()
+                if event is None:
+                    break
+                events.append(event)
+            if events:
+                # Rewrite the roster's rows as one mutation, kept out of the history
+                state = self.history.state_at()
+                conn.execute(DELETE_ROSTER, (self.roster,))
+                conn.executemany(INSERT, [(self.roster, team, lane, user)
+                                          for user, (team, lane) in state.slots.items()])
+                conn.execute(CLEAR_WAITLIST, (self.roster,))
+                conn.executemany(JOIN_WAITLIST, [(self.roster, user) for user in state.waiting])
+                conn.execute(BUMP_VERSION, (self.roster,))
+            return events
+
+    @staticmethod
+    def _with_promoted(record: dict, promoted: Tuple[Tuple[str, int, int], ...]) -> dict:
+        if promoted:
+            record["promoted"] = [list(p) for p in promoted]
+        return record
+
+    def _promote(self, conn, slots: Iterator[Tuple[int, int]]) -> Tuple[Tuple[str, int, int], ...]:
+        """Move waiting members into ``slots`` in queue order."""
+        promoted = []
+        while True:
+            head = conn.execute(SELECT_WAITLIST_HEAD, (self.roster,)).fetchone()
+            slot = next(slots, None) if head else None
+            if slot is None:
+                break
+            ticket, user = head
+            conn.execute(POP_WAITLIST, (ticket,))
+            conn.execute(INSERT, (self.roster, *slot, user))
+            promoted.append((user, *slot))
+        return tuple(promoted)
+
+    def _read_version(self, conn) -> int:
+        row = conn.execute(SELECT_VERSION, (self.roster,)).fetchone()
+        return row[0] if row else 0
+
+    @contextmanager
+    def _transaction(self):
+        # Nested transactions become savepoints so a failing inner step only undoes itself
+        with self._lock:
+            savepoint = f"sp{self._depth}"
+            self._conn.execute(f"SAVEPOINT {savepoint}" if self._depth else "BEGIN IMMEDIATE")
+            self._depth += 1
+            recorded = (self.history.cursor, self.history.last_seq)
+            try:
+                yield self._conn
+            except BaseException:
+                self._depth -= 1
+                if self._depth:
+                    self._conn.execute(f"ROLLBACK TO {savepoint}")
+                    self._conn.execute(f"RELEASE {savepoint}")
+                else:
+                    self._conn.execute("ROLLBACK")
+                if (self.history.cursor, self.history.last_seq) != recorded:
+                    # Events of the rolled back changes are in the history; start it over from the rows
+                    self.history.reset(self.state())
+                raise
+            self._depth -= 1
+            if self._depth:
+                self._conn.execute(f"RELEASE {savepoint}")
+            else:
+                started = time.perf_counter()
+                self._conn.execute("COMMIT")
+                METRICS.record_write("sqlite", time.perf_counter() - started)
@@ -0,0 +1,67 @@
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from core.grid import Grid
+
+Slot = Tuple[int, int]
+
+# A policy ranks free lanes for a request of (team, lane) without changing the grid
+Policy = Callable[[Grid, int, int], Iterable[Slot]]
+
+
+def nearest_in_team(grid: Grid, team: int, lane: int) -> Iterator[Slot]:
+    """Free lanes of the requested team, closest to the requested lane first."""
+    if not 1 <= team <= grid.config.teams:
+        return iter(())
+    return grid.nearest_free(team, min(max(lane, 1), grid.config.lanes))
+
+
+def least_loaded_team(grid: Grid, team: int, lane: int) -> Iterator[Slot]:
+    """The lowest free lane of every other team, emptiest team first."""
+    return (grid.first_free(t) for t in grid.least_loaded() if t != team)
+
+
+def any_free(grid: Grid, team: int, lane: int) -> Iterator[Slot]:
+    """The lowest free lane of every team, in team order."""
+    return (grid.first_free(t) for t in grid.open_teams())
+
+
+POLICIES: Dict[str, Policy] = {
+    "nearest": nearest_in_team,
+    "least_loaded": least_loaded_team,
+    "any": any_free,
+}
+DEFAULT_POLICIES = ("nearest", "least_loaded", "any")
+
+
+class SuggestionEngine:
+    """
+    Read-only ranking of free lanes to offer when a requested lane is taken.
+
+    Policies are consulted in order and their lanes merged without
+    duplicates, so earlier policies rank higher. Each policy answers from the
+    grid's free-lane bitmaps and stops as soon as enough lanes are found.
+    """
+
+    def __init__(self, policies: Optional[Sequence[Policy]] = None):
+        self.policies: List[Policy] = list(policies or [POLICIES[name] for name in DEFAULT_POLICIES])
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "SuggestionEngine":
+        """Build an engine from policy names such as ``("nearest", "any")``."""
+        try:
+            return cls([POLICIES[name] for name in names])
+        except KeyError as e:
+            raise ValueError(f"Suggestion policy must be one of {', '.join(POLICIES)}, got {e.args[0]}.") from None
+
+    def suggest(self, grid: Grid, team: int, lane: int, limit: int = 3,
+                exclude: Iterable[Slot] = ()) -> List[Slot]:
+        """Up to ``limit`` free lanes for a request of ``(team, lane)``, best first, skipping ``exclude``."""
+        return list(islice(self._ranked(grid, team, lane, set(exclude)), limit))
+
+    def _ranked(self, grid: Grid, team: int, lane: int, seen: set) -> Iterator[Slot]:
+        for policy in self.policies:
+            for slot in policy(grid, team, lane):
+                if slot not in seen:
+                    seen.add(slot)
+                    yield slot
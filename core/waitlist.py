@@ -0,0 +1,132 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class _Fenwick:
+    """Marks over a growing run of tickets; marking one and counting those below a ticket are O(log n)."""
+
+    __slots__ = ("_tree",)
+
+    def __init__(self, size: int = 0):
+        # 1-based: node i covers tickets i - (i & -i) up to i - 1
+        self._tree: List[int] = [0] * (size + 1)
+
+    def append(self):
+        """Extend the run by one unmarked ticket."""
+        i = len(self._tree)
+        # The new node covers tickets already counted, plus its own
+        self._tree.append(self.count(i - 1) - self.count(i - (i & -i)))
+
+    def mark(self, ticket: int):
+        tree = self._tree
+        i = ticket + 1
+        while i < len(tree):
+            tree[i] += 1
+            i += i & -i
+
+    def count(self, ticket: int) -> int:
+        """Marked tickets below ``ticket``."""
+        tree = self._tree
+        total = 0
+        while ticket > 0:
+            total += tree[ticket]
+            ticket -= ticket & -ticket
+        return total
+
+
+class Waitlist:
+    """
+    First-come, first-served queue of members waiting for a lane.
+
+    Every member who joins draws the next ticket. The deque holds tickets in
+    arrival order and ``_tickets`` maps each waiting member to theirs. Leaving
+    only forgets the ticket and notes it as departed; its deque entry is
+    skipped once it reaches the head. A Fenwick tree marks every ticket that
+    is gone, departed or popped, so ``position`` is the ticket minus the gone
+    tickets below it, O(log n). Tickets are renumbered when gone ones
+    outnumber waiting members, so joining, leaving and popping stay amortised
+    O(log n) and memory stays proportional to the queue.
+    """
+
+    __slots__ = ("_queue", "_tickets", "_departed", "_gone", "_next_ticket")
+
+    def __init__(self, members: Iterable[str] = ()):
+        self._queue: Deque[Tuple[int, str]] = deque()
+        self._tickets: Dict[str, int] = {}
+        self._departed: Set[int] = set()
+        self._gone = _Fenwick()
+        self._next_ticket = 0
+        for member in members:
+            self.join(member)
+
+    def join(self, member: str) -> int:
+        """Queue ``member`` at the back unless already waiting; return their position."""
+        if member in self._tickets:
+            return self.position(member)
+        self._tickets[member] = self._next_ticket
+        self._queue.append((self._next_ticket, member))
+        self._gone.append()
+        self._next_ticket += 1
+        return len(self._tickets)
+
+    def leave(self, member: str) -> bool:
+        ticket = self._tickets.pop(member, None)
+        if ticket is None:
+            return False
+        self._departed.add(ticket)
+        self._gone.mark(ticket)
+        self._drop_departed_head()
+        self._compact_if_sparse()
+        return True
+
+    def pop(self) -> Optional[str]:
+        """Remove and return the member at the head of the queue."""
+        if not self._queue:
+            return None
+        ticket, member = self._queue.popleft()
+        del self._tickets[member]
+        self._gone.mark(ticket)
+        self._drop_departed_head()
+        self._compact_if_sparse()
+        return member
+
+    def position(self, member: str) -> Optional[int]:
+        """1-based place of ``member`` in the queue, or None if not waiting."""
+        ticket = self._tickets.get(member)
+        if ticket is None:
+            return None
+        return ticket - self._gone.count(ticket) + 1
+
+    def clear(self):
+        self._queue.clear()
+        self._tickets.clear()
+        self._departed.clear()
+        self._gone = _Fenwick()
+        self._next_ticket = 0
+
+    def __contains__(self, member: str) -> bool:
+        return member in self._tickets
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def __iter__(self) -> Iterator[str]:
+        return (member for ticket, member in self._queue if self._tickets.get(member) == ticket)
+
+    def _compact_if_sparse(self):
+        if self._next_ticket - len(self._tickets) > len(self._tickets):
+            self._compact()
+
+    def _compact(self):
+        # Renumber the members still waiting from 0; no ticket is gone afterwards
+        waiting = list(self)
+        self._queue = deque(enumerate(waiting))
+        self._tickets = {member: ticket for ticket, member in self._queue}
+        self._departed.clear()
+        self._gone = _Fenwick(len(waiting))
+        self._next_ticket = len(waiting)
+
+    def _drop_departed_head(self):
+        # Departed entries are only skipped here; their tickets stay marked as gone
+        while self._queue and self._queue[0][0] in self._departed:
+            self._departed.remove(self._queue.popleft()[0])
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class CommandPipeline:
+    """
+    Per-roster single-writer queue for mutating commands.
+
+    Each roster key gets its own ``asyncio.Queue`` consumed by one writer task,
+    so mutations of one roster never interleave while different rosters
+    proceed independently. The writer drains whatever has queued up and runs
+    it inside one ``repo.batch()``, turning a burst into a single persistence
+    write; callers get their results once that write is done. When the write
+    fails, a backend that rolled the batch back gives every caller the error;
+    one that kept the changes in memory, to persist them with its next write,
+    gives callers their commands' real results and passes the error to
+    ``on_write_error`` instead. Reads do not go through the pipeline.
+    """
+
+    def __init__(self, repo_for: Callable[[Hashable], Any], max_batch: int = 100,
+                 on_write_error: Optional[Callable[[Hashable, Exception], None]] = None):
+        self.repo_for = repo_for
+        self.max_batch = max_batch
+        self.on_write_error = on_write_error or _report_write_error
+        self._queues: Dict[Hashable, asyncio.Queue] = {}
+        self._writers: Dict[Hashable, asyncio.Task] = {}
+        # Guards ``_queues`` against ``depths`` called from the metrics server's thread
+        self._lock = threading.Lock()
+
+    def depth(self, key: Hashable) -> int:
+        """Number of commands waiting for the roster's writer."""
+        queue = self._queues.get(key)
+        return queue.qsize() if queue else 0
+
+    def depths(self) -> Dict[Hashable, int]:
+        """Queue depth of every roster that has a writer; safe to call from any thread."""
+        with self._lock:
+            return {key: queue.qsize() for key, queue in self._queues.items()}
+
+    async def submit(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Queue ``fn`` on the roster's writer and wait for its result."""
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = asyncio.Queue()
+            with self._lock:
+                self._queues[key] = queue
+            self._writers[key] = asyncio.create_task(self._run_writer(key, queue))
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((fn, future))
+        return await future
+
+    async def close(self):
+        """Let queued commands finish, then stop every writer."""
+        for queue in list(self._queues.values()):
+            await queue.join()
+        for writer in self._writers.values():
+            writer.cancel()
+        await asyncio.gather(*self._writers.values(), return_exceptions=True)
+        with self._lock:
+            self._queues.clear()
+        self._writers.clear()
+
+    def discard(self, key: Hashable):
+        """Stop the roster's writer if nothing is queued for it, e.g. once the roster is evicted."""
+        queue = self._queues.get(key)
+        if queue is None or not queue.empty():
+            return
+        with self._lock:
+            del self._queues[key]
+        self._writers.pop(key).cancel()
+
+    async def _run_writer(self, key: Hashable, queue: asyncio.Queue):
+        while True:
+            batch: List[Tuple[Callable[[], Any], asyncio.Future]] = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            outcomes: List[Tuple[asyncio.Future, Any, Optional[BaseException]]] = []
+            repo = version = None
+            try:
+                repo = self.repo_for(key)
+                version = repo.version
+                with repo.batch():
+                    for fn, future in batch:
+                        try:
+                            outcomes.append((future, fn(), None))
+                        except Exception as e:
+                            outcomes.append((future, None, e))
+            except Exception as e:
+                if repo is None or repo.version == version:
+                    # Never started or rolled back: none of the batch's commands took effect
+                    outcomes = [(future, None, e) for _, future in batch]
+                else:
+                    # The changes stand and go out with the roster's next write
+                    self.on_write_error(key, e)
+            # Callers only hear back once the batch's write is done
+            for future, result, error in outcomes:
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+            for _ in batch:
+                queue.task_done()
+
+
+def _report_write_error(key: Hashable, error: Exception):
+    print(f"❌ Failed to write roster {key}, retrying with its next write: {error}")
@@ -1,75 +1,375 @@
-from core.models import Assignment
+from core.backup import Backup, BackupManager
+from core.metrics import METRICS, instrumented
+from core.models import Assignment, DEFAULT_GRID, GridConfig
+from core.registry import RepositoryRegistry
 from core.repository import PersistentAssignmentRepository
 from core.services import AssignmentService
-import shutil
+from core.suggestions import DEFAULT_POLICIES, SuggestionEngine
+from core.sqlite_repository import SqliteAssignmentRepository
+from infrastructure.command_pipeline import CommandPipeline
+from infrastructure.live_board import LiveBoard
+from infrastructure.outbox import Outbox
+from infrastructure.rate_limit import ChannelLimiter
+from interfaces.command_grammar import CommandError, GRAMMAR
+from interfaces.command_parser import (WAITLIST_HINT, apply_profile_command, format_backups, format_bulk_summary,
+                                       format_events, format_fill_summary, format_promotions, format_suggestions,
+                                       format_travel, format_waitlist, parse_bulk_entries, parse_fill_members)
+from interfaces.autocomplete import Autocomplete
+from interfaces.render_cache import RenderCache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
 import os
 
+BACKENDS = ("json", "sqlite")
+
+# Store used by the home guild, and by every roster before per-guild storage existed
+LEGACY_PATH = "assignments.json"
+SQLITE_PATH = "assignments.db"
+
+
+def reply_outcome(reply: str) -> str:
+    """Metrics outcome of a handler reply: refused (❌), invalid (❗) or ok."""
+    if reply.startswith("❌"):
+        return "refused"
+    if reply.startswith("❗"):
+        return "invalid"
+    return "ok"
+
+
 class DiscordAdapter:
-    def __init__(self):
-        self.repo = PersistentAssignmentRepository()
-        self.service = AssignmentService(self.repo)
-
-    def _parse_args(self, args: str):
-        parts = args.strip().split()
-        opts = {}
-        i = 0
-        while i < len(parts):
-            if parts[i].startswith('--'):
-                key = parts[i][2:]
-                value = parts[i + 1] if i + 1 < len(parts) and not parts[i + 1].startswith('--') else True
-                opts[key] = value
-                i += 2 if isinstance(value, str) else 1
-            else:
-                i += 1
-        return opts
+    def __init__(self, persistence_mode: str = "snapshot", flush_interval: float = 1.0, backend: str = "json",
+                 home_guild: Optional[int] = None, per_channel: bool = False, data_dir: str = "rosters",
+                 idle_timeout: Optional[float] = None, max_resident: Optional[int] = None,
+                 max_entries: Optional[int] = None, live_board: bool = False, board_window: float = 2.0,
+                 grid: GridConfig = DEFAULT_GRID, roster_grids: Optional[Dict[str, GridConfig]] = None,
+                 suggestion_policies: Sequence[str] = DEFAULT_POLICIES, backup_dir: str = "backups",
+                 backup_keep_hourly: int = 24, backup_keep_daily: int = 7, reply_window: float = 0.5):
+        """
+        Initialize the adapter.
+
+        Args:
+            persistence_mode: Write strategy for the JSON backend
+            flush_interval: Seconds between writes in deferred mode
+            backend: Storage backend, "json" or "sqlite"
+            home_guild: Guild whose roster keeps using the legacy assignments.json
+            per_channel: Keep a separate roster per channel instead of per guild
+            data_dir: Directory holding the other guilds' JSON rosters
+            idle_timeout: Seconds after which an unused roster is dropped from memory
+            max_resident: Maximum number of rosters held in memory
+            max_entries: Maximum number of assignments held in memory across rosters
+            live_board: Keep an in-place edited roster message per channel
+            board_window: Minimum seconds between edits of one live board
+            grid: Team and lane dimensions of every roster without its own entry
+            roster_grids: Dimensions per roster name ("default", "<guild>" or "<guild>-<channel>")
+            suggestion_policies: Names of the policies ranking alternatives to a taken lane, best first
+            backup_dir: Directory holding the compressed roster backups
+            backup_keep_hourly: Hours for which the newest backup is kept
+            backup_keep_daily: Days for which the newest backup is kept
+            reply_window: Seconds over which text command confirmations to one channel are merged
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Storage backend must be one of {', '.join(BACKENDS)}, got {backend}.")
+        self.backend = backend
+        self.persistence_mode = persistence_mode
+        self.flush_interval = flush_interval
+        self.home_guild = home_guild
+        self.per_channel = per_channel
+        self.data_dir = data_dir
+        self.grid = grid
+        self.roster_grids = dict(roster_grids or {})
+        self.suggestions = SuggestionEngine.from_names(suggestion_policies)
+        if backend == "sqlite" and not os.path.exists(SQLITE_PATH) and os.path.exists(LEGACY_PATH):
+            # One-shot import of the JSON store the first time the database is created
+            name = self._roster_name((home_guild, None))
+            migration = SqliteAssignmentRepository(SQLITE_PATH, roster=name, grid=self.grid_for(name))
+            migration.import_json(LEGACY_PATH)
+            migration.close()
+        self.registry = RepositoryRegistry(self._open_roster, idle_timeout=idle_timeout,
+                                           max_resident=max_resident, max_entries=max_entries,
+                                           on_evict=self._forget)
+        self.pipeline = CommandPipeline(self.registry.get)
+        self.render_cache = RenderCache()
+        self.autocomplete = Autocomplete()
+        # Shared by the live board and the replies, which count against the same per-channel limit
+        self.channel_limiter = ChannelLimiter()
+        self.live_board = LiveBoard(self._render_board, window=board_window,
+                                    limiter=self.channel_limiter) if live_board else None
+        self.outbox = Outbox(window=reply_window, limiter=self.channel_limiter)
+        self.backups = BackupManager(backup_dir, keep_hourly=backup_keep_hourly, keep_daily=backup_keep_daily)
+        # roster key -> version of its last backup
+        self._backed_up: Dict[Tuple, int] = {}
+        METRICS.register_gauge("roster_pipeline_queue_depth", "Commands waiting for a roster's writer.",
+                               self._queue_depths)
+        METRICS.register_gauge("roster_resident_rosters", "Rosters currently held in memory.",
+                               lambda: {(): len(self.registry)})
+
+    def roster_key(self, guild_id: Optional[int] = None, channel_id: Optional[int] = None) -> Tuple:
+        return (guild_id, channel_id if self.per_channel else None)
+
+    def repo_for(self, guild_id: Optional[int] = None, channel_id: Optional[int] = None):
+        return self.registry.get(self.roster_key(guild_id, channel_id))
+
+    def service_for(self, guild_id: Optional[int] = None, channel_id: Optional[int] = None) -> AssignmentService:
+        return AssignmentService(self.repo_for(guild_id, channel_id), self.suggestions)
+
+    async def execute(self, guild_id: Optional[int], channel_id: Optional[int], fn: Callable[[], Any]) -> Any:
+        """Run a mutating command on its roster's single writer."""
+        key = self.roster_key(guild_id, channel_id)
+        result = await self.pipeline.submit(key, fn)
+        if self.live_board:
+            self.live_board.notify(key)
+        return result
+
+    async def execute_for_ctx(self, ctx, fn: Callable[[], Any]) -> Any:
+        return await self.execute(*self._ctx_ids(ctx), fn)
+
+    async def sweep(self):
+        """
+        Flush every resident roster, then close and drop those idle past
+        ``idle_timeout``; run periodically.
+
+        The writes run in a worker thread, so they never block the loop; a
+        repository locks its own state, so a flush waits out any batch its
+        writer is running. The registry is only touched on the loop, and the
+        idle rosters are already flushed when they are closed.
+        """
+        repos = [repo for _, repo in self.registry.items()]
+        await asyncio.to_thread(lambda: [repo.flush() for repo in repos])
+        self.registry.evict_idle()
+
+    async def drain(self):
+        """Wait for queued commands, replies and board edits to go out; call on shutdown before ``close``."""
+        await self.pipeline.close()
+        await self.outbox.close()
+        if self.live_board:
+            await self.live_board.close()
+
+    def close(self):
+        """Finish pending backups, then flush and close every resident roster; call once on shutdown."""
+        self.backups.close()
+        self.registry.close_all()
+
+    def grid_for(self, roster_name: str) -> GridConfig:
+        return self.roster_grids.get(roster_name, self.grid)
+
+    def _forget(self, key: Tuple):
+        self.pipeline.discard(key)
+        # Versions restart when the roster is reloaded, so the recorded one could match by accident
+        self._backed_up.pop(key, None)
+
+    def _queue_depths(self) -> Dict[Tuple, int]:
+        return {(("roster", self._roster_name(key)),): depth for key, depth in self.pipeline.depths().items()}
+
+    def _render_board(self, key: Tuple):
+        return self.render_cache.render(self.registry.get(key), "embed")
+
+    def _open_roster(self, key: Tuple):
+        grid = self.grid_for(self._roster_name(key))
+        if self.backend == "sqlite":
+            return SqliteAssignmentRepository(SQLITE_PATH, roster=self._roster_name(key), grid=grid)
+        path = self._roster_path(key)
+        if path != LEGACY_PATH:
+            os.makedirs(self.data_dir, exist_ok=True)
+        return PersistentAssignmentRepository(path, mode=self.persistence_mode, flush_interval=self.flush_interval,
+                                              grid=grid)
+
+    def _roster_path(self, key: Tuple) -> str:
+        if self._roster_name(key) == "default":
+            return LEGACY_PATH
+        return os.path.join(self.data_dir, f"{self._roster_name(key)}.json")
+
+    def _roster_name(self, key: Tuple) -> str:
+        guild_id, channel_id = key
+        if channel_id is None and guild_id in (None, self.home_guild):
+            return "default"
+        return str(guild_id) if channel_id is None else f"{guild_id}-{channel_id}"
+
+    def _repo_for_ctx(self, ctx):
+        return self.repo_for(*self._ctx_ids(ctx))
 
+    def _service_for_ctx(self, ctx) -> AssignmentService:
+        return self.service_for(*self._ctx_ids(ctx))
+
+    @staticmethod
+    def _author_name(ctx) -> str:
+        """Name of whoever ran a command context or an interaction."""
+        return ctx.author.name if hasattr(ctx, "author") else ctx.user.name
+
+    @staticmethod
+    def _ctx_ids(ctx) -> Tuple[Optional[int], Optional[int]]:
+        """Guild and channel ids of a command context or an interaction."""
+        if hasattr(ctx, "guild_id"):
+            return ctx.guild_id, ctx.channel_id
+        guild = getattr(ctx, "guild", None)
+        channel = getattr(ctx, "channel", None)
+        return guild.id if guild else None, channel.id if channel else None
+
+    @instrumented("adapter", "assign", outcome=reply_outcome)
     def handle_assign(self, ctx, args: str) -> str:
-        user = ctx.author.name
-        opts = self._parse_args(args)
+        service = self._service_for_ctx(ctx)
+        try:
+            opts = GRAMMAR.parse_args("assign", args, service.repo.grid)
+        except CommandError as e:
+            return f"❗ {e}"
 
-        if 'member' in opts:
-            user = opts['member']
-        if 'random' in opts:
-            result = self.service.assign_random(user)
+        user = opts.get('member') or ctx.author.name
+        if 'random' in opts or 'any-empty' in opts:
+            result = service.assign_random(user)
             if result:
                 return f"✅ {user} assigned to Team {result[0]} Lane {result[1]}"
-            return "❌ No empty lanes available."
+            return f"❌ No empty lanes available. {WAITLIST_HINT}"
         if 'team' in opts and 'lane' in opts:
-            try:
-                team = int(opts['team'])
-                lane = int(opts['lane'])
-            except ValueError:
-                return "❗ Invalid team or lane number."
-
-            success, suggestion = self.service.assign_user(user, team, lane)
+            team, lane = opts['team'], opts['lane']
+            success, suggestions = service.assign_user(user, team, lane)
             if success:
                 return f"✅ {user} assigned to Team {team} Lane {lane}"
-            if suggestion:
-                return f"❌ Lane taken. Suggested: Team {suggestion[0]} Lane {suggestion[1]}"
-            return "❌ All lanes are full."
+            if suggestions:
+                return f"❌ Lane taken. {format_suggestions(suggestions)}"
+            return f"❌ All lanes are full. {WAITLIST_HINT}"
 
         return "❗ Invalid command format."
 
+    @instrumented("adapter", "remove", outcome=reply_outcome)
     def handle_remove(self, ctx, args: str) -> str:
-        opts = self._parse_args(args)
+        try:
+            opts = GRAMMAR.parse_args("remove", args)
+        except CommandError as e:
+            return f"❗ {e}"
         if 'member' not in opts:
             return "❗ Usage: remove --member <username>"
-        removed = self.service.remove_user(opts['member'])
-        if removed:
-            return f"✅ {opts['member']} removed from lane."
+        result = self._service_for_ctx(ctx).release_user(opts['member'])
+        if result.removed:
+            return f"✅ {opts['member']} removed from lane." + format_promotions(result.promoted)
         return f"❌ {opts['member']} was not assigned to any lane."
 
-    def handle_backup(self) -> str:
+    @instrumented("adapter", "waitlist", outcome=reply_outcome)
+    def handle_waitlist(self, ctx, args: str) -> str:
+        try:
+            opts = GRAMMAR.parse_args("waitlist", args)
+        except CommandError as e:
+            return f"❗ {e}"
+        service = self._service_for_ctx(ctx)
+        if 'show' in opts:
+            return "📋 " + format_waitlist(service.waiting())
+        user = opts.get('member') or self._author_name(ctx)
+        if 'leave' in opts:
+            if service.leave_waitlist(user):
+                return f"✅ {user} left the waitlist."
+            return f"❌ {user} is not on the waitlist."
+        position = service.join_waitlist(user)
+        if position is None:
+            return f"❌ {user} already holds a lane."
+        return f"⏳ {user} is number {position} on the waitlist."
+
+    @instrumented("adapter", "bulk", outcome=reply_outcome)
+    def handle_bulk(self, ctx, text: str) -> str:
+        entries, malformed = parse_bulk_entries(text)
+        if not entries and not malformed:
+            return "❗ Usage: bulk <member:team:lane> ... or attach a text file of entries"
+        result = self._service_for_ctx(ctx).bulk_assign(entries)
+        return "📋 " + format_bulk_summary(result, malformed)
+
+    @instrumented("adapter", "fill", outcome=reply_outcome)
+    def handle_fill(self, ctx, text: str) -> str:
+        members = parse_fill_members(text)
+        if not members:
+            return "❗ Usage: fill <member> ... or attach a text file of names"
+        return "📋 " + format_fill_summary(self._service_for_ctx(ctx).auto_fill(members))
+
+    @instrumented("adapter", "undo", outcome=reply_outcome)
+    def handle_undo(self, ctx, args: str = "") -> str:
+        return self._travel(ctx, "undo", args)
+
+    @instrumented("adapter", "redo", outcome=reply_outcome)
+    def handle_redo(self, ctx, args: str = "") -> str:
+        return self._travel(ctx, "redo", args)
+
+    @instrumented("adapter", "history", outcome=reply_outcome)
+    def handle_history(self, ctx, args: str = "") -> str:
+        try:
+            opts = GRAMMAR.parse_args("history", args)
+            events, cursor = self._service_for_ctx(ctx).history(opts.get("limit", 20))
+        except CommandError as e:
+            return f"❗ {e}"
+        return "📋 " + format_events(events, cursor)
+
+    def _travel(self, ctx, action: str, args: str) -> str:
         try:
-            shutil.copyfile("assignments.json", "assignments_backup.json")
-            return "✅ Backup created successfully."
+            steps = GRAMMAR.parse_args(action, args).get("steps", 1)
+        except CommandError as e:
+            return f"❗ {e}"
+        if steps < 1:
+            return "❗ Steps must be at least 1."
+        service = self._service_for_ctx(ctx)
+        events = service.undo(steps) if action == "undo" else service.redo(steps)
+        if not events:
+            return f"❌ Nothing to {action}."
+        return "✅ " + format_travel(action, events)
+
+    @instrumented("adapter", "profile", outcome=reply_outcome)
+    def handle_profile(self, ctx, args: str) -> str:
+        try:
+            return "🔬 " + apply_profile_command(GRAMMAR.parse_args("profile", args))
+        except CommandError as e:
+            return f"❗ {e}"
+
+    @instrumented("adapter", "backup", outcome=reply_outcome)
+    async def handle_backup(self, ctx=None) -> str:
+        """Back up the roster from a snapshot taken now; compressing and writing it never blocks the loop."""
+        key = self.roster_key(*self._ctx_ids(ctx))
+        repo = self.registry.get(key)
+        version = repo.version
+        try:
+            backup = await asyncio.wrap_future(self.backups.create(repo, self._roster_name(key)))
         except Exception as e:
             return f"❌ Failed to create backup: {e}"
+        self._backed_up[key] = version
+        return f"✅ Backup {backup.name} created."
+
+    async def backup_changed(self) -> List[Backup]:
+        """Back up every resident roster that changed since its last backup; failed ones are retried next time."""
+        pending = []
+        for key, repo in self.registry.items():
+            if self._backed_up.get(key) != repo.version:
+                pending.append((key, repo.version, self.backups.create(repo, self._roster_name(key))))
+        # Wait for every write, so one failing roster neither hides nor drops the others' backups
+        results = await asyncio.gather(*(asyncio.wrap_future(future) for _, _, future in pending),
+                                       return_exceptions=True)
+        backups = []
+        for (key, version, _), result in zip(pending, results):
+            if isinstance(result, Exception):
+                print(f"❌ Automatic backup of {self._roster_name(key)} failed: {result}")
+                continue
+            backups.append(result)
+            self._backed_up[key] = version
+        return backups
+
+    @instrumented("adapter", "restore", outcome=reply_outcome)
+    async def handle_restore(self, ctx, args: str = "") -> str:
+        """List the roster's backups, or replace the roster with one of them."""
+        try:
+            opts = GRAMMAR.parse_args("restore", args)
+        except CommandError as e:
+            return f"❗ {e}"
+        guild_id, channel_id = self._ctx_ids(ctx)
+        key = self.roster_key(guild_id, channel_id)
+        roster = self._roster_name(key)
+        if "backup" not in opts and "latest" not in opts:
+            return "📋 " + format_backups(self.backups.backups(roster))
+        try:
+            data = await asyncio.to_thread(self.backups.load, roster, opts.get("backup"))
+            await self.execute(guild_id, channel_id, lambda: self.backups.restore(self.registry.get(key), data))
+        except (OSError, ValueError) as e:
+            return f"❌ Failed to restore: {e}"
+        return (f"✅ Restored {len(data['assignments'])} assignments and "
+                f"{len(data.get('waitlist', ()))} waiting members.")
 
-    def handle_reset(self) -> str:
+    @instrumented("adapter", "reset", outcome=reply_outcome)
+    def handle_reset(self, ctx=None) -> str:
         try:
-            self.repo.assignments.clear()
-            self.repo.save()
-            return "✅ All assignments have been reset."
+            service = self._service_for_ctx(ctx)
+            promoted = service.reset()
+            service.repo.flush()
+            return "✅ All assignments have been reset." + format_promotions(promoted)
         except Exception as e:
             return f"❌ Failed to reset assignments: {e}"
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from infrastructure.rate_limit import ChannelLimiter
+
+
+@dataclass
+class _Board:
+    channel: Any
+    message: Any
+    last_edit: float
+    dirty: bool = False
+    task: Optional[asyncio.Task] = None
+
+
+class LiveBoard:
+    """
+    One roster message per channel, edited in place after mutations.
+
+    ``notify`` marks a roster's board stale. Edits are coalesced so each board
+    is edited at most once per ``window`` seconds, and every edit takes a
+    token from its channel's bucket (``rate`` edits per ``per`` seconds) so a
+    burst never trips Discord's per-channel rate limit. Pass ``limiter`` to
+    share the buckets with other senders.
+    """
+
+    def __init__(self, render: Callable[[Hashable], Any], window: float = 2.0, rate: int = 5, per: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+                 limiter: Optional[ChannelLimiter] = None):
+        self.render = render
+        self.window = window
+        self.rate = rate
+        self.per = per
+        self.clock = clock
+        self.sleep = sleep
+        self._boards: Dict[Hashable, _Board] = {}
+        self.limiter = limiter or ChannelLimiter(rate, per, clock, sleep)
+
+    async def attach(self, key: Hashable, channel) -> Any:
+        """Post the roster's board in ``channel``, replacing any previous board."""
+        self.detach(key)
+        await self.limiter.acquire(channel.id)
+        message = await channel.send(embed=self.render(key))
+        self._boards[key] = _Board(channel, message, self.clock())
+        return message
+
+    def detach(self, key: Hashable):
+        board = self._boards.pop(key, None)
+        if board and board.task:
+            board.task.cancel()
+
+    def notify(self, key: Hashable):
+        """Schedule a coalesced edit of the roster's board, if it has one."""
+        board = self._boards.get(key)
+        if board is None:
+            return
+        board.dirty = True
+        if board.task is None:
+            board.task = asyncio.get_running_loop().create_task(self._edit_when_due(key, board))
+
+    async def close(self, timeout: float = 5.0):
+        """
+        Send every pending edit now, without waiting out the window, then stop.
+
+        Edits still rate limited after ``timeout`` seconds are dropped.
+        """
+        tasks = [board.task for board in self._boards.values() if board.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        flushes = [asyncio.ensure_future(self._edit_now(key, board))
+                   for key, board in self._boards.items() if board.dirty]
+        if not flushes:
+            return
+        _, pending = await asyncio.wait(flushes, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*flushes, return_exceptions=True)
+
+    async def _edit_when_due(self, key: Hashable, board: _Board):
+        try:
+            while board.dirty:
+                due = board.last_edit + self.window - self.clock()
+                if due > 0:
+                    await self.sleep(due)
+                await self._edit_now(key, board)
+        finally:
+            board.task = None
+
+    async def _edit_now(self, key: Hashable, board: _Board):
+        await self.limiter.acquire(board.channel.id)
+        # Render as late as possible so the edit covers every change so far
+        board.dirty = False
+        try:
+            await board.message.edit(embed=self.render(key))
+        except asyncio.CancelledError:
+            # The edit may not have gone out; leave it for ``close`` to send
+            board.dirty = True
+            raise
+        board.last_edit = self.clock()
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional
+
+from infrastructure.rate_limit import ChannelLimiter
+
+# Longest message Discord accepts
+MAX_LENGTH = 2000
+
+
+@dataclass
+class _Outgoing:
+    parts: List[Optional[str]]
+    kwargs: Dict[str, Any]
+    futures: List[asyncio.Future]
+    mergeable: bool
+
+
+@dataclass
+class _Channel:
+    queue: Deque[_Outgoing] = field(default_factory=deque)
+    last_merged: float = float("-inf")
+    task: Optional[asyncio.Task] = None
+
+
+class Outbox:
+    """
+    Outbound replies of the bot, rate limited per channel.
+
+    ``send`` posts to a channel in call order, taking a token from the
+    channel's bucket for every message. Consecutive one-line text replies to
+    one channel, such as "✅ A assigned…", "❌ Lane taken…", are merged: at
+    most one merged message goes out per ``window`` seconds, so a signup
+    burst becomes a few messages instead of one per command. Embeds, files
+    and multi-line replies are sent as they are, after the replies queued
+    before them.
+
+    ``respond`` answers an interaction, which Discord only accepts within
+    three seconds: when the reply is not ready ``deadline`` seconds after
+    the call, the interaction is deferred and the reply sent as a followup.
+    """
+
+    def __init__(self, window: float = 0.5, deadline: float = 2.0, rate: int = 5, per: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+                 limiter: Optional[ChannelLimiter] = None):
+        self.window = window
+        self.deadline = deadline
+        self.clock = clock
+        self.sleep = sleep
+        self.limiter = limiter or ChannelLimiter(rate, per, clock, sleep)
+        self._channels: Dict[Hashable, _Channel] = {}
+
+    async def send(self, channel, content: Optional[str] = None, **kwargs) -> Any:
+        """Queue a message for ``channel``; return the message that carried it once it is posted."""
+        state = self._channels.get(channel.id)
+        if state is None:
+            state = self._channels[channel.id] = _Channel()
+        future = asyncio.get_running_loop().create_future()
+        mergeable = not kwargs and content is not None and "\n" not in content
+        last = state.queue[-1] if state.queue else None
+        if (mergeable and last is not None and last.mergeable
+                and sum(len(part) + 1 for part in last.parts) + len(content) <= MAX_LENGTH):
+            last.parts.append(content)
+            last.futures.append(future)
+        else:
+            state.queue.append(_Outgoing([content], kwargs, [future], mergeable))
+        if state.task is None:
+            state.task = asyncio.get_running_loop().create_task(self._drain(channel, state))
+        return await future
+
+    async def respond(self, interaction, reply: Awaitable[str], ephemeral: bool = False, **kwargs):
+        """Send ``reply`` as the interaction's response, deferring first if it is not ready in time."""
+        work = asyncio.ensure_future(reply)
+        timer = asyncio.ensure_future(self.sleep(self.deadline))
+        try:
+            await asyncio.wait((work, timer), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            timer.cancel()
+        if work.done():
+            await interaction.response.send_message(work.result(), ephemeral=ephemeral, **kwargs)
+            return
+        await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+        await interaction.followup.send(await work, ephemeral=ephemeral, **kwargs)
+
+    async def close(self):
+        """Wait until every queued message is posted."""
+        tasks = [state.task for state in self._channels.values() if state.task]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _drain(self, channel, state: _Channel):
+        try:
+            while state.queue:
+                head = state.queue[0]
+                # Hold a lone mergeable reply until the window since the last merge ends, gathering more
+                due = state.last_merged + self.window - self.clock()
+                if head.mergeable and len(state.queue) == 1 and due > 0:
+                    await self.sleep(due)
+                    continue
+                await self.limiter.acquire(channel.id)
+                state.queue.popleft()
+                if head.mergeable:
+                    state.last_merged = self.clock()
+                try:
+                    message = await channel.send("\n".join(head.parts) if len(head.parts) > 1 else head.parts[0],
+                                                 **head.kwargs)
+                except Exception as e:
+                    for future in head.futures:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for future in head.futures:
+                        if not future.done():
+                            future.set_result(message)
+        finally:
+            state.task = None
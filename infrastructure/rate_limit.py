@@ -0,0 +1,64 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+class TokenBucket:
+    """
+    Token bucket allowing ``capacity`` operations per ``per`` seconds.
+
+    Tokens refill continuously; callers ask how long to wait before a token
+    is available and then take it.
+    """
+
+    def __init__(self, capacity: int, per: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.per = per
+        self.clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def delay(self) -> float:
+        """Seconds until a token is available, 0 if one is available now."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) * self.per / self.capacity
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.capacity / self.per)
+        self._updated = now
+
+
+class ChannelLimiter:
+    """
+    One TokenBucket per channel, ``rate`` messages per ``per`` seconds.
+
+    Everything posting or editing messages in a channel should share one
+    limiter, so the live board and command replies together stay under
+    Discord's per-channel limit.
+    """
+
+    def __init__(self, rate: int = 5, per: float = 5.0, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        self.rate = rate
+        self.per = per
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+
+    async def acquire(self, channel_id: Hashable):
+        """Wait until the channel may send, then take its token."""
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = TokenBucket(self.rate, self.per, self.clock)
+        while not bucket.try_acquire():
+            await self.sleep(bucket.delay())
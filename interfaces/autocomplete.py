@@ -0,0 +1,74 @@
+import weakref
+from typing import List, Optional, Tuple
+
+from core.grid import Grid
+from core.members import PrefixIndex
+
+# Most choices Discord shows for one option
+MAX_CHOICES = 25
+
+
+class Autocomplete:
+    """
+    Suggestions for slash command options, served from in-memory indexes.
+
+    Everything is per roster, so one guild never sees another's members.
+    The assigned members and the free lanes come from the roster's occupancy
+    grid; the grid and an index of its members are kept until the roster's
+    version moves, so keystrokes between mutations never rebuild anything.
+    Known members are the names in the roster's own member table: those it
+    holds, queues or has in its history.
+    """
+
+    def __init__(self, limit: int = MAX_CHOICES):
+        self.limit = limit
+        # repository -> (version, grid, index of assigned members); dropped with the repository
+        self._rosters: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def known_members(self, repo, prefix: str) -> List[str]:
+        """Every member name ``repo`` has seen that starts with ``prefix``."""
+        return self._roster(repo)[0].members.complete(prefix, self.limit)
+
+    def assigned_members(self, repo, prefix: str) -> List[str]:
+        """Members holding a lane in ``repo`` whose name starts with ``prefix``."""
+        return self._roster(repo)[1].complete(prefix, self.limit)
+
+    def open_teams(self, repo, prefix: str = "") -> List[Tuple[int, int]]:
+        """``(team, free lanes)`` of the teams with room whose number starts with ``prefix``."""
+        grid = self._roster(repo)[0]
+        teams = []
+        for team in grid.open_teams():
+            if str(team).startswith(prefix):
+                teams.append((team, grid.config.lanes - grid.filled[team - 1]))
+                if len(teams) == self.limit:
+                    break
+        return teams
+
+    def free_lanes(self, repo, team: Optional[int], prefix: str = "") -> List[int]:
+        """Free lanes of ``team`` whose number starts with ``prefix``; lanes free in any team without one."""
+        grid = self._roster(repo)[0]
+        if team is None:
+            free = 0
+            for team_free in grid.free:
+                free |= team_free
+        elif 1 <= team <= grid.config.teams:
+            free = grid.free[team - 1]
+        else:
+            return []
+        lanes = []
+        while free and len(lanes) < self.limit:
+            low = free & -free
+            free ^= low
+            lane = low.bit_length()
+            if str(lane).startswith(prefix):
+                lanes.append(lane)
+        return lanes
+
+    def _roster(self, repo) -> Tuple[Grid, PrefixIndex]:
+        version = repo.version
+        cached = self._rosters.get(repo)
+        if cached is None or cached[0] != version:
+            grid = repo.occupancy()
+            names = grid.members.names
+            cached = self._rosters[repo] = (version, grid, PrefixIndex(names[member] for member in grid.cells if member))
+        return cached[1], cached[2]
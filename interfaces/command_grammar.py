@@ -0,0 +1,171 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.models import DEFAULT_GRID, GridConfig
+
+# One token: a double-quoted string with backslash escapes, a single-quoted
+# string, a bare word, or a quote that is never closed
+_TOKEN = re.compile(r"""\s*(?:"((?:[^"\\]|\\.)*)"|'([^']*)'|([^\s"']\S*)|(["']))""")
+_ESCAPE = re.compile(r"\\(.)")
+
+
+class CommandError(ValueError):
+    """A command line the grammar rejects; the message is meant for the user."""
+
+
+@dataclass(frozen=True)
+class Option:
+    """
+    One ``--name`` option of a command.
+
+    ``kind`` is "str", "int" or "float" for options taking a value and
+    "flag" for options that take none. ``bound`` names the grid dimension ("teams" or
+    "lanes") an int option must fall within.
+    """
+    name: str
+    kind: str = "str"
+    label: str = ""
+    bound: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CommandSpec:
+    """A command and its options; ``raw`` commands get the rest of the line unparsed."""
+    name: str
+    options: Tuple[Option, ...] = ()
+    raw: bool = False
+
+
+@dataclass(frozen=True)
+class ParsedCommand:
+    name: str
+    args: Dict[str, Any] = field(default_factory=dict)
+    text: str = ""
+
+
+MEMBER = Option("member")
+COMMAND_SPECS = (
+    CommandSpec("assign", (
+        MEMBER,
+        Option("team", "int", "Team", bound="teams"),
+        Option("lane", "int", "Lane", bound="lanes"),
+        Option("random", "flag"),
+        Option("any-empty", "flag"),
+    )),
+    CommandSpec("remove", (MEMBER,)),
+    CommandSpec("list"),
+    CommandSpec("bulk", raw=True),
+    CommandSpec("fill", raw=True),
+    CommandSpec("waitlist", (MEMBER, Option("leave", "flag"), Option("show", "flag"))),
+    CommandSpec("backup"),
+    CommandSpec("restore", (Option("backup"), Option("latest", "flag"))),
+    CommandSpec("undo", (Option("steps", "int", "Steps"),)),
+    CommandSpec("redo", (Option("steps", "int", "Steps"),)),
+    CommandSpec("history", (Option("limit", "int", "Limit"),)),
+    CommandSpec("profile", (Option("on", "flag"), Option("off", "flag"), Option("rate", "float", "Sample rate"))),
+)
+
+
+class Grammar:
+    """
+    Tokenizer and validator for a table of command specs.
+
+    The spec table is compiled once into per-command option lookups, so
+    parsing a line is one regex scan plus a dictionary lookup per option.
+    Values are coerced to their option's type and range-checked against the
+    roster's grid before any handler runs.
+    """
+
+    def __init__(self, specs: Iterable[CommandSpec]):
+        self._specs: Dict[str, CommandSpec] = {spec.name: spec for spec in specs}
+        self._options: Dict[str, Dict[str, Option]] = {
+            spec.name: {f"--{option.name}": option for option in spec.options} for spec in self._specs.values()
+        }
+
+    @property
+    def commands(self) -> List[str]:
+        return list(self._specs)
+
+    def parse(self, line: str, grid: GridConfig = DEFAULT_GRID) -> ParsedCommand:
+        """Parse a full command line such as ``assign --member "Jo Ann" --team 2 --lane 3``."""
+        line = line.strip()
+        if not line:
+            raise CommandError("Please provide a command.")
+        name, *rest = line.split(None, 1)
+        name, rest = name.lower(), rest[0] if rest else ""
+        spec = self._specs.get(name)
+        if spec is None:
+            raise CommandError(f"Unknown command: {name}. Available commands: {', '.join(self._specs)}")
+        if spec.raw:
+            return ParsedCommand(name, text=rest)
+        return ParsedCommand(name, self.parse_args(name, rest, grid))
+
+    def parse_args(self, name: str, text: str, grid: GridConfig = DEFAULT_GRID) -> Dict[str, Any]:
+        """Parse the options of command ``name``; flags map to True, values to their type."""
+        options = self._options[name]
+        tokens = tokenize(text)
+        args: Dict[str, Any] = {}
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            option = options.get(token)
+            if option is None:
+                if token.startswith("--"):
+                    raise CommandError(f"Unknown option {token} for {name}. Options: {', '.join(options) or 'none'}.")
+                raise CommandError(f"Unexpected argument {token!r} for {name}.")
+            if option.kind == "flag":
+                args[option.name] = True
+                i += 1
+                continue
+            if i + 1 >= len(tokens) or tokens[i + 1] in options:
+                raise CommandError(f"{token} needs a value.")
+            args[option.name] = self._coerce(option, tokens[i + 1], grid)
+            i += 2
+        return args
+
+    @staticmethod
+    def _coerce(option: Option, value: str, grid: GridConfig) -> Any:
+        if option.kind == "float":
+            try:
+                return float(value)
+            except ValueError:
+                raise CommandError(f"{option.label} must be a number, got {value!r}.") from None
+        if option.kind != "int":
+            return value
+        try:
+            number = int(value)
+        except ValueError:
+            raise CommandError(f"{option.label} numbers must be whole numbers, got {value!r}.") from None
+        if option.bound:
+            limit = getattr(grid, option.bound)
+            if not 1 <= number <= limit:
+                raise CommandError(f"{option.label} {number} does not exist. "
+                                   f"{option.label}s are numbered 1-{limit}.")
+        return number
+
+
+def tokenize(text: str) -> List[str]:
+    """Split ``text`` into words, keeping quoted strings together as in a shell."""
+    # Most lines quote nothing, and str.split is far cheaper than the regex
+    if '"' not in text and "'" not in text:
+        return text.split()
+    tokens = []
+    for double, single, bare, unclosed in _TOKEN.findall(text):
+        if unclosed:
+            raise CommandError("A quote is never closed.")
+        if bare:
+            tokens.append(bare)
+        elif single:
+            tokens.append(single)
+        else:
+            tokens.append(_ESCAPE.sub(r"\1", double))
+    return tokens
+
+
+def quote(value: str) -> str:
+    """Quote ``value`` so that ``tokenize`` reads it back as one token."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+GRAMMAR = Grammar(COMMAND_SPECS)
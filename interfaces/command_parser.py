@@ -1,23 +1,84 @@
-from typing import Dict, List
-
-from core.services import AssignmentService
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.backup import Backup
+from core.history import Event
+from core.metrics import METRICS
+from core.profiling import PROFILER
+from core.services import AssignmentService, BulkResult, FillResult
+from interfaces.command_grammar import CommandError, GRAMMAR
+from interfaces.render_cache import RenderCache
+
+# Bulk entries are separated by whitespace, commas or semicolons
+_BULK_SEPARATOR = re.compile(r"[\s,;]+")
+
+# Appended when a roster is full
+WAITLIST_HINT = "Use the waitlist command to queue for the next free lane."
+
+
+def parse_bulk_entries(text: str) -> Tuple[List[Tuple[str, int, int]], List[str]]:
+    """
+    Parse ``member:team:lane`` entries from a message or attached text block.
+
+    Args:
+        text: The entries, separated by whitespace, commas or semicolons
+
+    Returns:
+        Tuple[List[Tuple[str, int, int]], List[str]]: The parsed entries and the tokens that were malformed
+    """
+    entries, malformed = [], []
+    for token in _BULK_SEPARATOR.split(text.strip()):
+        if not token:
+            continue
+        # Split from the right so member names may contain colons
+        parts = token.rsplit(":", 2)
+        try:
+            member, team, lane = parts[0], int(parts[1]), int(parts[2])
+        except (IndexError, ValueError):
+            malformed.append(token)
+            continue
+        entries.append((member, team, lane))
+    return entries, malformed
+
+
+def parse_fill_members(text: str) -> List[str]:
+    """
+    Parse the member names of a waiting list.
+
+    Args:
+        text: The names, separated by whitespace, commas or semicolons
+
+    Returns:
+        List[str]: The names in the order given
+    """
+    return [name for name in _BULK_SEPARATOR.split(text.strip()) if name]
 
 
 class CommandParser:
     """Parser for Discord bot commands."""
 
-    def __init__(self, service: AssignmentService):
+    def __init__(self, service: AssignmentService, render_cache: Optional[RenderCache] = None):
         """
         Initialize the command parser with a service.
 
         Args:
             service: The service to use for executing commands
+            render_cache: Cache for list output, shared with other renderers if given
         """
         self._service = service
+        self._render_cache = render_cache or RenderCache()
+        self._render_cache.register("list", self._format_team_block, self._assemble_list)
         self._command_handlers = {
             "assign": self._handle_assign,
             "remove": self._handle_remove,
             "list": self._handle_list,
+            "bulk": self._handle_bulk,
+            "fill": self._handle_fill,
+            "waitlist": self._handle_waitlist,
+            "undo": self._handle_undo,
+            "redo": self._handle_redo,
+            "history": self._handle_history,
+            "profile": self._handle_profile,
         }
 
     def parse_and_execute(self, command: str, author: str, is_admin: bool = False) -> str:
@@ -32,51 +93,20 @@ class CommandParser:
         Returns:
             str: The response message
         """
-        # Split the command into parts
-        parts = command.strip().split()
-        if not parts:
-            return "Please provide a command."
-
-        # Get the command name
-        cmd_name = parts[0].lower()
-
-        # Check if the command exists
-        if cmd_name not in self._command_handlers:
-            return f"Unknown command: {cmd_name}. Available commands: {', '.join(self._command_handlers.keys())}"
-
-        # Parse arguments
-        args = self._parse_args(parts[1:])
-
-        # Execute the command
-        return self._command_handlers[cmd_name](args, author, is_admin)
-
-    def _parse_args(self, args: List[str]) -> Dict[str, str]:
-        """
-        Parse command arguments.
-
-        Args:
-            args: The arguments to parse
-
-        Returns:
-            Dict[str, str]: Dictionary of argument names to values
-        """
-        result = {}
-        i = 0
-        while i < len(args):
-            arg = args[i]
-            if arg.startswith("--"):
-                arg_name = arg[2:]
-                if i + 1 < len(args) and not args[i + 1].startswith("--"):
-                    result[arg_name] = args[i + 1]
-                    i += 2
-                else:
-                    result[arg_name] = "true"
-                    i += 1
-            else:
-                i += 1
-        return result
-
-    def _handle_assign(self, args: Dict[str, str], author: str, is_admin: bool) -> str:
+        try:
+            parsed = GRAMMAR.parse(command, self._service.repo.grid)
+        except CommandError as e:
+            return str(e)
+
+        # Bulk entries and waiting lists are positional, so they get the raw text
+        handler = self._command_handlers.get(parsed.name)
+        if handler is None:
+            # Backups need the bot's storage, which a bare parser does not have
+            return f"The {parsed.name} command is only available through the bot."
+        with METRICS.timed("parser", parsed.name):
+            return handler(parsed.text if parsed.name in ("bulk", "fill") else parsed.args, author, is_admin)
+
+    def _handle_assign(self, args: Dict[str, Any], author: str, is_admin: bool) -> str:
         """
         Handle the assign command.
 
@@ -103,33 +133,64 @@ class CommandParser:
             if slot:
                 return f"Successfully assigned {member} to Team {slot[0]} Lane {slot[1]}"
             else:
-                return "No empty lanes available."
+                return f"No empty lanes available. {WAITLIST_HINT}"
 
-        # Check if the user wants to assign to a specific lane
+        # Check if the user wants to assign to a specific lane; the grammar has range-checked both
         if "team" in args and "lane" in args:
-            try:
-                team_number = int(args["team"])
-                lane_number = int(args["lane"])
-
-                success, suggestion = self._service.assign_user(member, team_number, lane_number)
-                if success:
-                    return f"Successfully assigned {member} to Team {team_number}, Lane {lane_number}."
-                elif suggestion:
-                    return f"Lane taken. Suggested: Team {suggestion[0]} Lane {suggestion[1]}"
-                else:
-                    return "All lanes are full."
-            except ValueError as e:
-                # Handle out-of-range team or lane numbers
-                if "Team number must be between" in str(e):
-                    return f"Team {team_number} does not exist. Teams are numbered 1-3."
-                elif "Lane number must be between" in str(e):
-                    return f"Lane {lane_number} does not exist. Lanes are numbered 1-8."
-                else:
-                    return "Team and lane numbers must be integers."
+            team_number, lane_number = args["team"], args["lane"]
+            success, suggestions = self._service.assign_user(member, team_number, lane_number)
+            if success:
+                return f"Successfully assigned {member} to Team {team_number}, Lane {lane_number}."
+            elif suggestions:
+                return f"Lane taken. {format_suggestions(suggestions)}"
+            else:
+                return f"All lanes are full. {WAITLIST_HINT}"
 
         return "Invalid assign command. Use --team and --lane to specify a lane, or --any-empty to assign to any empty lane."
 
-    def _handle_remove(self, args: Dict[str, str], author: str, is_admin: bool) -> str:
+    def _handle_bulk(self, text: str, author: str, is_admin: bool) -> str:
+        """
+        Handle the bulk command.
+
+        Args:
+            text: The ``member:team:lane`` entries
+            author: The author of the command
+            is_admin: Whether the author is an admin
+
+        Returns:
+            str: One summary of everything that was assigned or refused
+        """
+        if not is_admin:
+            return "Only admins can assign other members."
+
+        entries, malformed = parse_bulk_entries(text)
+        if not entries and not malformed:
+            return "Invalid bulk command. Provide entries as member:team:lane."
+
+        return format_bulk_summary(self._service.bulk_assign(entries), malformed)
+
+    def _handle_fill(self, text: str, author: str, is_admin: bool) -> str:
+        """
+        Handle the fill command.
+
+        Args:
+            text: The member names of the waiting list
+            author: The author of the command
+            is_admin: Whether the author is an admin
+
+        Returns:
+            str: One summary of who was placed
+        """
+        if not is_admin:
+            return "Only admins can assign other members."
+
+        members = parse_fill_members(text)
+        if not members:
+            return "Invalid fill command. Provide the member names to place."
+
+        return format_fill_summary(self._service.auto_fill(members))
+
+    def _handle_remove(self, args: Dict[str, Any], author: str, is_admin: bool) -> str:
         """
         Handle the remove command.
 
@@ -150,66 +211,364 @@ class CommandParser:
         if not member:
             member = author
 
-        removed = self._service.remove_user(member)
-        if removed:
-            return f"Removed {member} from lane."
+        result = self._service.release_user(member)
+        if result.removed:
+            return f"Removed {member} from lane." + format_promotions(result.promoted)
         else:
             return f"{member} is not assigned to any lanes."
 
-    def _handle_list(self, args: Dict[str, str], author: str, is_admin: bool) -> str:
+    def _handle_waitlist(self, args: Dict[str, Any], author: str, is_admin: bool) -> str:
         """
-        Handle the list command.
+        Handle the waitlist command.
 
         Args:
-            args: The command arguments
+            args: The command arguments; ``--leave`` leaves the queue, ``--show`` lists it
             author: The author of the command
             is_admin: Whether the author is an admin
 
         Returns:
-            str: The response message with a formatted list of all team assignments
+            str: The response message
         """
-        # Get the current status of all teams
-        assignments = self._service.list_all_assignments()
+        if "show" in args:
+            return format_waitlist(self._service.waiting())
 
-        # Convert assignments to team status format
-        team_status = {}
-        for key, assignment in assignments.items():
-            team = assignment.team
-            lane = assignment.lane
-            user = assignment.user
+        member = args.get("member")
+        if member and not is_admin:
+            return "Only admins can queue other members."
+        if not member:
+            member = author
 
-            if team not in team_status:
-                team_status[team] = {}
+        if "leave" in args:
+            if self._service.leave_waitlist(member):
+                return f"{member} left the waitlist."
+            return f"{member} is not on the waitlist."
 
-            team_status[team][lane] = user
+        position = self._service.join_waitlist(member)
+        if position is None:
+            return f"{member} already holds a lane."
+        return f"{member} is number {position} on the waitlist."
 
-        if not team_status:
-            return "No teams found."
+    def _handle_undo(self, args: Dict[str, Any], author: str, is_admin: bool) -> str:
+        """
+        Handle the undo command.
+
+        Args:
+            args: The command arguments; ``--steps`` is how many changes to roll back
+            author: The author of the command
+            is_admin: Whether the author is an admin
+
+        Returns:
+            str: The response message
+        """
+        if not is_admin:
+            return "Only admins can undo changes."
+        return self._travel(self._service.undo, "undo", args)
+
+    def _handle_redo(self, args: Dict[str, Any], author: str, is_admin: bool) -> str:
+        """
+        Handle the redo command.
+
+        Args:
+            args: The command arguments; ``--steps`` is how many undone changes to reapply
+            author: The author of the command
+            is_admin: Whether the author is an admin
 
-        # Format the output
-        output = ["**Current Team Assignments:**"]
+        Returns:
+            str: The response message
+        """
+        if not is_admin:
+            return "Only admins can redo changes."
+        return self._travel(self._service.redo, "redo", args)
+
+    def _handle_history(self, args: Dict[str, Any], author: str, is_admin: bool) -> str:
+        """
+        Handle the history command.
+
+        Args:
+            args: The command arguments; ``--limit`` is how many recent changes to list
+            author: The author of the command
+            is_admin: Whether the author is an admin
 
-        for team_number in sorted(team_status.keys()):
-            team_lanes = team_status[team_number]
-            team_line = f"**Team {team_number}**"
-            output.append(team_line)
+        Returns:
+            str: The response message
+        """
+        return format_events(*self._service.history(args.get("limit", 20)))
 
-            # Count occupied lanes
-            occupied_lanes = sum(1 for member in team_lanes.values() if member is not None)
+    @staticmethod
+    def _travel(step, action: str, args: Dict[str, Any]) -> str:
+        steps = args.get("steps", 1)
+        if steps < 1:
+            return "Steps must be at least 1."
+        return format_travel(action, step(steps))
 
-            # Add lane information
-            lane_lines = []
-            for lane_number in sorted(team_lanes.keys()):
-                member = team_lanes[lane_number]
-                status = f"Lane {lane_number}: {member if member else 'Empty'}"
-                lane_lines.append(status)
+    def _handle_profile(self, args: Dict[str, Any], author: str, is_admin: bool) -> str:
+        """
+        Handle the profile command.
 
-            # Add summary line
-            summary = f"{occupied_lanes}/8 lanes filled"
-            output.append(summary)
+        Args:
+            args: The command arguments; ``--on``/``--rate`` start sampling, ``--off`` stops it
+            author: The author of the command
+            is_admin: Whether the author is an admin
 
-            # Add lane details
-            output.extend(lane_lines)
-            output.append("")  # Empty line between teams
+        Returns:
+            str: The response message
+        """
+        if not is_admin:
+            return "Only admins can control profiling."
+        try:
+            return apply_profile_command(args)
+        except CommandError as e:
+            return str(e)
+
+    def _handle_list(self, args: Dict[str, Any], author: str, is_admin: bool) -> str:
+        """
+        Handle the list command.
 
+        Args:
+            args: The command arguments
+            author: The author of the command
+            is_admin: Whether the author is an admin
+
+        Returns:
+            str: The response message with a formatted list of all team assignments
+        """
+        return self._render_cache.render(self._service.repo, "list")
+
+    @staticmethod
+    def _format_team_block(team_number: int, lanes: Tuple[Optional[str], ...]) -> Optional[str]:
+        """
+        Format one team of the list output.
+
+        Args:
+            team_number: The team number
+            lanes: The member in each lane, None for empty lanes
+
+        Returns:
+            Optional[str]: The team's lines, or None if the team has no members
+        """
+        occupied = [(lane_number, member) for lane_number, member in enumerate(lanes, 1) if member is not None]
+        if not occupied:
+            return None
+
+        output = [f"**Team {team_number}**"]
+
+        # Add summary line
+        output.append(f"{len(occupied)}/{len(lanes)} lanes filled")
+
+        # Add lane details
+        output.extend(f"Lane {lane_number}: {member}" for lane_number, member in occupied)
+        output.append("")  # Empty line between teams
         return "\n".join(output)
+
+    @staticmethod
+    def _assemble_list(blocks: List[Optional[str]]) -> str:
+        """
+        Join the team blocks of the list output.
+
+        Args:
+            blocks: The formatted teams in team order
+
+        Returns:
+            str: The response message
+        """
+        blocks = [block for block in blocks if block is not None]
+        if not blocks:
+            return "No teams found."
+        return "\n".join(["**Current Team Assignments:**"] + blocks)
+
+
+def format_suggestions(suggestions: List[Tuple[int, int]]) -> str:
+    """
+    Describe ranked alternative lanes, best first.
+
+    Args:
+        suggestions: Free (team, lane) pairs, best first
+
+    Returns:
+        str: The suggestion sentence
+    """
+    best, *others = suggestions
+    text = f"Suggested: Team {best[0]} Lane {best[1]}"
+    if others:
+        text += " (also free: " + ", ".join(f"Team {team} Lane {lane}" for team, lane in others) + ")"
+    return text
+
+
+def format_bulk_summary(result: BulkResult, malformed: List[str]) -> str:
+    """
+    Summarize a bulk assignment in one message.
+
+    Args:
+        result: The outcome of the bulk assignment
+        malformed: Entries that could not be parsed
+
+    Returns:
+        str: The response message
+    """
+    output = [f"Assigned {len(result.assigned)} member(s)."]
+    output.extend(f"Team {team} Lane {lane}: {member}" for member, team, lane in result.assigned)
+    if result.conflicts:
+        output.append(f"{len(result.conflicts)} conflict(s):")
+        for conflict in result.conflicts:
+            line = f"{conflict.user} (Team {conflict.team} Lane {conflict.lane}): {conflict.reason}"
+            if conflict.suggestion:
+                line += f" Suggested: Team {conflict.suggestion[0]} Lane {conflict.suggestion[1]}"
+            output.append(line)
+    if malformed:
+        output.append(f"Could not read: {', '.join(malformed)}")
+    return "\n".join(output)
+
+
+def format_fill_summary(result: FillResult) -> str:
+    """
+    Summarize an auto-fill in one message.
+
+    Args:
+        result: The outcome of the auto-fill
+
+    Returns:
+        str: The response message
+    """
+    output = [f"Placed {len(result.assigned)} member(s)."]
+    output.extend(f"Team {team} Lane {lane}: {member}" for member, team, lane in result.assigned)
+    if result.already_assigned:
+        output.append(f"Already assigned: {', '.join(result.already_assigned)}")
+    if result.unplaced:
+        output.append(f"No free lane for: {', '.join(result.unplaced)}")
+    return "\n".join(output)
+
+
+def format_promotions(promoted: Tuple[Tuple[str, int, int], ...]) -> str:
+    """
+    Announce members promoted from the waitlist, as a suffix to another message.
+
+    Args:
+        promoted: The promoted members and their lanes
+
+    Returns:
+        str: The announcement, empty if nobody was promoted
+    """
+    return "".join(f"\n{member} moved up from the waitlist to Team {team} Lane {lane}."
+                   for member, team, lane in promoted)
+
+
+def format_waitlist(members: List[str]) -> str:
+    """
+    List the waitlist in queue order.
+
+    Args:
+        members: The waiting members, head of the queue first
+
+    Returns:
+        str: The response message
+    """
+    if not members:
+        return "The waitlist is empty."
+    return "Waitlist:\n" + "\n".join(f"{position}. {member}" for position, member in enumerate(members, 1))
+
+
+def format_backups(backups: List[Backup], limit: int = 10) -> str:
+    """
+    List a roster's backups, newest first.
+
+    Args:
+        backups: The roster's backups, newest first
+        limit: Most backups to list
+
+    Returns:
+        str: The response message
+    """
+    if not backups:
+        return "There are no backups yet."
+    lines = [f"{backup.name} ({backup.taken_at:%Y-%m-%d %H:%M} UTC)" for backup in backups[:limit]]
+    if len(backups) > limit:
+        lines.append(f"… and {len(backups) - limit} older")
+    return "Backups, newest first:\n" + "\n".join(lines) + "\nRestore one with --backup <name> or --latest."
+
+
+def describe_event(event: Event) -> str:
+    """
+    Describe one roster change in a sentence.
+
+    Args:
+        event: The change
+
+    Returns:
+        str: The description, naming any members promoted by it
+    """
+    if event.kind == "assign":
+        text = f"{event.user} assigned to Team {event.slot[0]} Lane {event.slot[1]}"
+    elif event.kind == "move":
+        text = (f"{event.user} moved from Team {event.previous[0]} Lane {event.previous[1]} "
+                f"to Team {event.slot[0]} Lane {event.slot[1]}")
+    elif event.kind == "remove":
+        text = f"{event.user} removed from Team {event.previous[0]} Lane {event.previous[1]}"
+    elif event.kind == "reset":
+        text = "Roster reset"
+    elif event.kind == "wait":
+        text = f"{event.user} joined the waitlist"
+    else:
+        text = f"{event.user} left the waitlist"
+    return text + "".join(f"; {member} moved up to Team {team} Lane {lane}" for member, team, lane in event.promoted)
+
+
+def format_events(events: List[Event], cursor: int) -> str:
+    """
+    List recent roster changes, oldest first.
+
+    Args:
+        events: The changes, oldest first
+        cursor: Index of the change in effect; later ones have been undone
+
+    Returns:
+        str: The response message
+    """
+    if not events:
+        return "No changes recorded yet."
+    lines = [f"#{event.seq} {describe_event(event)}" + (" (undone)" if event.seq > cursor else "")
+             for event in events]
+    return "Changes, oldest first:\n" + "\n".join(lines)
+
+
+def format_travel(action: str, events: List[Event]) -> str:
+    """
+    Report the changes an undo or redo stepped over.
+
+    Args:
+        action: "undo" or "redo"
+        events: The changes, in the order they were stepped over
+
+    Returns:
+        str: The response message
+    """
+    if not events:
+        return f"Nothing to {action}."
+    verb = "Undid" if action == "undo" else "Redid"
+    return f"{verb} {len(events)} change(s):\n" + "\n".join(f"#{e.seq} {describe_event(e)}" for e in events)
+
+
+def apply_profile_command(args: Dict[str, Any]) -> str:
+    """
+    Turn the sampling profiler on or off, or report on it.
+
+    Args:
+        args: Parsed profile options; ``on`` or ``rate`` enable, ``off`` disables
+
+    Returns:
+        str: The profiler status, followed by the latest sample's summary when showing status
+
+    Raises:
+        CommandError: If the sample rate is out of range
+    """
+    if "off" in args:
+        PROFILER.disable()
+        return PROFILER.status()
+    if "on" in args or "rate" in args:
+        try:
+            PROFILER.enable(args.get("rate"))
+        except ValueError as e:
+            raise CommandError(str(e)) from None
+        return PROFILER.status()
+    if PROFILER.recent:
+        return f"{PROFILER.status()}\nLatest sample:\n{PROFILER.recent[-1]}"
+    return PROFILER.status()
@@ -0,0 +1,62 @@
+"""
+Text and Discord embed renderings of a roster.
+
+discord.py is only imported the first time an embed is built; importing
+this module, or rendering text, does not pay for it.
+"""
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+from core.models import Assignment, DEFAULT_GRID, GridConfig
+from core.profiling import profiled
+
+if TYPE_CHECKING:
+    import discord
+
+# Discord rejects embeds with more fields or longer field values than this
+EMBED_MAX_FIELDS = 25
+EMBED_MAX_FIELD_VALUE = 1024
+
+# Placeholder rendered for a lane nobody holds
+EMPTY_LANE = "⬜"
+
+
+def format_team_row(team: int, lanes: Tuple[Optional[str], ...]) -> str:
+    return f"Team {team}: " + " | ".join(lane or EMPTY_LANE for lane in lanes)
+
+
+@profiled("render.format_assignments")
+def format_assignments(assignments: List[Assignment], grid: GridConfig = DEFAULT_GRID) -> str:
+    layout = Assignment.team_layout(assignments, grid)
+    return "\n".join(format_team_row(team, lanes) for team, lanes in layout.items())
+
+
+def embed_field(team: int, lanes: Tuple[Optional[str], ...]) -> Tuple[str, str]:
+    value = " | ".join(lane or EMPTY_LANE for lane in lanes)
+    if len(value) > EMBED_MAX_FIELD_VALUE:
+        value = value[:EMBED_MAX_FIELD_VALUE - 1] + "…"
+    return f"Team {team}", value
+
+
+def embed_from_fields(fields: Iterable[Tuple[str, str]]) -> "discord.Embed":
+    import discord
+
+    embed = discord.Embed(
+        title="📋 Team Lane Assignments",
+        description="Current team layout:",
+        color=discord.Color.green()
+    )
+
+    fields = list(fields)
+    if len(fields) > EMBED_MAX_FIELDS:
+        hidden = len(fields) - EMBED_MAX_FIELDS + 1
+        fields = fields[:EMBED_MAX_FIELDS - 1] + [("…", f"{hidden} more teams not shown")]
+    for name, value in fields:
+        embed.add_field(name=name, value=value, inline=False)
+
+    return embed
+
+
+@profiled("render.to_discord_embed")
+def to_discord_embed(assignments: List[Assignment], grid: GridConfig = DEFAULT_GRID) -> "discord.Embed":
+    layout = Assignment.team_layout(assignments, grid)
+    return embed_from_fields(embed_field(team, lanes) for team, lanes in layout.items())
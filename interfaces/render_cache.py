@@ -0,0 +1,85 @@
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.profiling import profiled
+from interfaces import presentation
+
+# Renders one team row from (team, lanes); lanes hold a user or None per lane
+RowRenderer = Callable[[int, Tuple[Optional[str], ...]], Any]
+# Joins the rendered rows into the final output
+Assembler = Callable[[List[Any]], Any]
+
+
+class RenderCache:
+    """
+    Memoizes roster listings per (roster, version, format).
+
+    A listing is reused as long as the repository's mutation version has not
+    moved. When it has, only team rows whose lanes changed are rendered again;
+    unchanged rows come from a row cache shared by all rosters. Cached outputs
+    are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_rows: int = 4096):
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.row_hits = 0
+        self.row_misses = 0
+        # repository -> {format: (version, output)}; dropped with the repository
+        self._outputs: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        # (format, team, lanes) -> rendered row
+        self._rows: Dict[Tuple[str, int, Tuple[Optional[str], ...]], Any] = {}
+        self._formats: Dict[str, Tuple[RowRenderer, Assembler]] = {
+            "text": (presentation.format_team_row, "\n".join),
+            "embed": (presentation.embed_field, presentation.embed_from_fields),
+        }
+
+    def register(self, fmt: str, render_row: RowRenderer, assemble: Assembler):
+        """Add an output format built from per-team rows."""
+        if self._formats.get(fmt) != (render_row, assemble):
+            self._formats[fmt] = (render_row, assemble)
+            self.invalidate()
+
+    @profiled("render.cache")
+    def render(self, repo, fmt: str):
+        """Return the ``fmt`` listing of ``repo``, rendering only what changed."""
+        version = repo.version
+        outputs = self._outputs.setdefault(repo, {})
+        cached = outputs.get(fmt)
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        render_row, assemble = self._formats[fmt]
+        output = assemble(self._render_rows(fmt, render_row, repo.team_rows()))
+        outputs[fmt] = (version, output)
+        return output
+
+    def invalidate(self):
+        self._outputs.clear()
+        self._rows.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "row_hits": self.row_hits,
+            "row_misses": self.row_misses,
+        }
+
+    def _render_rows(self, fmt: str, render_row: RowRenderer,
+                     team_rows: Dict[int, Tuple[Optional[str], ...]]) -> List[Any]:
+        rows = []
+        for team, lanes in team_rows.items():
+            key = (fmt, team, lanes)
+            try:
+                row = self._rows[key]
+                self.row_hits += 1
+            except KeyError:
+                self.row_misses += 1
+                if len(self._rows) >= self.max_rows:
+                    self._rows.clear()
+                row = self._rows[key] = render_row(team, lanes)
+            rows.append(row)
+        return rows
@@ -30,6 +30,35 @@ def run_bot(c):
     """Run the Discord bot"""
     c.run("python bot.py")
 
+@task
+def migrate_sqlite(c, source="assignments.json", target="assignments.db"):
+    """Import a JSON assignment store into the SQLite backend"""
+    from core.sqlite_repository import SqliteAssignmentRepository
+
+    repo = SqliteAssignmentRepository(target)
+    count = repo.import_json(source)
+    repo.close()
+    print(f"Imported {count} assignments from {source} into {target}")
+
+@task
+def bench(c, output="bench-results.json", baseline="benchmarks/baseline.json", threshold=0.25,
+          update_baseline=False, filter=""):
+    """Run the benchmark suite and fail on regressions against the baseline"""
+    args = f"--output {output} --baseline {baseline} --threshold {threshold}"
+    if update_baseline:
+        args += " --update-baseline"
+    if filter:
+        args += f" --filter {filter}"
+    c.run(f"python -m benchmarks.suite {args}")
+
+@task
+def load_test(c, commands=5000, concurrency=100, guilds=4, grid="3x8", script="", mode="snapshot"):
+    """Replay a signup storm or a JSONL command script through the bot offline"""
+    args = f"--commands {commands} --concurrency {concurrency} --guilds {guilds} --grid {grid} --mode {mode}"
+    if script:
+        args += f" --script {script}"
+    c.run(f"python -m benchmarks.load_generator {args}")
+
 @task
 def lint(c):
     """Run linting checks"""
@@ -70,3 +70,26 @@ Scenario: User lists all team assignments
     And the system should respond with a message containing "Lane 3: alice"
     And the system should respond with a message containing "Team 2"
     And the system should respond with a message containing "Lane 5: bob"
+
+  Scenario: Admin assigns a whole roster at once
+    Given "holder" is assigned to team 1 lane 1
+    When the admin runs "bulk alice:1:1 bob:2:5 carol:3:8"
+    Then "bob" is assigned to team 2 lane 5
+    And "carol" is assigned to team 3 lane 8
+    And the system should respond with a message containing "Assigned 2 member(s)."
+    And the system should respond with a message containing "Lane taken by holder."
+
+  Scenario: Admin places a waiting list
+    Given "holder" is assigned to team 1 lane 1
+    When the admin runs "fill alice bob carol"
+    Then "alice" is assigned to team 2 lane 1
+    And "bob" is assigned to team 3 lane 1
+    And "carol" is assigned to team 1 lane 2
+    And the system should respond with a message containing "Placed 3 member(s)."
+
+  Scenario: Member waits for a lane when the roster is full
+    Given all lanes are occupied
+    When the user "late" runs "waitlist"
+    And the admin runs "remove --member user2_3"
+    Then "late" is assigned to team 2 lane 3
+    And the system should respond with a message containing "late moved up from the waitlist to Team 2 Lane 3."
@@ -63,3 +63,20 @@ def test_all_lanes_occupied():
 def test_user_lists_all_team_assignments():
     """Test that a user can list all team assignments."""
     pass
+
+@scenario(feature_file_path, 'Admin assigns a whole roster at once')
+def test_admin_bulk_assigns():
+    """Test that an admin can assign many members in one command."""
+    pass
+
+
+@scenario(feature_file_path, 'Admin places a waiting list')
+def test_admin_fills_waiting_list():
+    """Test that an admin can place a waiting list on the least-filled teams."""
+    pass
+
+
+@scenario(feature_file_path, 'Member waits for a lane when the roster is full')
+def test_member_promoted_from_waitlist():
+    """Test that a waiting member takes the next freed lane."""
+    pass
@@ -0,0 +1,172 @@
+"""
+Stand-ins for the discord.py objects the bot's handlers touch.
+
+Interactions, command contexts and channels record every message sent
+through them instead of talking to Discord, so the real handlers of
+bot.py can run offline. Only the attributes the handlers use exist: an
+interaction has ``user`` and ``guild_id`` but no ``author``, a context has
+``author`` and ``guild`` but no ``guild_id``, which is how the adapter
+tells them apart.
+
+Given a FakeClock, a channel also stamps every message and edit with the
+time it happened at, under ``at``, for tests of rate limits and windows.
+The offline load generator in benchmarks/ drives the bot with these too.
+"""
+import asyncio
+import itertools
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+_ids = itertools.count(1)
+
+
+class FakeClock:
+    """A clock moved by hand; its sleep just moves time forward."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def set(self, *when: int):
+        """Move to the UTC wall-clock time ``datetime(*when)``, for a clock standing in for ``time.time``."""
+        self.now = datetime(*when, tzinfo=timezone.utc).timestamp()
+
+    async def sleep(self, seconds: float):
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+class FakeUser:
+    def __init__(self, name: str):
+        self.id = next(_ids)
+        self.name = name
+
+
+class FakeGuild:
+    def __init__(self, id: int):
+        self.id = id
+
+
+class FakeAttachment:
+    """An uploaded text file."""
+
+    def __init__(self, text: str, filename: str = "entries.txt"):
+        self.filename = filename
+        self._data = text.encode()
+
+    async def read(self) -> bytes:
+        return self._data
+
+
+class FakeMessage:
+    """A posted message; edits are kept in order."""
+
+    def __init__(self, channel: "FakeChannel", content: Optional[str] = None, **kwargs):
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = content
+        self.embed = kwargs.get("embed")
+        self.edits: List[Dict[str, Any]] = []
+
+    async def edit(self, content: Optional[str] = None, **kwargs):
+        self.edits.append(self.channel.record(content, kwargs))
+        if content is not None:
+            self.content = content
+        self.embed = kwargs.get("embed", self.embed)
+
+
+class FakeChannel:
+    """A text channel keeping every message posted to it."""
+
+    def __init__(self, id: int, clock: Optional[Callable[[], float]] = None):
+        self.id = id
+        self.clock = clock
+        self.sent: List[Dict[str, Any]] = []
+        self.messages: List[FakeMessage] = []
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> FakeMessage:
+        # Yield like a network call would
+        await asyncio.sleep(0)
+        self.sent.append(self.record(content, kwargs))
+        message = FakeMessage(self, content, **kwargs)
+        self.messages.append(message)
+        return message
+
+    def record(self, content: Optional[str], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """What a send or an edit leaves behind: its arguments, and its time when there is a clock."""
+        entry = dict(kwargs, content=content)
+        if self.clock is not None:
+            entry["at"] = self.clock()
+        return entry
+
+
+class FakeResponse:
+    """``Interaction.response``: one reply or deferral per interaction, as Discord allows."""
+
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content: Optional[str] = None, **kwargs):
+        self._respond()
+        await asyncio.sleep(0)
+        self._interaction.sent.append(dict(kwargs, content=content))
+
+    async def defer(self, **kwargs):
+        self._respond()
+        self._interaction.deferred = True
+
+    def _respond(self):
+        if self._done:
+            raise RuntimeError("This interaction has already been responded to before")
+        self._done = True
+
+
+class FakeFollowup:
+    """``Interaction.followup``: messages sent after the first response."""
+
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        if not self._interaction.response.is_done():
+            raise RuntimeError("Followups need a response or deferral first")
+        await asyncio.sleep(0)
+        self._interaction.sent.append(dict(kwargs, content=content))
+
+
+class FakeInteraction:
+    """A slash command invocation."""
+
+    def __init__(self, user: str, guild_id: Optional[int], channel: FakeChannel):
+        self.user = FakeUser(user)
+        self.guild_id = guild_id
+        self.guild = FakeGuild(guild_id) if guild_id is not None else None
+        self.channel = channel
+        self.channel_id = channel.id
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.deferred = False
+        self.sent: List[Dict[str, Any]] = []
+
+
+class FakeContext:
+    """A legacy text command invocation; replies are posted to its channel."""
+
+    def __init__(self, author: str, guild_id: Optional[int], channel: FakeChannel,
+                 attachments: Optional[List[FakeAttachment]] = None):
+        self.author = FakeUser(author)
+        self.guild = FakeGuild(guild_id) if guild_id is not None else None
+        self.channel = channel
+        self.message = FakeMessage(channel)
+        self.message.attachments = list(attachments or [])
+        self.sent: List[Dict[str, Any]] = []
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> FakeMessage:
+        self.sent.append(dict(kwargs, content=content))
+        return await self.channel.send(content, **kwargs)
@@ -0,0 +1,28 @@
+import pytest
+
+from core.repository import PersistentAssignmentRepository
+from core.services import AssignmentService
+
+
+class CountingRepository(PersistentAssignmentRepository):
+    """Persistent repository that counts snapshot writes."""
+
+    saves = 0
+
+    def save(self):
+        self.saves += 1
+        super().save()
+
+
+@pytest.fixture
+def counting_repository(tmp_path):
+    """Create a CountingRepository saving to a temporary file."""
+    repo = CountingRepository(str(tmp_path / "assignments.json"))
+    yield repo
+    repo.close()
+
+
+@pytest.fixture
+def counting_service(counting_repository):
+    """Create a service on the counting repository."""
+    return AssignmentService(counting_repository)
@@ -1,6 +1,6 @@
 import pytest
 
-from core.repository import InMemoryAssignmentRepository
+from core.repository import InMemoryAssignmentRepository, PersistentAssignmentRepository
 from core.services import AssignmentService
 
 
@@ -25,11 +25,11 @@ class TestAssignmentService:
         lane_number = 3
 
         # Act
-        success, suggestion = service.assign_user(member, team_number, lane_number)
+        success, suggestions = service.assign_user(member, team_number, lane_number)
 
         # Assert
         assert success is True
-        assert suggestion is None
+        assert suggestions == []
 
     def test_assign_to_lane_nonexistent_team(self, service):
         """Test assigning a member to a nonexistent team."""
@@ -71,11 +71,11 @@ class TestAssignmentService:
         service.assign_user(member1, team_number, lane_number)
 
         # Act - Try to assign member2 to the same lane
-        success, suggestion = service.assign_user(member2, team_number, lane_number)
+        success, suggestions = service.assign_user(member2, team_number, lane_number)
 
         # Assert
         assert success is False
-        assert suggestion is not None  # Should suggest an alternative lane
+        assert suggestions  # Should suggest alternative lanes
 
     def test_assign_to_any_empty_success(self, service):
         """Test assigning a member to any empty lane."""
@@ -190,3 +190,141 @@ class TestAssignmentService:
         assert assignments[f"{team1}-{lane1}"].lane == lane1
         assert assignments[f"{team2}-{lane2}"].team == team2
         assert assignments[f"{team2}-{lane2}"].lane == lane2
+
+
+class TestBulkAssign:
+    """Tests for AssignmentService.bulk_assign."""
+
+    @pytest.fixture
+    def repository(self):
+        """Create a repository for testing."""
+        return InMemoryAssignmentRepository()
+
+    @pytest.fixture
+    def service(self, repository):
+        """Create a service for testing."""
+        return AssignmentService(repository)
+
+    def test_assigns_every_valid_entry(self, service, repository):
+        """Test that a conflict-free batch is applied in full."""
+        # Act
+        result = service.bulk_assign([("alice", 1, 1), ("bob", 2, 2), ("carol", 3, 3)])
+
+        # Assert
+        assert result.conflicts == []
+        assert len(result.assigned) == 3
+        assert repository.find_assignment("carol").lane == 3
+
+    def test_reports_conflicts_with_distinct_suggestions(self, service, repository):
+        """Test that taken and invalid lanes are refused with suggestions."""
+        # Arrange
+        service.assign_user("holder", 1, 1)
+
+        # Act
+        result = service.bulk_assign([("alice", 1, 1), ("bob", 1, 1), ("carol", 9, 1), ("dave", 1, 2)])
+
+        # Assert
+        assert [a[0] for a in result.assigned] == ["dave"]
+        reasons = {c.user: c for c in result.conflicts}
+        assert "Lane taken by holder" in reasons["alice"].reason
+        assert "listed more than once" in reasons["bob"].reason
+        assert "Team number must be between" in reasons["carol"].reason
+        suggestions = [c.suggestion for c in result.conflicts]
+        assert None not in suggestions
+        assert len(set(suggestions)) == len(suggestions)
+        assert (1, 1) not in suggestions and (1, 2) not in suggestions
+
+    def test_swaps_within_batch(self, service, repository):
+        """Test that two members can trade lanes in one batch."""
+        # Arrange
+        service.assign_user("alice", 1, 1)
+        service.assign_user("bob", 1, 2)
+
+        # Act
+        result = service.bulk_assign([("alice", 1, 2), ("bob", 1, 1)])
+
+        # Assert
+        assert result.conflicts == []
+        assert repository.find_assignment("alice").lane == 2
+        assert repository.find_assignment("bob").lane == 1
+
+    def test_blocked_mover_keeps_its_lane(self, service, repository):
+        """Test that a lane stays taken when its holder's own move is refused."""
+        # Arrange
+        service.assign_user("alice", 1, 1)
+        service.assign_user("holder", 2, 1)
+
+        # Act
+        result = service.bulk_assign([("alice", 2, 1), ("bob", 1, 1)])
+
+        # Assert
+        assert result.assigned == []
+        assert repository.find_assignment("alice").lane == 1
+        assert repository.find_assignment("bob") is None
+
+    def test_single_persistence_write(self, counting_service, counting_repository):
+        """Test that a bulk assignment is saved once."""
+        # Act
+        counting_service.bulk_assign([(f"user{lane}", 1, lane) for lane in range(1, 9)])
+
+        # Assert
+        assert counting_repository.saves == 1
+        assert len(PersistentAssignmentRepository(counting_repository.path).assignments) == 8
+
+
+class TestAutoFill:
+    """Tests for load-balanced placement: assign_random and auto_fill."""
+
+    @pytest.fixture
+    def repository(self):
+        """Create a repository for testing."""
+        return InMemoryAssignmentRepository()
+
+    @pytest.fixture
+    def service(self, repository):
+        """Create a service for testing."""
+        return AssignmentService(repository)
+
+    def test_assign_random_prefers_least_filled_team(self, service, repository):
+        """Test that random assignments spread across teams instead of filling Team 1 first."""
+        # Arrange
+        service.assign_user("alice", 1, 1)
+        service.assign_user("bob", 2, 1)
+
+        # Act
+        slot = service.assign_random("carol")
+
+        # Assert
+        assert slot == (3, 1)
+
+    def test_auto_fill_balances_teams(self, service, repository):
+        """Test that a waiting list is spread evenly over the teams."""
+        # Act
+        result = service.auto_fill([f"user{n}" for n in range(7)])
+
+        # Assert
+        teams = [team for _, team, _ in result.assigned]
+        assert sorted(teams.count(team) for team in (1, 2, 3)) == [2, 2, 3]
+
+    def test_auto_fill_reports_skipped_members(self, service, repository):
+        """Test that assigned members keep their lane and overflow is reported."""
+        # Arrange
+        service.assign_user("alice", 2, 5)
+
+        # Act
+        result = service.auto_fill(["alice"] + [f"user{n}" for n in range(24)])
+
+        # Assert
+        assert result.already_assigned == ["alice"]
+        assert len(result.assigned) == 23
+        assert result.unplaced == ["user23"]
+        assert repository.find_assignment("alice").lane == 5
+
+    def test_auto_fill_single_persistence_write(self, counting_service, counting_repository):
+        """Test that an auto-fill is saved once."""
+        # Act
+        counting_service.auto_fill([f"user{n}" for n in range(10)])
+
+        # Assert
+        assert counting_repository.saves == 1
+        assert len(PersistentAssignmentRepository(counting_repository.path).assignments) == 10
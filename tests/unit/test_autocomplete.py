@@ -0,0 +1,142 @@
+import discord
+import pytest
+
+from bot import build_bot
+from core import members as members_module
+from core.members import MemberTable, PrefixIndex
+from core.models import GridConfig
+from core.repository import InMemoryAssignmentRepository
+from infrastructure.discord_adapter import DiscordAdapter
+from interfaces.autocomplete import Autocomplete
+
+
+class TestPrefixIndex:
+    """Tests for the PrefixIndex class."""
+
+    def test_complete_ignores_case_and_keeps_order(self):
+        """Test that names are matched case-insensitively, in sorted order, up to the limit."""
+        # Arrange
+        index = PrefixIndex(["bob", "Alice", "carl"])
+        index.add("alan")
+        index.add("Al")
+
+        # Act & Assert
+        assert index.complete("al") == ["Al", "alan", "Alice"]
+        assert index.complete("AL", limit=2) == ["Al", "alan"]
+        assert index.complete("") == ["Al", "alan", "Alice", "bob", "carl"]
+        assert index.complete("z") == []
+
+    def test_member_table_indexes_interned_names(self):
+        """Test that every interned name can be completed, once."""
+        # Arrange
+        members = MemberTable()
+        for name in ("Jo Ann", "joe", "Jo Ann"):
+            members.intern(name)
+
+        # Act
+        names = members.complete("jo")
+
+        # Assert
+        assert names == ["Jo Ann", "joe"]
+
+    def test_50k_members_are_indexed_once(self, monkeypatch):
+        """Test that keystroke lookups among tens of thousands of names build the index once and catch it up."""
+        # Arrange
+        built = []
+
+        class CountingIndex(PrefixIndex):
+            def __init__(self, names=()):
+                built.append(self)
+                super().__init__(names)
+
+        monkeypatch.setattr(members_module, "PrefixIndex", CountingIndex)
+        members = MemberTable()
+        for n in range(50_000):
+            members.intern(f"member{n}")
+
+        # Act
+        names = [members.complete("member12") for _ in range(100)]
+        members.intern("member12x")
+        later = members.complete("member12x")
+
+        # Assert
+        assert names[0] == sorted(f"member{n}" for n in range(50_000) if str(n).startswith("12"))[:25]
+        assert all(lookup == names[0] for lookup in names)
+        assert later == ["member12x"]
+        assert len(built) == 1
+
+
+class TestAutocomplete:
+    """Tests for the Autocomplete class."""
+
+    @pytest.fixture
+    def repo(self):
+        """Create a 2x3 roster with three lanes taken."""
+        repo = InMemoryAssignmentRepository(GridConfig(2, 3))
+        repo.assign("alice", 1, 1)
+        repo.assign("alan", 1, 3)
+        repo.assign("bob", 2, 2)
+        return repo
+
+    @pytest.fixture
+    def autocomplete(self):
+        """Create an autocomplete with the default limit."""
+        return Autocomplete()
+
+    def test_assigned_members_follow_the_roster(self, repo, autocomplete):
+        """Test that only members holding a lane are offered, and removals show up at once."""
+        # Arrange
+        repo.join_waitlist("albert")
+        before = autocomplete.assigned_members(repo, "al")
+
+        # Act
+        repo.remove("alice")
+        after = autocomplete.assigned_members(repo, "al")
+
+        # Assert
+        assert before == ["alan", "alice"]
+        assert after == ["alan"]
+
+    def test_known_members_stay_in_their_roster(self, repo, autocomplete):
+        """Test that names seen in one roster are never suggested in another."""
+        # Arrange
+        other = InMemoryAssignmentRepository(GridConfig(2, 3))
+        other.join_waitlist("alfred")
+        repo.remove("alan")
+
+        # Act & Assert
+        assert autocomplete.known_members(repo, "al") == ["alan", "alice"]
+        assert autocomplete.known_members(other, "al") == ["alfred"]
+
+    def test_free_lanes_of_the_chosen_team(self, repo, autocomplete):
+        """Test that lanes are offered only while free in the chosen team, or in any team without one."""
+        # Act & Assert
+        assert autocomplete.free_lanes(repo, 1) == [2]
+        assert autocomplete.free_lanes(repo, 2, "3") == [3]
+        assert autocomplete.free_lanes(repo, None) == [1, 2, 3]
+        assert autocomplete.free_lanes(repo, 9) == []
+
+    def test_open_teams_report_free_lanes(self, repo, autocomplete):
+        """Test that full teams are left out and open ones report their free lanes."""
+        # Arrange
+        repo.assign("carol", 1, 2)
+
+        # Act
+        teams = autocomplete.open_teams(repo)
+
+        # Assert
+        assert teams == [(2, 2)]
+
+    def test_slash_options_have_autocomplete(self, tmp_path, monkeypatch):
+        """Test that /assign member, team and lane and /remove member are autocompleted."""
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+        bot = build_bot(DiscordAdapter(), 1)
+
+        # Act
+        options = {name: {parameter.name for parameter in bot.tree.get_command(name, guild=discord.Object(1)).parameters
+                          if parameter.autocomplete}
+                   for name in ("assign", "remove")}
+
+        # Assert
+        assert options == {"assign": {"member", "team", "lane"}, "remove": {"member"}}
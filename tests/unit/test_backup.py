@@ -0,0 +1,307 @@
+import asyncio
+import gzip
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from core.backup import BackupManager
+from core.models import GridConfig
+from core.repository import InMemoryAssignmentRepository, PersistentAssignmentRepository
+from core.sqlite_repository import SqliteAssignmentRepository
+from infrastructure.discord_adapter import DiscordAdapter
+from tests.fake_discord import FakeClock
+
+
+class TestBackupManager:
+    """Tests for the BackupManager class."""
+
+    @pytest.fixture
+    def clock(self):
+        clock = FakeClock()
+        clock.set(2026, 10, 18, 9, 30)
+        return clock
+
+    @pytest.fixture
+    def manager(self, tmp_path, clock):
+        """Create a manager writing to a temporary directory."""
+        manager = BackupManager(str(tmp_path / "backups"), keep_hourly=3, keep_daily=2, clock=clock)
+        yield manager
+        manager.close()
+
+    @pytest.fixture
+    def repository(self):
+        """Create a roster with two members and one waiting."""
+        repo = InMemoryAssignmentRepository()
+        repo.assign("alice", 1, 1)
+        repo.assign("bob", 2, 3)
+        repo.join_waitlist("carol")
+        return repo
+
+    def test_backup_is_timestamped_and_compressed(self, manager, repository, tmp_path):
+        """Test that a backup is a gzipped JSON file named after the roster and the clock."""
+        # Act
+        backup = manager.create(repository, "default").result()
+
+        # Assert
+        assert backup.name == "default-20261018T093000000000Z.json.gz"
+        with gzip.open(tmp_path / "backups" / backup.name, "rt") as f:
+            data = json.load(f)
+        assert data["assignments"] == [{"user": "alice", "team": 1, "lane": 1}, {"user": "bob", "team": 2, "lane": 3}]
+        assert data["waitlist"] == ["carol"]
+        assert data["grid"] == [3, 8]
+
+    def test_backup_holds_the_state_when_requested(self, tmp_path, clock, repository):
+        """Test that changes made while the backup is still being written are not in it."""
+        # Arrange
+        gate = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+        manager = BackupManager(str(tmp_path / "backups"), clock=clock, executor=executor)
+        executor.submit(gate.wait)
+
+        # Act
+        future = manager.create(repository, "default")
+        repository.assign("dave", 3, 8)
+        repository.remove("alice")
+        gate.set()
+        future.result()
+        data = manager.load("default")
+        manager.close()
+
+        # Assert
+        assert [entry["user"] for entry in data["assignments"]] == ["alice", "bob"]
+
+    def test_retention_keeps_newest_per_hour_and_day(self, manager, clock, repository):
+        """Test that the newest backup of each recent hour and day survives pruning."""
+        # Arrange
+        times = [(16, 10, 0), (16, 22, 0), (17, 9, 0), (18, 8, 0), (18, 8, 30), (18, 9, 15), (18, 10, 45)]
+
+        # Act
+        for day, hour, minute in times:
+            clock.set(2026, 10, day, hour, minute)
+            manager.create(repository, "default").result()
+
+        # Assert
+        kept = [backup.taken_at.strftime("%d %H:%M") for backup in manager.backups("default")]
+        assert kept == ["18 10:45", "18 09:15", "18 08:30", "17 09:00"]
+
+    def test_rosters_are_pruned_separately(self, manager, clock, repository):
+        """Test that one roster's backups never count against another's."""
+        # Act
+        for hour in range(6):
+            clock.set(2026, 10, 18, hour)
+            manager.create(repository, "1").result()
+        manager.create(repository, "1-2").result()
+
+        # Assert
+        assert len(manager.backups("1")) == 3
+        assert len(manager.backups("1-2")) == 1
+
+    def test_load_unknown_backup(self, manager):
+        """Test that loading a backup that does not exist says so."""
+        # Act & Assert
+        with pytest.raises(FileNotFoundError, match="There are no backups yet"):
+            manager.load("default")
+
+    @pytest.mark.parametrize("backend", ["memory", "json", "sqlite"])
+    def test_restore_replaces_roster(self, manager, repository, tmp_path, backend):
+        """Test that restoring brings back the assignments and waitlist on every backend, and nothing else."""
+        # Arrange
+        if backend == "memory":
+            target = InMemoryAssignmentRepository()
+        elif backend == "json":
+            target = PersistentAssignmentRepository(str(tmp_path / "roster.json"))
+        else:
+            target = SqliteAssignmentRepository(str(tmp_path / "roster.db"))
+        target.assign("zed", 3, 3)
+        target.join_waitlist("wes")
+        manager.create(repository, "default").result()
+
+        # Act
+        manager.restore(target, manager.load("default"))
+
+        # Assert
+        assert sorted((a.user, a.team, a.lane) for a in target.assignments.values()) == [
+            ("alice", 1, 1), ("bob", 2, 3)]
+        assert target.waiting() == ["carol"]
+        target.close()
+
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    def test_snapshot_writes_nothing(self, tmp_path, backend, monkeypatch):
+        """Test that a snapshot reads the roster without starting a batch, which would sync or lock it for writing."""
+        # Arrange
+        if backend == "json":
+            repo = PersistentAssignmentRepository(str(tmp_path / "roster.json"))
+        else:
+            repo = SqliteAssignmentRepository(str(tmp_path / "roster.db"))
+        repo.assign("alice", 1, 1)
+        repo.join_waitlist("carol")
+
+        def no_batch():
+            raise AssertionError("snapshot started a batch")
+
+        monkeypatch.setattr(repo, "batch", no_batch)
+
+        # Act
+        data = BackupManager.snapshot(repo)
+
+        # Assert
+        assert data["assignments"] == [{"user": "alice", "team": 1, "lane": 1}]
+        assert data["waitlist"] == ["carol"]
+        assert data["version"] == repo.version
+        repo.close()
+
+    def test_restore_outside_grid_changes_nothing(self, manager, clock):
+        """Test that a backup from a larger grid is refused before the roster is touched."""
+        # Arrange
+        large = InMemoryAssignmentRepository(GridConfig(12, 20))
+        large.assign("alice", 12, 20)
+        manager.create(large, "default").result()
+        target = InMemoryAssignmentRepository()
+        target.assign("zed", 1, 1)
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            manager.restore(target, manager.load("default"))
+        assert target.find_assignment("zed") is not None
+
+
+class TestAdapterBackups:
+    """Tests for the backup and restore commands of the DiscordAdapter."""
+
+    @pytest.fixture
+    def adapter(self, tmp_path, monkeypatch):
+        """Create an adapter in an empty directory."""
+        monkeypatch.chdir(tmp_path)
+        adapter = DiscordAdapter()
+        yield adapter
+        adapter.close()
+
+    @pytest.fixture
+    def ctx(self):
+        return SimpleNamespace(guild=None, channel=SimpleNamespace(id=1), author=SimpleNamespace(name="admin"))
+
+    def test_backup_then_restore(self, adapter, ctx):
+        """Test that a roster can be backed up, changed and restored from the listing."""
+        async def scenario():
+            adapter.handle_assign(ctx, "--member alice --team 1 --lane 1")
+            created = await adapter.handle_backup(ctx)
+            adapter.handle_assign(ctx, "--member bob --team 2 --lane 2")
+            listing = await adapter.handle_restore(ctx, "")
+            restored = await adapter.handle_restore(ctx, "--latest")
+            await adapter.pipeline.close()
+            return created, listing, restored
+
+        # Act
+        created, listing, restored = asyncio.run(scenario())
+
+        # Assert
+        assert created.startswith("✅ Backup default-")
+        assert "Backups, newest first:" in listing
+        assert restored == "✅ Restored 1 assignments and 0 waiting members."
+        assert [a.user for a in adapter.repo_for(None, 1).assignments.values()] == ["alice"]
+
+    def test_restore_unknown_backup(self, adapter, ctx):
+        """Test that naming a missing backup is refused."""
+        # Act
+        reply = asyncio.run(adapter.handle_restore(ctx, "--backup nope.json.gz"))
+
+        # Assert
+        assert reply == "❌ Failed to restore: No backup named nope.json.gz."
+
+    def test_backup_does_not_block_commands(self, adapter, ctx):
+        """Test that commands keep running while a backup is being written."""
+        # Arrange
+        gate = threading.Event()
+        adapter.backups._executor.submit(gate.wait)
+
+        async def scenario():
+            backup = asyncio.create_task(adapter.handle_backup(ctx))
+            await asyncio.sleep(0)
+            assigned = await adapter.execute(None, 1, lambda: adapter.handle_assign(ctx, "--team 1 --lane 1"))
+            pending = not backup.done()
+            gate.set()
+            await backup
+            await adapter.pipeline.close()
+            return assigned, pending
+
+        # Act
+        assigned, pending = asyncio.run(scenario())
+
+        # Assert
+        assert assigned.startswith("✅")
+        assert pending
+
+    def test_only_changed_rosters_are_backed_up(self, adapter, ctx):
+        """Test that periodic backups skip rosters unchanged since their last backup."""
+        async def scenario():
+            adapter.handle_assign(ctx, "--team 1 --lane 1")
+            first = await adapter.backup_changed()
+            second = await adapter.backup_changed()
+            return first, second
+
+        # Act
+        first, second = asyncio.run(scenario())
+
+        # Assert
+        assert len(first) == 1
+        assert second == []
+
+    def test_failed_backup_is_retried(self, adapter, ctx, monkeypatch):
+        """Test that a roster whose backup failed is still due at the next periodic backup."""
+        # Arrange
+        adapter.handle_assign(ctx, "--team 1 --lane 1")
+        create = adapter.backups.create
+
+        def fail(repo, roster):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(adapter.backups, "create", fail)
+        failed = asyncio.run(adapter.handle_backup(ctx))
+        monkeypatch.setattr(adapter.backups, "create", create)
+
+        # Act
+        retried = asyncio.run(adapter.backup_changed())
+
+        # Assert
+        assert failed == "❌ Failed to create backup: disk full"
+        assert len(retried) == 1
+
+    def test_one_failed_backup_keeps_the_others(self, adapter, monkeypatch, capsys):
+        """Test that a roster whose backup write fails neither hides nor drops the other rosters' backups."""
+        # Arrange
+        adapter.repo_for(None, 1).assign("alice", 1, 1)
+        adapter.repo_for(7, None).assign("bob", 1, 1)
+        write = adapter.backups._write
+
+        def fail_guild_7(roster, taken_at, data):
+            if roster == "7":
+                raise OSError("disk full")
+            return write(roster, taken_at, data)
+
+        monkeypatch.setattr(adapter.backups, "_write", fail_guild_7)
+
+        # Act
+        backups = asyncio.run(adapter.backup_changed())
+
+        # Assert
+        assert [backup.roster for backup in backups] == ["default"]
+        assert [adapter._roster_name(key) for key in adapter._backed_up] == ["default"]
+        assert "❌ Automatic backup of 7 failed: disk full" in capsys.readouterr().out
+
+    def test_eviction_forgets_backed_up_version(self, tmp_path, monkeypatch, ctx):
+        """Test that an evicted roster leaves no backup bookkeeping behind."""
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+        adapter = DiscordAdapter(idle_timeout=0)
+        adapter.handle_assign(ctx, "--team 1 --lane 1")
+        asyncio.run(adapter.backup_changed())
+
+        # Act
+        asyncio.run(adapter.sweep())
+
+        # Assert
+        assert adapter._backed_up == {}
+        adapter.close()
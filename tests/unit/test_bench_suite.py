@@ -0,0 +1,84 @@
+import json
+
+from benchmarks import suite
+
+
+class TestBenchSuite:
+    """Tests for the benchmark suite's baseline comparison."""
+
+    def test_compare_flags_only_regressions_past_threshold(self):
+        """Test that slowdowns within the threshold, speedups and new cases pass."""
+        # Arrange
+        baseline = {"a@3x8": 10.0, "b@3x8": 10.0, "c@3x8": 10.0}
+        results = {"a@3x8": 12.0, "b@3x8": 13.0, "c@3x8": 5.0, "d@3x8": 99.0}
+
+        # Act
+        regressions = suite.compare(results, baseline, threshold=0.25)
+
+        # Assert
+        assert regressions == [("b@3x8", 10.0, 13.0)]
+
+    def test_compare_uses_per_case_tolerances(self):
+        """Test that a case with its own tolerance is held to it, at every size."""
+        # Arrange
+        baseline = {"persist.load@3x8": 10.0, "persist.load@30x20": 10.0, "repo.find@3x8": 10.0}
+        results = {"persist.load@3x8": 14.0, "persist.load@30x20": 16.0, "repo.find@3x8": 14.0}
+
+        # Act
+        regressions = suite.compare(results, baseline, threshold=0.25, tolerances={"persist.load": 0.5})
+
+        # Assert
+        assert regressions == [("persist.load@30x20", 10.0, 16.0), ("repo.find@3x8", 10.0, 14.0)]
+
+    def test_noisy_round_is_timed_again(self, tmp_path, monkeypatch):
+        """Test that a case slow in the first round passes when timing it again shows no regression."""
+        # Arrange
+        calls = []
+
+        def run(name_filter, keys=None, repeats=suite.REPEATS):
+            calls.append((keys, repeats))
+            return {"a@3x8": 20.0, "b@3x8": 10.0} if keys is None else {"a@3x8": 10.5}
+
+        monkeypatch.setattr(suite, "run", run)
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps({"results": {"a@3x8": 10.0, "b@3x8": 10.0}}))
+        output = tmp_path / "results.json"
+
+        # Act
+        status = suite.main(["--output", str(output), "--baseline", str(baseline)])
+
+        # Assert
+        assert status == 0
+        assert calls == [(None, suite.REPEATS), (["a@3x8"], suite.RECHECK_REPEATS)]
+        assert json.loads(output.read_text())["results"] == {"a@3x8": 10.5, "b@3x8": 10.0}
+
+    def test_update_merges_into_the_baseline(self, tmp_path, monkeypatch):
+        """Test that updating with a filter refreshes only the cases run and keeps the tolerances."""
+        # Arrange
+        monkeypatch.setattr(suite, "run", lambda name_filter, keys=None, repeats=suite.REPEATS: {"a@3x8": 12.0})
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps({"results": {"a@3x8": 10.0, "b@3x8": 10.0}, "tolerances": {"b": 0.5}}))
+
+        # Act
+        suite.main(["--output", str(tmp_path / "results.json"), "--baseline", str(baseline),
+                    "--update-baseline", "--filter", "a@"])
+
+        # Assert
+        stored = json.loads(baseline.read_text())
+        assert stored["results"] == {"a@3x8": 12.0, "b@3x8": 10.0}
+        assert stored["tolerances"] == {"b": 0.5}
+
+    def test_main_fails_on_regression(self, tmp_path, monkeypatch):
+        """Test that a regression makes the run exit non-zero and results are still written."""
+        # Arrange
+        monkeypatch.setattr(suite, "run", lambda name_filter, keys=None, repeats=suite.REPEATS: {"a@3x8": 20.0})
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps({"results": {"a@3x8": 10.0}}))
+        output = tmp_path / "results.json"
+
+        # Act
+        status = suite.main(["--output", str(output), "--baseline", str(baseline)])
+
+        # Assert
+        assert status == 1
+        assert json.loads(output.read_text())["results"] == {"a@3x8": 20.0}
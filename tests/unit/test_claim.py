@@ -0,0 +1,149 @@
+import threading
+
+import pytest
+
+from core.models import CLAIMED, MOVED, STALE, TAKEN
+from core.repository import InMemoryAssignmentRepository
+from core.services import AssignmentService
+from core.sqlite_repository import SqliteAssignmentRepository
+
+
+def hammer(threads, target):
+    """Start ``threads`` threads running ``target(index)`` together and wait for them."""
+    barrier = threading.Barrier(threads)
+
+    def run(index):
+        barrier.wait()
+        target(index)
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+class TestClaim:
+    """Tests for the atomic claim primitive."""
+
+    @pytest.fixture(params=["memory", "sqlite"])
+    def repository(self, request, tmp_path):
+        """Create each repository implementation."""
+        if request.param == "memory":
+            return InMemoryAssignmentRepository()
+        repo = SqliteAssignmentRepository(str(tmp_path / "assignments.db"))
+        request.addfinalizer(repo.close)
+        return repo
+
+    def test_claim_outcomes(self, repository):
+        """Test that each claim reports a definite outcome and version."""
+        # Act
+        claimed = repository.claim("user1", (1, 1))
+        moved = repository.claim("user1", (1, 2))
+        taken = repository.claim("user2", (1, 2))
+        stale = repository.claim("user2", (1, 3), expected_version=claimed.version)
+
+        # Assert
+        assert (claimed.status, claimed.version) == (CLAIMED, 1)
+        assert (moved.status, moved.version, moved.previous) == (MOVED, 2, (1, 1))
+        assert (taken.status, taken.version) == (TAKEN, 2)
+        assert (stale.status, stale.version) == (STALE, 2)
+        assert repository.find_assignment("user2") is None
+
+    def test_version_tracks_mutations(self, repository):
+        """Test that removes and resets bump the version too."""
+        # Arrange
+        repository.claim("user1", (1, 1))
+
+        # Act
+        repository.remove("user1")
+        repository.remove("user1")
+        repository.clear()
+
+        # Assert
+        assert repository.version == 3
+
+    def test_contended_lane_has_one_winner(self, repository):
+        """Test that many threads racing for one lane produce exactly one winner."""
+        # Arrange
+        results = []
+
+        # Act
+        hammer(16, lambda i: results.append(repository.claim(f"user{i}", (2, 4))))
+
+        # Assert
+        assert sum(r.ok for r in results) == 1
+        assert len(repository.assignments) == 1
+
+
+class TestAssignRandomHammer:
+    """Multithreaded hammer tests for race-free lane claiming."""
+
+    def test_no_double_booking_in_memory(self):
+        """Test that concurrent random assigns never share or lose a lane."""
+        # Arrange
+        repository = InMemoryAssignmentRepository()
+        service = AssignmentService(repository)
+        granted = {}
+
+        def worker(index):
+            for n in range(10):
+                user = f"user{index}_{n}"
+                slot = service.assign_random(user)
+                if slot:
+                    granted[user] = slot
+
+        # Act
+        hammer(8, worker)
+
+        # Assert - every granted lane is held by the user it was granted to
+        assert len(granted) == 24
+        assert len(set(granted.values())) == 24
+        for user, slot in granted.items():
+            assignment = repository.find_assignment(user)
+            assert (assignment.team, assignment.lane) == slot
+
+    def test_moves_never_lose_users_in_memory(self):
+        """Test that users shuffling between lanes always hold exactly one lane."""
+        # Arrange
+        repository = InMemoryAssignmentRepository()
+        users = [f"user{i}" for i in range(12)]
+        for i, user in enumerate(users):
+            repository.claim(user, (1 + i // 8, 1 + i % 8))
+
+        def worker(index):
+            for n in range(300):
+                slot = (1 + (index + n) % 3, 1 + (index * 7 + n) % 8)
+                repository.claim(users[(index + n) % len(users)], slot)
+
+        # Act
+        hammer(8, worker)
+
+        # Assert
+        assert len(repository.assignments) == len(users)
+        assert sorted(a.user for a in repository.assignments.values()) == sorted(users)
+
+    def test_no_double_booking_across_connections(self, tmp_path):
+        """Test that separate SQLite connections racing on one roster stay consistent."""
+        # Arrange
+        path = str(tmp_path / "assignments.db")
+        repositories = [SqliteAssignmentRepository(path) for _ in range(4)]
+        granted = {}
+
+        def worker(index):
+            service = AssignmentService(repositories[index % 4])
+            for n in range(8):
+                user = f"user{index}_{n}"
+                slot = service.assign_random(user)
+                if slot:
+                    granted[user] = slot
+
+        # Act
+        hammer(8, worker)
+
+        # Assert
+        assert len(granted) == 24
+        assert len(set(granted.values())) == 24
+        assert len(repositories[0].assignments) == 24
+        for repository in repositories:
+            repository.close()
@@ -0,0 +1,79 @@
+import pytest
+
+from core.models import GridConfig
+from interfaces.command_grammar import CommandError, GRAMMAR, quote, tokenize
+
+
+class TestTokenize:
+    """Tests for the tokenize function."""
+
+    @pytest.mark.parametrize("text, expected", [
+        ('--member "Jo Ann" --team 2', ["--member", "Jo Ann", "--team", "2"]),
+        ("--member 'Jo Ann'", ["--member", "Jo Ann"]),
+        (r'--member "say \"hi\""', ["--member", 'say "hi"']),
+        ("--member O'Brien", ["--member", "O'Brien"]),
+        ('--member ""', ["--member", ""]),
+        ("  ", []),
+    ])
+    def test_splits_like_a_shell(self, text, expected):
+        """Test that quoted strings stay together and escapes are undone."""
+        # Act & Assert
+        assert tokenize(text) == expected
+
+    def test_unclosed_quote(self):
+        """Test that a quote without its partner is rejected."""
+        # Act & Assert
+        with pytest.raises(CommandError):
+            tokenize('--member "Jo Ann')
+
+    @pytest.mark.parametrize("value", ["plain", "Jo Ann", 'a"b', "back\\slash"])
+    def test_quote_round_trips(self, value):
+        """Test that quote produces a single token reading back as the value."""
+        # Act & Assert
+        assert tokenize(quote(value)) == [value]
+
+
+class TestGrammar:
+    """Tests for the command grammar shared by the parser and the adapter."""
+
+    def test_coerces_and_flags(self):
+        """Test that int options are coerced and flags become True."""
+        # Act
+        parsed = GRAMMAR.parse('ASSIGN --member "Jo Ann" --team 2 --lane 3 --random')
+
+        # Assert
+        assert parsed.name == "assign"
+        assert parsed.args == {"member": "Jo Ann", "team": 2, "lane": 3, "random": True}
+
+    def test_raw_commands_keep_their_text(self):
+        """Test that bulk and fill receive the rest of the line unparsed."""
+        # Act
+        parsed = GRAMMAR.parse("bulk\nalice:1:1 'bob:2:2")
+
+        # Assert
+        assert parsed.text == "alice:1:1 'bob:2:2"
+
+    @pytest.mark.parametrize("line, message", [
+        ("", "Please provide a command."),
+        ("dance", "Unknown command: dance."),
+        ("assign --colour red", "Unknown option --colour for assign."),
+        ("remove carol", "Unexpected argument 'carol' for remove."),
+        ("assign --team --lane 3", "--team needs a value."),
+        ("assign --team two --lane 3", "Team numbers must be whole numbers, got 'two'."),
+        ("assign --team 4 --lane 3", "Team 4 does not exist. Teams are numbered 1-3."),
+        ("assign --team 1 --lane 0", "Lane 0 does not exist. Lanes are numbered 1-8."),
+        ("profile --rate lots", "Sample rate must be a number, got 'lots'."),
+    ])
+    def test_rejects_invalid_lines(self, line, message):
+        """Test that malformed commands are refused with a readable message."""
+        # Act & Assert
+        with pytest.raises(CommandError, match=message.replace(".", r"\.")):
+            GRAMMAR.parse(line)
+
+    def test_ranges_follow_the_grid(self):
+        """Test that range checks use the roster's own dimensions."""
+        # Act
+        args = GRAMMAR.parse_args("assign", "--team 12 --lane 20", GridConfig(12, 20))
+
+        # Assert
+        assert args == {"team": 12, "lane": 20}
@@ -0,0 +1,198 @@
+import asyncio
+import random
+import sqlite3
+from contextlib import contextmanager
+
+from tests.fake_discord import FakeChannel, FakeInteraction
+from core.repository import InMemoryAssignmentRepository, PersistentAssignmentRepository
+from infrastructure.command_pipeline import CommandPipeline
+
+
+class FailingRepository(PersistentAssignmentRepository):
+    """Persistent repository whose next snapshot write fails."""
+
+    fail = True
+
+    def save(self):
+        if self.fail:
+            self.fail = False
+            raise OSError("disk full")
+        super().save()
+
+
+class LockedRepository(InMemoryAssignmentRepository):
+    """In-memory repository whose batches fail to start, like SQLite's on a locked database."""
+
+    @contextmanager
+    def batch(self):
+        raise sqlite3.OperationalError("database is locked")
+        yield self
+
+
+class TestCommandPipeline:
+    """Tests for the CommandPipeline class."""
+
+    def test_stress_hundreds_of_interactions(self, counting_service, counting_repository):
+        """Test that concurrent interactions never double-book and share writes."""
+        repo, service = counting_repository, counting_service
+        channel = FakeChannel(1)
+        interactions = []
+        listings = []
+
+        async def assign(interaction, team, lane):
+            success, suggestions = await pipeline.submit(
+                "guild", lambda: service.assign_user(interaction.user.name, team, lane))
+            await interaction.response.send_message("ok" if success else f"taken {suggestions}")
+
+        async def assign_random(interaction):
+            slot = await pipeline.submit("guild", lambda: service.assign_random(interaction.user.name))
+            await interaction.response.send_message(f"slot {slot}")
+
+        async def remove(interaction):
+            removed = await pipeline.submit("guild", lambda: service.remove_user(interaction.user.name))
+            await interaction.response.send_message(f"removed {removed}")
+
+        async def list_all(interaction):
+            # Reads bypass the pipeline
+            listings.append(len(service.list_all_assignments()))
+            await interaction.response.send_message("list")
+
+        async def drive():
+            rng = random.Random(7)
+            calls = []
+            for i in range(600):
+                interaction = FakeInteraction(f"user{rng.randrange(60)}", 1, channel)
+                interactions.append(interaction)
+                roll = rng.random()
+                if roll < 0.4:
+                    calls.append(assign(interaction, rng.randint(1, 3), rng.randint(1, 8)))
+                elif roll < 0.6:
+                    calls.append(assign_random(interaction))
+                elif roll < 0.8:
+                    calls.append(remove(interaction))
+                else:
+                    calls.append(list_all(interaction))
+            await asyncio.gather(*calls)
+            await pipeline.close()
+
+        # Act
+        pipeline = CommandPipeline(lambda key: repo)
+        asyncio.run(drive())
+
+        # Assert - every interaction answered, no user in two lanes, indexes consistent
+        assert all(len(interaction.sent) == 1 for interaction in interactions)
+        users = [a.user for a in repo.assignments.values()]
+        assert len(users) == len(set(users))
+        for a in repo.assignments.values():
+            assert repo.find_assignment(a.user) == a
+        assert all(0 <= n <= 24 for n in listings)
+
+        # Bursts were coalesced into far fewer writes than mutations
+        assert 0 < repo.saves < 100
+        reloaded = PersistentAssignmentRepository(repo.path)
+        assert sorted(reloaded.assignments) == sorted(repo.assignments)
+
+    def test_rosters_are_independent(self):
+        """Test that each roster key gets its own writer."""
+        repos = {}
+
+        def repo_for(key):
+            return repos.setdefault(key, InMemoryAssignmentRepository())
+
+        async def drive():
+            pipeline = CommandPipeline(repo_for)
+            results = await asyncio.gather(
+                pipeline.submit("a", lambda: repo_for("a").assign("user1", 1, 1)),
+                pipeline.submit("b", lambda: repo_for("b").assign("user2", 1, 1)),
+            )
+            await pipeline.close()
+            return results
+
+        # Act & Assert
+        assert asyncio.run(drive()) == [True, True]
+
+    def test_exceptions_reach_the_caller(self):
+        """Test that a failing command raises in its caller without stopping the writer."""
+        repo = InMemoryAssignmentRepository()
+
+        async def drive():
+            pipeline = CommandPipeline(lambda key: repo)
+            failed = pipeline.submit("guild", lambda: repo.assign("user1", 9, 1))
+            ok = pipeline.submit("guild", lambda: repo.assign("user1", 1, 1))
+            results = await asyncio.gather(failed, ok, return_exceptions=True)
+            await pipeline.close()
+            return results
+
+        # Act
+        failed, ok = asyncio.run(drive())
+
+        # Assert
+        assert isinstance(failed, ValueError)
+        assert ok is True
+
+    def test_failed_batch_write_keeps_the_results(self, tmp_path):
+        """Test that a failed write whose changes stand gives callers their results, reports the error, and is retried."""
+        # Arrange
+        path = str(tmp_path / "assignments.json")
+        repo = FailingRepository(path)
+        errors = []
+
+        async def drive():
+            pipeline = CommandPipeline(lambda key: repo, on_write_error=lambda key, e: errors.append((key, type(e))))
+            first = await asyncio.gather(pipeline.submit("guild", lambda: repo.assign("user1", 1, 1)),
+                                         pipeline.submit("guild", lambda: repo.assign("user2", 1, 1)),
+                                         return_exceptions=True)
+            second = await pipeline.submit("guild", lambda: repo.assign("user3", 1, 3))
+            await asyncio.wait_for(pipeline.close(), timeout=5)
+            return first, second
+
+        # Act
+        first, second = asyncio.run(drive())
+
+        # Assert
+        assert first == [True, False]
+        assert second is True
+        assert errors == [("guild", OSError)]
+        assert repo.find_assignment("user1").lane == 1 and repo.find_assignment("user2") is None
+        assert sorted(PersistentAssignmentRepository(path).assignments) == ["1-1", "1-3"]
+
+    def test_batch_that_never_started_reaches_every_caller(self):
+        """Test that when the batch cannot even start every caller gets the error and the roster is untouched."""
+        # Arrange
+        repo = LockedRepository()
+
+        async def drive():
+            pipeline = CommandPipeline(lambda key: repo)
+            results = await asyncio.gather(pipeline.submit("guild", lambda: repo.assign("user1", 1, 1)),
+                                           pipeline.submit("guild", lambda: repo.assign("user2", 1, 2)),
+                                           return_exceptions=True)
+            await asyncio.wait_for(pipeline.close(), timeout=5)
+            return results
+
+        # Act
+        results = asyncio.run(drive())
+
+        # Assert
+        assert [type(result) for result in results] == [sqlite3.OperationalError] * 2
+        assert repo.assignment_count() == 0
+
+    def test_discard_stops_an_idle_writer(self):
+        """Test that discarding a roster drops its queue and writer, and a later command starts a new one."""
+        # Arrange
+        repo = InMemoryAssignmentRepository()
+
+        async def drive():
+            pipeline = CommandPipeline(lambda key: repo)
+            await pipeline.submit("guild", lambda: repo.assign("user1", 1, 1))
+            pipeline.discard("guild")
+            discarded = pipeline.depths()
+            result = await pipeline.submit("guild", lambda: repo.assign("user2", 1, 2))
+            await pipeline.close()
+            return discarded, result
+
+        # Act
+        discarded, result = asyncio.run(drive())
+
+        # Assert
+        assert discarded == {}
+        assert result is True
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from core.models import GridConfig
+from infrastructure.discord_adapter import DiscordAdapter
+
+
+def make_ctx(guild_id, channel_id=10, author="author"):
+    """Build a minimal stand-in for a discord.py command context."""
+    return SimpleNamespace(
+        guild=SimpleNamespace(id=guild_id),
+        channel=SimpleNamespace(id=channel_id),
+        author=SimpleNamespace(name=author),
+    )
+
+
+class TestDiscordAdapter:
+    """Tests for the DiscordAdapter class."""
+
+    @pytest.fixture(autouse=True)
+    def workdir(self, tmp_path, monkeypatch):
+        """Run each test in an empty directory."""
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+
+    def test_guilds_have_separate_rosters(self):
+        """Test that the same lane can be taken in two guilds."""
+        # Arrange
+        adapter = DiscordAdapter(home_guild=1)
+
+        # Act
+        first = adapter.handle_assign(make_ctx(1), "--team 1 --lane 1")
+        second = adapter.handle_assign(make_ctx(2), "--team 1 --lane 1")
+        adapter.close()
+
+        # Assert
+        assert first.startswith("✅")
+        assert second.startswith("✅")
+
+    def test_home_guild_keeps_legacy_file(self, workdir):
+        """Test that the home guild is stored in assignments.json and others in the data dir."""
+        # Arrange
+        adapter = DiscordAdapter(home_guild=1)
+
+        # Act
+        adapter.handle_assign(make_ctx(1), "--team 1 --lane 1")
+        adapter.handle_assign(make_ctx(2), "--team 1 --lane 2")
+        adapter.close()
+
+        # Assert
+        assert (workdir / "assignments.json").exists()
+        assert (workdir / "rosters" / "2.json").exists()
+
+    def test_roster_grids_override_default(self):
+        """Test that a roster listed in roster_grids gets its own dimensions."""
+        # Arrange
+        adapter = DiscordAdapter(home_guild=1, roster_grids={"2": GridConfig(12, 20)})
+
+        # Act
+        large = adapter.handle_assign(make_ctx(2), "--team 12 --lane 20")
+        default = adapter.handle_assign(make_ctx(1), "--team 12 --lane 20")
+        adapter.close()
+
+        # Assert
+        assert large.startswith("✅")
+        assert not default.startswith("✅")
+
+    def test_shares_the_command_grammar(self):
+        """Test that text commands accept quoted names and reject bad input before the service."""
+        # Arrange
+        adapter = DiscordAdapter()
+
+        # Act
+        quoted = adapter.handle_assign(make_ctx(1), '--member "Jo Ann" --team 1 --lane 1')
+        invalid = adapter.handle_assign(make_ctx(1), "--team 1 --lane nine")
+        adapter.close()
+
+        # Assert
+        assert quoted == "✅ Jo Ann assigned to Team 1 Lane 1"
+        assert invalid == "❗ Lane numbers must be whole numbers, got 'nine'."
+
+    def test_per_channel_rosters(self):
+        """Test that per-channel mode partitions a guild by channel."""
+        # Arrange
+        adapter = DiscordAdapter(per_channel=True)
+        adapter.handle_assign(make_ctx(5, channel_id=1), "--team 1 --lane 1")
+
+        # Act
+        result = adapter.handle_assign(make_ctx(5, channel_id=2), "--team 1 --lane 1")
+        adapter.close()
+
+        # Assert
+        assert result.startswith("✅")
+
+    def test_evicted_roster_is_reloaded(self):
+        """Test that a roster dropped from memory comes back from disk."""
+        # Arrange
+        adapter = DiscordAdapter(max_resident=1)
+        adapter.handle_assign(make_ctx(1, author="user1"), "--team 2 --lane 2")
+        adapter.handle_assign(make_ctx(2), "--team 1 --lane 1")
+
+        # Act
+        assignment = adapter.repo_for(1).find_assignment("user1")
+        adapter.close()
+
+        # Assert
+        assert (assignment.team, assignment.lane) == (2, 2)
+
+    def test_reset_only_touches_its_guild(self):
+        """Test that resetting one guild leaves the others alone."""
+        # Arrange
+        adapter = DiscordAdapter()
+        adapter.handle_assign(make_ctx(1, author="user1"), "--team 1 --lane 1")
+        adapter.handle_assign(make_ctx(2, author="user2"), "--team 1 --lane 1")
+
+        # Act
+        adapter.handle_reset(make_ctx(1))
+
+        # Assert
+        assert adapter.repo_for(1).find_assignment("user1") is None
+        assert adapter.repo_for(2).find_assignment("user2") is not None
+        adapter.close()
+
+    def test_sweep_drops_idle_rosters(self):
+        """Test that the periodic sweep evicts idle rosters without another roster being used."""
+        # Arrange
+        adapter = DiscordAdapter(idle_timeout=0)
+        adapter.handle_assign(make_ctx(1, author="user1"), "--team 1 --lane 1")
+
+        # Act
+        asyncio.run(adapter.sweep())
+
+        # Assert
+        assert len(adapter.registry) == 0
+        assert adapter.repo_for(1).find_assignment("user1") is not None
+        adapter.close()
+
+    def test_sweep_flushes_off_the_event_loop(self):
+        """Test that the sweep writes resident rosters from a worker thread, not the loop's."""
+        # Arrange
+        adapter = DiscordAdapter()
+        repo = adapter.repo_for(1)
+        threads = []
+        repo.flush = lambda: threads.append(threading.current_thread())
+
+        # Act
+        asyncio.run(adapter.sweep())
+
+        # Assert
+        assert len(threads) == 1 and threads[0] is not threading.main_thread()
+        assert len(adapter.registry) == 1
+        adapter.close()
+
+    def test_evicted_roster_loses_its_writer(self):
+        """Test that evicting a roster also stops its pipeline writer."""
+        # Arrange
+        adapter = DiscordAdapter(idle_timeout=0)
+
+        async def drive():
+            await adapter.execute(1, 10, lambda: adapter.repo_for(1).assign("user1", 1, 1))
+            before = dict(adapter.pipeline.depths())
+            await adapter.sweep()
+            after = adapter.pipeline.depths()
+            await adapter.drain()
+            return before, after
+
+        # Act
+        before, after = asyncio.run(drive())
+
+        # Assert
+        assert list(before) == [(1, None)]
+        assert after == {}
+        adapter.close()
@@ -0,0 +1,254 @@
+from dataclasses import FrozenInstanceError
+
+
+import pytest
+
+from core.grid import Grid
+from core.history import RosterState
+from core.members import MemberTable
+from core.models import Assignment, GridConfig
+from core.repository import InMemoryAssignmentRepository, PersistentAssignmentRepository
+from core.services import AssignmentService
+from core.sqlite_repository import SqliteAssignmentRepository
+from interfaces.command_parser import CommandParser
+
+
+class TestGridConfig:
+    """Tests for the GridConfig class."""
+
+    def test_parse(self):
+        """Test that a <teams>x<lanes> specification is read."""
+        # Act
+        grid = GridConfig.parse("12x20")
+
+        # Assert
+        assert (grid.teams, grid.lanes, grid.size) == (12, 20, 240)
+
+    def test_rejects_empty_grid(self):
+        """Test that a grid without lanes is rejected."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            GridConfig(3, 0)
+
+    def test_assignment_validates_against_its_grid(self):
+        """Test that lanes beyond the default grid are valid in a larger one."""
+        # Act
+        assignment = Assignment("alice", 10, 15, grid=GridConfig(12, 20))
+
+        # Assert
+        assert assignment.to_dict() == {"user": "alice", "team": 10, "lane": 15}
+        with pytest.raises(ValueError):
+            Assignment("alice", 10, 15)
+
+
+class TestMemberTable:
+    """Tests for the MemberTable class."""
+
+    def test_intern_gives_stable_ids(self):
+        """Test that a name keeps its id and unknown names are not allocated by lookups."""
+        # Arrange
+        members = MemberTable()
+
+        # Act
+        alice = members.intern("alice")
+        bob = members.intern("bob")
+
+        # Assert
+        assert (alice, bob) == (1, 2)
+        assert members.intern("".join(["al", "ice"])) == alice
+        assert members.find("carol") == 0
+        assert members.name(bob) == "bob"
+        assert len(members) == 2
+
+
+class TestGrid:
+    """Tests for the Grid class."""
+
+    @pytest.fixture
+    def grid(self):
+        """Create an empty 3x70 grid, wider than one bitmap word."""
+        return Grid(GridConfig(3, 70))
+
+    def test_first_free_skips_filled_lanes(self, grid):
+        """Test that the lowest free lane is found past filled ones."""
+        # Arrange
+        for lane in range(1, 66):
+            grid.place(Assignment(f"u{lane}", 2, lane, grid=grid.config))
+
+        # Act & Assert
+        assert grid.first_free(2) == (2, 66)
+        assert grid.first_free() == (1, 1)
+
+    def test_vacate_frees_lane(self, grid):
+        """Test that a vacated lane is offered again."""
+        # Arrange
+        for team in range(1, 4):
+            for lane in range(1, 71):
+                grid.place(Assignment(f"u{team}_{lane}", team, lane, grid=grid.config))
+
+        # Act
+        grid.vacate(3, 42)
+
+        # Assert
+        assert grid.first_free() == (3, 42)
+        assert grid.get(3, 42) is None
+
+
+class TestCompactStorage:
+    """Tests for how rosters hold their assignments."""
+
+    def test_assignment_is_frozen_and_slotted(self):
+        """Test that assignments are immutable values without a per-instance dict."""
+        # Arrange
+        assignment = Assignment("alice", 1, 2)
+
+        # Act & Assert
+        with pytest.raises(FrozenInstanceError):
+            assignment.lane = 3
+        assert not hasattr(assignment, "__dict__")
+
+    def test_held_assignments_cannot_be_changed(self):
+        """Test that the assignments a roster hands out cannot put it out of step with its grid."""
+        # Arrange
+        repo = InMemoryAssignmentRepository(GridConfig(2, 3))
+        repo.assign("alice", 1, 2)
+
+        # Act
+        with pytest.raises(FrozenInstanceError):
+            repo.find_assignment("alice").lane = 3
+
+        # Assert
+        assert repo.find_assignment("alice") == Assignment("alice", 1, 2, grid=GridConfig(2, 3))
+        assert repo.team_rows()[1] == (None, "alice", None)
+
+    def test_grid_cells_hold_member_ids(self):
+        """Test that each lane is one int and reads back as an assignment."""
+        # Arrange
+        members = MemberTable()
+        grid = Grid(GridConfig(2, 3), members)
+
+        # Act
+        index = grid.place(Assignment("alice", 2, 2, grid=grid.config))
+
+        # Assert
+        assert list(grid.cells) == [0, 0, 0, 0, members.find("alice"), 0]
+        assert grid.at(index) == Assignment("alice", 2, 2, grid=grid.config)
+        assert grid.row(2) == (None, "alice", None)
+
+    def test_rosters_intern_their_own_members(self):
+        """Test that each roster keeps its members in its own table, shared by its grid and history."""
+        # Arrange
+        first, second = InMemoryAssignmentRepository(), InMemoryAssignmentRepository()
+
+        # Act
+        first.assign("alice", 1, 1)
+        first.join_waitlist("bob")
+        second.assign("carol", 2, 2)
+
+        # Assert
+        assert first.occupancy().members is first.history.members
+        assert first.occupancy().members.names == [None, "alice", "bob"]
+        assert second.occupancy().members.names == [None, "carol"]
+
+    def test_state_expands_from_the_grid(self):
+        """Test that the packed roster state reads like a plain one."""
+        # Arrange
+        repository = InMemoryAssignmentRepository()
+        repository.assign("alice", 1, 1)
+        repository.assign("bob", 3, 8)
+        repository.join_waitlist("carol")
+
+        # Act
+        state = repository.state()
+
+        # Assert
+        assert state == RosterState({"alice": (1, 1), "bob": (3, 8)}, ["carol"])
+        assert state.copy().slots == state.slots
+
+
+class TestConfiguredRosters:
+    """Tests for rosters larger than the default grid."""
+
+    @pytest.fixture
+    def grid(self):
+        return GridConfig(12, 20)
+
+    @pytest.fixture(params=["memory", "json", "sqlite"])
+    def repository(self, request, grid, tmp_path):
+        """Create an empty 12x20 roster on each backend."""
+        if request.param == "memory":
+            repo = InMemoryAssignmentRepository(grid)
+        elif request.param == "json":
+            repo = PersistentAssignmentRepository(str(tmp_path / "roster.json"), grid=grid)
+        else:
+            repo = SqliteAssignmentRepository(str(tmp_path / "roster.db"), grid=grid)
+        yield repo
+        repo.close()
+
+    def test_assign_beyond_default_grid(self, repository):
+        """Test that teams and lanes beyond 3x8 are usable."""
+        # Act
+        assigned = repository.assign("alice", 12, 20)
+
+        # Assert
+        assert assigned
+        assert repository.assignments["12-20"].user == "alice"
+        assert repository.team_rows()[12][19] == "alice"
+        assert len(repository.team_rows()) == 12
+
+    def test_rejects_lane_outside_grid(self, repository):
+        """Test that the configured bounds are enforced."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            repository.assign("alice", 13, 1)
+
+    def test_suggestion_stays_in_requested_team(self, repository):
+        """Test that a taken lane suggests the next free lane of the same team."""
+        # Arrange
+        service = AssignmentService(repository)
+        for lane in range(1, 15):
+            repository.assign(f"u{lane}", 9, lane)
+
+        # Act
+        success, suggestions = service.assign_user("alice", 9, 3)
+
+        # Assert
+        assert not success
+        assert suggestions[0] == (9, 15)
+
+    def test_parser_reports_configured_bounds(self, repository):
+        """Test that range errors quote the roster's own dimensions."""
+        # Arrange
+        parser = CommandParser(AssignmentService(repository))
+
+        # Act
+        team_error = parser.parse_and_execute("assign --team 13 --lane 1", "alice")
+        lane_error = parser.parse_and_execute("assign --team 1 --lane 21", "alice")
+
+        # Assert
+        assert "Teams are numbered 1-12." in team_error
+        assert "Lanes are numbered 1-20." in lane_error
+
+    def test_list_counts_configured_lanes(self, repository):
+        """Test that the list command counts against the roster's lane total."""
+        # Arrange
+        repository.assign("alice", 4, 17)
+        parser = CommandParser(AssignmentService(repository))
+
+        # Act
+        output = parser.parse_and_execute("list", "alice")
+
+        # Assert
+        assert "1/20 lanes filled" in output
+
+    def test_json_roster_reloads_with_grid(self, grid, tmp_path):
+        """Test that a saved large roster loads back into the same grid."""
+        # Arrange
+        path = str(tmp_path / "roster.json")
+        PersistentAssignmentRepository(path, grid=grid).assign("alice", 11, 19)
+
+        # Act
+        reloaded = PersistentAssignmentRepository(path, grid=grid)
+
+        # Assert
+        assert reloaded.find_assignment("alice") == Assignment("alice", 11, 19, grid=grid)
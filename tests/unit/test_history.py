@@ -0,0 +1,278 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core.history import Event, History, RosterState
+from core.repository import InMemoryAssignmentRepository, PersistentAssignmentRepository
+from core.services import AssignmentService
+from core.sqlite_repository import SqliteAssignmentRepository
+from infrastructure.discord_adapter import DiscordAdapter
+from interfaces.command_parser import CommandParser
+
+
+class TestHistory:
+    """Tests for the History class."""
+
+    @pytest.fixture
+    def repository(self):
+        """Create a repository with a small history."""
+        return InMemoryAssignmentRepository(history=History(capacity=4))
+
+    def test_mutations_are_recorded_as_typed_events(self, repository):
+        """Test that assigns, moves, removals, resets and waitlist changes become events."""
+        # Arrange
+        repository.assign("alice", 1, 1)
+        repository.assign("alice", 2, 2)
+        repository.join_waitlist("bob")
+        repository.release("alice", promote=True)
+        repository.clear()
+
+        # Act
+        events, cursor = repository.events()
+
+        # Assert
+        assert [event.kind for event in events] == ["assign", "move", "wait", "remove", "reset"]
+        assert events[1] == Event(2, "move", "alice", (2, 2), (1, 1))
+        assert events[3].previous == (2, 2)
+        assert events[3].promoted == (("bob", 2, 2),)
+        assert cursor == 5
+
+    def test_undo_and_redo_restore_lanes_and_queue(self, repository):
+        """Test that undo rolls back removals with their promotions and redo reapplies them."""
+        # Arrange
+        repository.assign("alice", 1, 1)
+        repository.join_waitlist("bob")
+        repository.release("alice", promote=True)
+
+        # Act
+        undone = repository.undo()
+        after_undo = repository.state()
+        redone = repository.redo()
+
+        # Assert
+        assert [event.kind for event in undone] == ["remove"]
+        assert after_undo == RosterState({"alice": (1, 1)}, ["bob"])
+        assert [event.kind for event in redone] == ["remove"]
+        assert repository.state() == RosterState({"bob": (1, 1)})
+
+    def test_new_mutation_discards_undone_events(self, repository):
+        """Test that changing the roster after an undo leaves nothing to redo."""
+        # Arrange
+        repository.assign("alice", 1, 1)
+        repository.assign("bob", 1, 2)
+        repository.undo()
+
+        # Act
+        repository.assign("carol", 1, 3)
+
+        # Assert
+        assert repository.redo() == []
+        assert [event.user for event in repository.events()[0]] == ["alice", "carol"]
+
+    def test_undo_stops_at_the_oldest_checkpoint(self, repository):
+        """Test that undo never goes further back than the events still in memory."""
+        # Arrange
+        for n in range(9):
+            repository.assign(f"user{n}", n // 8 + 1, n % 8 + 1)
+
+        # Act
+        undone = repository.undo(10)
+
+        # Assert
+        assert repository.history.base_seq == 4
+        assert len(undone) == 5
+        assert sorted(repository.state().slots) == ["user0", "user1", "user2", "user3"]
+
+    def test_state_at_spilled_event(self, tmp_path):
+        """Test that states older than the events in memory are rebuilt from the spill file."""
+        # Arrange
+        history = History(capacity=2, spill_path=str(tmp_path / "roster.history"))
+        repository = InMemoryAssignmentRepository(history=history)
+        for lane in range(1, 6):
+            repository.assign(f"user{lane}", 1, lane)
+        repository.remove("user1")
+
+        # Act
+        state = history.state_at(2)
+
+        # Assert
+        assert history.base_seq == 4
+        assert state == RosterState({"user1": (1, 1), "user2": (1, 2)})
+        assert history.state_at() == repository.state()
+        history.close()
+
+    def test_spill_file_is_rotated(self, tmp_path):
+        """Test that a full spill file is rotated, keeping recent states rebuildable and the disk bounded."""
+        # Arrange
+        path = tmp_path / "roster.history"
+        history = History(capacity=2, spill_path=str(path), spill_limit=4)
+        repository = InMemoryAssignmentRepository(history=history)
+
+        states = [RosterState()]
+
+        # Act
+        for n in range(40):
+            repository.assign(f"user{n % 5}", 1, n % 8 + 1)
+            states.append(RosterState(repository.state().slots))
+
+        # Assert
+        lines = [len(spill.read_text().splitlines()) for spill in (path, tmp_path / "roster.history.1")]
+        assert all(count <= 1 + 4 + 2 for count in lines)
+        assert history.base_seq - history.first_seq >= 4
+        assert [history.state_at(seq) for seq in range(history.first_seq, 41)] == states[history.first_seq:]
+        with pytest.raises(ValueError, match="is not in the history"):
+            history.state_at(history.first_seq - 1)
+        history.close()
+
+    def test_state_at_evicted_event_without_spill(self, repository):
+        """Test that without a spill file, states older than the events in memory are refused."""
+        # Arrange
+        for lane in range(1, 9):
+            repository.assign(f"user{lane}", 1, lane)
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="covers 4-8"):
+            repository.history.state_at(3)
+
+    def test_replay_starts_from_the_nearest_checkpoint(self, monkeypatch):
+        """Test that rebuilding state after 100k events replays fewer events than a checkpoint holds."""
+        # Arrange
+        history = History(capacity=10_000)
+        repository = InMemoryAssignmentRepository(history=history)
+        with repository.batch():
+            for n in range(50_000):
+                repository.assign(f"user{n % 997}", n % 3 + 1, n % 8 + 1)
+                repository.remove(f"user{n % 997}")
+        replayed = []
+        replay = History.replay
+
+        def counting_replay(state, events):
+            events = list(events)
+            replayed.append(len(events))
+            return replay(state, events)
+
+        monkeypatch.setattr(History, "replay", staticmethod(counting_replay))
+
+        # Act
+        state = history.state_at()
+        history.state_at(history.last_seq - 1)
+
+        # Assert
+        assert history.last_seq == 100_000
+        assert state == repository.state()
+        assert replayed == [0, 9_999]
+
+
+class TestPersistentHistory:
+    """Tests for undo on the persistent repositories."""
+
+    def test_undo_is_persisted(self, tmp_path):
+        """Test that an undone reset stays undone after reloading the roster."""
+        # Arrange
+        path = str(tmp_path / "roster.json")
+        repository = PersistentAssignmentRepository(path, mode="journal")
+        repository.assign("alice", 1, 1)
+        repository.join_waitlist("bob")
+        repository.clear()
+
+        # Act
+        repository.undo()
+        repository.close()
+        reloaded = PersistentAssignmentRepository(path, mode="journal")
+
+        # Assert
+        assert reloaded.state() == RosterState({"alice": (1, 1)}, ["bob"])
+        assert reloaded.events() == ([], 0)
+        reloaded.close()
+
+    def test_sqlite_undo_and_redo(self, tmp_path):
+        """Test that the sqlite backend rolls back and reapplies changes in its rows."""
+        # Arrange
+        path = str(tmp_path / "roster.db")
+        repository = SqliteAssignmentRepository(path)
+        repository.assign("alice", 1, 1)
+        repository.join_waitlist("bob")
+        repository.release("alice", promote=True)
+
+        # Act
+        undone = repository.undo()
+        reader = SqliteAssignmentRepository(path)
+        after_undo = reader.state()
+        reader.close()
+        redone = repository.redo()
+
+        # Assert
+        assert [event.kind for event in undone] == ["remove"]
+        assert after_undo == RosterState({"alice": (1, 1)}, ["bob"])
+        assert [event.kind for event in redone] == ["remove"]
+        assert repository.state() == RosterState({"bob": (1, 1)})
+        assert repository.events()[1] == 3
+        repository.close()
+
+    def test_sqlite_rollback_forgets_its_events(self, tmp_path):
+        """Test that changes rolled back with their transaction cannot be undone."""
+        # Arrange
+        repository = SqliteAssignmentRepository(str(tmp_path / "roster.db"))
+        repository.assign("alice", 1, 1)
+
+        # Act
+        with pytest.raises(RuntimeError):
+            with repository.batch():
+                repository.assign("bob", 1, 2)
+                raise RuntimeError("abort")
+
+        # Assert
+        assert repository.state() == RosterState({"alice": (1, 1)})
+        assert repository.events() == ([], 0)
+        assert repository.undo() == []
+        repository.close()
+
+
+class TestHistoryCommands:
+    """Tests for the undo, redo and history commands."""
+
+    @pytest.fixture
+    def parser(self):
+        """Create a parser over a roster with one assignment."""
+        service = AssignmentService(InMemoryAssignmentRepository())
+        service.assign_user("alice", 1, 1)
+        return CommandParser(service)
+
+    def test_undo_is_admin_only(self, parser):
+        """Test that members cannot undo changes."""
+        # Act
+        result = parser.parse_and_execute("undo", "alice")
+
+        # Assert
+        assert result == "Only admins can undo changes."
+
+    def test_undo_then_history(self, parser):
+        """Test that undone changes are reported and marked in the history."""
+        # Act
+        undone = parser.parse_and_execute("undo", "admin", is_admin=True)
+        history = parser.parse_and_execute("history", "admin", is_admin=True)
+
+        # Assert
+        assert undone == "Undid 1 change(s):\n#1 alice assigned to Team 1 Lane 1"
+        assert history == "Changes, oldest first:\n#1 alice assigned to Team 1 Lane 1 (undone)"
+        assert parser.parse_and_execute("undo", "admin", is_admin=True) == "Nothing to undo."
+
+    def test_adapter_undo_and_redo(self, tmp_path, monkeypatch):
+        """Test that the adapter rolls a roster back and forward."""
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+        adapter = DiscordAdapter()
+        ctx = SimpleNamespace(guild=None, channel=SimpleNamespace(id=1), author=SimpleNamespace(name="admin"))
+        adapter.handle_assign(ctx, "--member alice --team 1 --lane 1")
+        adapter.handle_remove(ctx, "--member alice")
+
+        # Act
+        undone = adapter.handle_undo(ctx, "--steps 1")
+        redone = adapter.handle_redo(ctx, "")
+        invalid = adapter.handle_undo(ctx, "--steps 0")
+        adapter.close()
+
+        # Assert
+        assert undone == "✅ Undid 1 change(s):\n#2 alice removed from Team 1 Lane 1"
+        assert redone.startswith("✅ Redid 1 change(s)")
+        assert invalid == "❗ Steps must be at least 1."
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Everything but bot.py; none of it may need discord.py until an embed is built
+LAYERS = ("core.services", "core.sqlite_repository", "interfaces.command_parser", "interfaces.presentation",
+          "infrastructure.discord_adapter")
+
+# Most a layer may take to import, as a fraction of ``import discord`` in the same interpreter; a
+# ratio holds on any machine. The adapter also pays for asyncio, which discord.py would load anyway.
+BUDGETS = {"infrastructure.discord_adapter": 0.75}
+DEFAULT_BUDGET = 0.4
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds per module, from ``python -X importtime``."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime:
+    """Keep the domain and interface layers cheap to import."""
+
+    def test_layers_do_not_import_discord(self):
+        """Test that importing everything below bot.py leaves discord.py and aiohttp unloaded."""
+        # Arrange
+        check = ("import sys, " + ", ".join(LAYERS) + "; "
+                 "print(' '.join(name for name in sys.modules if name.split('.')[0] in ('discord', 'aiohttp')))")
+
+        # Act
+        result = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True, check=True)
+
+        # Assert
+        assert result.stdout.split() == []
+
+    def test_embeds_import_discord_on_first_use(self):
+        """Test that presentation pulls in discord.py only when an embed is built."""
+        # Arrange
+        check = ("import sys; from interfaces import presentation; assert 'discord' not in sys.modules; "
+                 "presentation.to_discord_embed([]); assert 'discord' in sys.modules")
+
+        # Act
+        result = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True)
+
+        # Assert
+        assert result.returncode == 0, result.stderr
+
+    @pytest.mark.parametrize("module", LAYERS)
+    def test_each_layer_fits_its_budget(self, module):
+        """Test that every layer imports alone in a fraction of the time discord.py takes."""
+        # Act - the best of three fresh interpreters, each importing the layer and then discord.py
+        ratios = []
+        for _ in range(3):
+            times = import_times(f"import {module}; import discord")
+            ratios.append(times[module] / times["discord"])
+
+        # Assert
+        assert min(ratios) < BUDGETS.get(module, DEFAULT_BUDGET)
@@ -0,0 +1,134 @@
+import glob
+import json
+import os
+
+import pytest
+
+from core.repository import PersistentAssignmentRepository
+
+
+def state_of(repository):
+    """Return the repository's assignments as comparable tuples."""
+    return sorted((a.user, a.team, a.lane) for a in repository.assignments.values())
+
+
+def apply_ops(repository):
+    """Drive a repository through a mix of assigns, moves, removes and a reset."""
+    repository.assign("user1", 1, 1)
+    repository.assign("user2", 1, 2)
+    repository.assign("user1", 2, 5)
+    repository.remove("user2")
+    repository.clear()
+    repository.assign("user3", 3, 8)
+    repository.assign("user4", 3, 7)
+    repository.assign("user3", 1, 1)
+    repository.remove("user4")
+    repository.assign("user5", 2, 2)
+
+
+class TestJournalMode:
+    """Tests for the journal mode of PersistentAssignmentRepository."""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        """Path of the snapshot file."""
+        return str(tmp_path / "assignments.json")
+
+    def test_mutations_append_instead_of_rewriting(self, path):
+        """Test that journal mode leaves the snapshot alone on each mutation."""
+        # Arrange
+        repository = PersistentAssignmentRepository(path, mode="journal")
+
+        # Act
+        repository.assign("user1", 1, 1)
+        repository.remove("user1")
+        repository.assign("user2", 2, 2)
+        repository.close()
+
+        # Assert
+        assert not os.path.exists(path)
+        with open(f"{path}.journal") as f:
+            assert [json.loads(line)["op"] for line in f] == ["assign", "remove", "assign"]
+
+    def test_replay_restores_state(self, path):
+        """Test that a reopened repository replays the journal."""
+        # Arrange
+        repository = PersistentAssignmentRepository(path, mode="journal")
+        apply_ops(repository)
+        repository.close()
+
+        # Act
+        reloaded = PersistentAssignmentRepository(path, mode="journal")
+
+        # Assert
+        assert state_of(reloaded) == state_of(repository)
+        assert reloaded.find_first_empty() == repository.find_first_empty()
+
+    def test_compaction_writes_snapshot(self, path):
+        """Test that a large journal is folded into the snapshot in the background."""
+        # Arrange
+        repository = PersistentAssignmentRepository(path, mode="journal", compact_bytes=200)
+
+        # Act
+        apply_ops(repository)
+        repository.close()
+        reloaded = PersistentAssignmentRepository(path, mode="journal")
+
+        # Assert
+        with open(path) as f:
+            assert json.load(f)["seq"] > 0
+        assert not glob.glob(f"{path}.journal.*")
+        assert state_of(reloaded) == state_of(repository)
+
+    def test_legacy_snapshot_is_loaded(self, path):
+        """Test that journal mode starts from an existing list snapshot."""
+        # Arrange
+        with open(path, "w") as f:
+            json.dump([{"user": "user1", "team": 2, "lane": 3}], f)
+
+        # Act
+        repository = PersistentAssignmentRepository(path, mode="journal")
+        repository.assign("user2", 2, 4)
+        repository.close()
+        reloaded = PersistentAssignmentRepository(path, mode="journal")
+
+        # Assert
+        assert state_of(reloaded) == [("user1", 2, 3), ("user2", 2, 4)]
+
+    def test_invalid_fsync_policy(self, path):
+        """Test that an unknown fsync policy is rejected."""
+        with pytest.raises(ValueError):
+            PersistentAssignmentRepository(path, mode="journal", fsync="sometimes")
+
+    def test_crash_recovery_at_every_offset(self, tmp_path):
+        """Test that truncating the journal at any byte recovers every committed record."""
+        # Arrange - record the state after each committed journal line
+        source = str(tmp_path / "source.json")
+        repository = PersistentAssignmentRepository(source, mode="journal", fsync="never")
+        apply_ops(repository)
+        repository.close()
+        with open(f"{source}.journal", "rb") as f:
+            journal = f.read()
+        line_ends = [i + 1 for i, byte in enumerate(journal) if byte == ord("\n")]
+
+        expected_states = [[]]
+        replica = PersistentAssignmentRepository(str(tmp_path / "replica.json"))
+        for line in journal.splitlines():
+            replica._apply(json.loads(line))
+            expected_states.append(state_of(replica))
+
+        for offset in range(len(journal) + 1):
+            # Act - simulate a crash that left only the first `offset` bytes
+            crashed = str(tmp_path / f"crash{offset}.json")
+            with open(f"{crashed}.journal", "wb") as f:
+                f.write(journal[:offset])
+            recovered = PersistentAssignmentRepository(crashed, mode="journal")
+
+            # Assert
+            committed = sum(1 for end in line_ends if end <= offset)
+            assert state_of(recovered) == expected_states[committed], offset
+
+            # The torn tail is dropped so new appends land on a clean line
+            recovered.assign("late", 3, 3)
+            recovered.close()
+            assert ("late", 3, 3) in state_of(PersistentAssignmentRepository(crashed, mode="journal"))
@@ -0,0 +1,152 @@
+import asyncio
+
+from tests.fake_discord import FakeChannel, FakeClock
+from infrastructure.live_board import LiveBoard
+from infrastructure.rate_limit import TokenBucket
+
+
+def edits(channel):
+    """``(time, embed)`` of every edit to a message of ``channel``, in time order."""
+    return sorted((edit["at"], edit["embed"]) for message in channel.messages for edit in message.edits)
+
+
+async def settle():
+    """Let scheduled edit tasks run to completion."""
+    for _ in range(50):
+        await asyncio.sleep(0)
+
+
+class TestTokenBucket:
+    """Tests for the TokenBucket class."""
+
+    def test_refills_over_time(self):
+        """Test that tokens run out and come back at the configured rate."""
+        # Arrange
+        clock = FakeClock()
+        bucket = TokenBucket(2, per=2.0, clock=clock)
+
+        # Act & Assert
+        assert bucket.try_acquire() and bucket.try_acquire()
+        assert not bucket.try_acquire()
+        assert bucket.delay() == 1.0
+        clock.now = 1.0
+        assert bucket.try_acquire()
+
+
+class TestLiveBoard:
+    """Tests for the LiveBoard class."""
+
+    def test_burst_is_coalesced_into_one_edit(self):
+        """Test that a burst of mutations produces a single edit after the window."""
+        clock = FakeClock()
+        version = {"n": 0}
+        board = LiveBoard(lambda key: f"v{version['n']}", window=2.0, clock=clock, sleep=clock.sleep)
+        channel = FakeChannel(1, clock)
+
+        async def drive():
+            await board.attach("guild", channel)
+            for _ in range(10):
+                version["n"] += 1
+                board.notify("guild")
+            await settle()
+
+        # Act
+        asyncio.run(drive())
+
+        # Assert
+        assert [(message["at"], message["embed"]) for message in channel.sent] == [(0.0, "v0")]
+        assert edits(channel) == [(2.0, "v10")]
+
+    def test_edits_respect_window(self):
+        """Test that consecutive bursts are spaced by at least the window."""
+        clock = FakeClock()
+        board = LiveBoard(lambda key: clock(), window=2.0, clock=clock, sleep=clock.sleep)
+        channel = FakeChannel(1, clock)
+
+        async def drive():
+            await board.attach("guild", channel)
+            for _ in range(4):
+                board.notify("guild")
+                await settle()
+                clock.now += 0.5
+
+        # Act
+        asyncio.run(drive())
+
+        # Assert
+        times = [t for t, _ in edits(channel)]
+        assert all(later - earlier >= 2.0 for earlier, later in zip(times, times[1:]))
+
+    def test_channel_rate_limit_is_shared(self):
+        """Test that boards in one channel share its token bucket."""
+        clock = FakeClock()
+        board = LiveBoard(lambda key: key, window=0.0, rate=2, per=10.0, clock=clock, sleep=clock.sleep)
+        channel = FakeChannel(1, clock)
+
+        async def drive():
+            await board.attach("a", channel)
+            await board.attach("b", channel)
+            board.notify("a")
+            board.notify("b")
+            await settle()
+
+        # Act
+        asyncio.run(drive())
+
+        # Assert - two posts used the bucket, so both edits waited for refills
+        assert [t for t, _ in edits(channel)] == [5.0, 10.0]
+
+    def test_close_sends_pending_edits(self):
+        """Test that closing sends a pending edit at once instead of dropping it with the window still open."""
+        # Arrange
+        clock = FakeClock()
+        version = {"n": 0}
+
+        async def never(seconds):
+            await asyncio.Event().wait()
+
+        board = LiveBoard(lambda key: f"v{version['n']}", window=2.0, clock=clock, sleep=never)
+        channel = FakeChannel(1, clock)
+
+        async def drive():
+            await board.attach("guild", channel)
+            version["n"] += 1
+            board.notify("guild")
+            await settle()
+            await board.close()
+
+        # Act
+        asyncio.run(drive())
+
+        # Assert
+        assert edits(channel) == [(0.0, "v1")]
+
+    def test_close_drops_edits_still_limited_after_timeout(self):
+        """Test that closing gives up on edits the channel's bucket still holds back once the timeout runs out."""
+        # Arrange
+        async def never(seconds):
+            await asyncio.Event().wait()
+
+        board = LiveBoard(lambda key: key, rate=1, per=60.0, sleep=never)
+        channel = FakeChannel(1)
+
+        async def drive():
+            await board.attach("guild", channel)
+            board.notify("guild")
+            await board.close(timeout=0.01)
+
+        # Act
+        asyncio.run(drive())
+
+        # Assert
+        assert edits(channel) == []
+
+    def test_notify_without_board_is_ignored(self):
+        """Test that rosters without a board do nothing on mutation."""
+        board = LiveBoard(lambda key: key)
+
+        async def drive():
+            board.notify("guild")
+
+        # Act & Assert
+        asyncio.run(drive())
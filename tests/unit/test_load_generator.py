@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks import load_generator
+from benchmarks.load_generator import OfflineBot, run_load, signup_storm
+from core.models import GridConfig
+from infrastructure.discord_adapter import DiscordAdapter
+
+
+class TestOfflineBot:
+    """Tests for driving bot.py's handlers through the fake Discord objects."""
+
+    @pytest.fixture
+    def workdir(self, tmp_path, monkeypatch):
+        """Keep every roster file inside a temporary directory."""
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+
+    def test_slash_and_text_handlers_reply(self, workdir):
+        """Test that slash and legacy commands reach the roster and their replies are recorded."""
+        # Arrange
+        commands = [
+            {"command": "assign", "user": "alice", "params": {"team": 1, "lane": 2}},
+            {"kind": "text", "command": "assign", "user": "bob", "args": "--team 1 --lane 2"},
+            {"command": "list", "user": "bob"},
+            {"command": "backup", "user": "admin"},
+        ]
+
+        async def scenario():
+            bot = OfflineBot(DiscordAdapter())
+            try:
+                return [await bot.dispatch(command) for command in commands], bot.channels[1]
+            finally:
+                await bot.close()
+
+        # Act
+        (assign, _, listing, backup), channel = asyncio.run(scenario())
+
+        # Assert
+        assert assign.sent[0]["content"] == "✅ alice assigned to Team 1 Lane 2"
+        assert channel.sent[0]["content"].startswith("❌ Lane taken.")
+        assert listing.sent[0]["embed"] is not None
+        assert backup.deferred and backup.sent[0]["content"].startswith("✅")
+
+    def test_run_load_reports_every_command(self, workdir):
+        """Test that a concurrent signup storm is fully handled and measured."""
+        # Arrange
+        grid = GridConfig(3, 8)
+        commands = list(signup_storm(300, guilds=2, grid=grid))
+        bot = OfflineBot(DiscordAdapter(grid=grid))
+
+        async def scenario():
+            try:
+                return await run_load(bot, commands, concurrency=20)
+            finally:
+                await bot.close()
+
+        # Act
+        report = asyncio.run(scenario())
+
+        # Assert
+        assert report["commands"] == 300
+        assert report["errors"] == []
+        assert sum(report["outcomes"].values()) == 300
+        assert 0 < report["p50_ms"] <= report["p99_ms"] <= report["max_ms"]
+        assert report["throughput"] > 0
+
+    def test_main_replays_a_script(self, tmp_path, capsys):
+        """Test that a recorded JSONL stream is replayed and summarized."""
+        # Arrange
+        script = tmp_path / "storm.jsonl"
+        script.write_text("\n".join(json.dumps(command) for command in [
+            {"command": "assign", "user": "alice", "params": {"random": True}},
+            {"command": "waitlist", "user": "bob", "params": {"action": "show"}},
+            {"kind": "text", "command": "remove", "user": "alice", "args": "--member alice"},
+        ]))
+
+        # Act
+        status = load_generator.main(["--script", str(script), "--concurrency", "2"])
+
+        # Assert
+        assert status == 0
+        assert "3 commands, concurrency 2" in capsys.readouterr().out
@@ -0,0 +1,209 @@
+import asyncio
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from core.metrics import METRICS, Histogram, Metrics, instrumented
+from core.repository import PersistentAssignmentRepository
+from infrastructure.discord_adapter import DiscordAdapter
+from infrastructure.metrics_server import MetricsServer
+
+
+@pytest.fixture
+def metrics():
+    """Enable the process-wide metrics for one test, starting from zero."""
+    METRICS.reset()
+    METRICS.enable()
+    yield METRICS
+    METRICS.disable()
+    METRICS.reset()
+
+
+class TestMetrics:
+    """Tests for the Metrics registry."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that every bucket counts the observations at or below its bound."""
+        # Arrange
+        histogram = Histogram("latency", "Latency.", buckets=(0.1, 1.0))
+
+        # Act
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value, command="assign")
+        lines = list(histogram.render())
+
+        # Assert
+        assert 'latency_bucket{command="assign",le="0.1"} 2' in lines
+        assert 'latency_bucket{command="assign",le="1.0"} 3' in lines
+        assert 'latency_bucket{command="assign",le="+Inf"} 4' in lines
+        assert 'latency_count{command="assign"} 4' in lines
+        assert 'latency_sum{command="assign"} 2.65' in lines
+
+    def test_disabled_records_nothing(self):
+        """Test that timers and writes are ignored until metrics are enabled."""
+        # Arrange
+        metrics = Metrics()
+
+        # Act
+        with metrics.timed("parser", "assign"):
+            pass
+        metrics.record_write("snapshot", 0.01, 100)
+
+        # Assert
+        assert "roster_commands_total{" not in metrics.render()
+        assert "roster_persistence_write_seconds_bucket" not in metrics.render()
+
+    def test_timer_labels_outcome(self):
+        """Test that a timer counts the outcome set on it, and errors as error."""
+        # Arrange
+        metrics = Metrics()
+        metrics.enable()
+
+        # Act
+        with metrics.timed("parser", "assign") as timer:
+            timer.outcome = "refused"
+        with pytest.raises(RuntimeError):
+            with metrics.timed("parser", "assign"):
+                raise RuntimeError("boom")
+        text = metrics.render()
+
+        # Assert
+        assert 'roster_commands_total{command="assign",entry="parser",outcome="refused"} 1' in text
+        assert 'roster_commands_total{command="assign",entry="parser",outcome="error"} 1' in text
+
+    def test_gauges_are_collected_at_render(self):
+        """Test that a gauge reads its callback each time metrics are rendered."""
+        # Arrange
+        metrics = Metrics()
+        depth = {"value": 1}
+        metrics.register_gauge("queue_depth", "Depth.", lambda: {(("roster", 'a"b'),): depth["value"]})
+
+        # Act
+        depth["value"] = 7
+
+        # Assert
+        assert 'queue_depth{roster="a\\"b"} 7' in metrics.render()
+
+    def test_instrumented_coroutine(self, metrics):
+        """Test that the decorator times coroutines and maps results to outcomes."""
+        # Arrange
+        @instrumented("slash", "assign", outcome=lambda reply: "ok" if reply.startswith("✅") else "refused")
+        async def handler(reply):
+            return reply
+
+        # Act
+        asyncio.run(handler("✅ done"))
+        asyncio.run(handler("❌ taken"))
+        text = metrics.render()
+
+        # Assert
+        assert handler.__name__ == "handler"
+        assert 'roster_commands_total{command="assign",entry="slash",outcome="ok"} 1' in text
+        assert 'roster_commands_total{command="assign",entry="slash",outcome="refused"} 1' in text
+        assert 'roster_command_latency_seconds_count{command="assign",entry="slash"} 2' in text
+
+
+class TestInstrumentation:
+    """Tests for the metrics reported by the adapter and persistence layers."""
+
+    @pytest.fixture(autouse=True)
+    def workdir(self, tmp_path, monkeypatch):
+        """Run each test in an empty directory."""
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+
+    def test_adapter_commands_are_counted_by_outcome(self, metrics):
+        """Test that adapter handlers report refused and invalid replies separately."""
+        # Arrange
+        adapter = DiscordAdapter()
+        ctx = SimpleNamespace(guild=None, channel=SimpleNamespace(id=1), author=SimpleNamespace(name="a"))
+
+        # Act
+        adapter.handle_assign(ctx, "--team 1 --lane 1")
+        adapter.handle_assign(ctx, "--team 1 --lane 1 --member b")
+        adapter.handle_assign(ctx, "--team 9 --lane 1")
+        adapter.close()
+        text = metrics.render()
+
+        # Assert
+        for outcome in ("ok", "refused", "invalid"):
+            assert f'roster_commands_total{{command="assign",entry="adapter",outcome="{outcome}"}} 1' in text
+        assert 'roster_resident_rosters 0' in text
+
+    def test_admin_commands_are_counted(self, metrics):
+        """Test that history and profile requests are counted like the other commands."""
+        # Arrange
+        adapter = DiscordAdapter()
+        ctx = SimpleNamespace(guild=None, channel=SimpleNamespace(id=1), author=SimpleNamespace(name="a"))
+
+        # Act
+        adapter.handle_history(ctx, "--limit 5")
+        adapter.handle_profile(ctx, "--rate 2")
+        adapter.close()
+        text = metrics.render()
+
+        # Assert
+        assert 'roster_commands_total{command="history",entry="adapter",outcome="ok"} 1' in text
+        assert 'roster_commands_total{command="profile",entry="adapter",outcome="invalid"} 1' in text
+
+    def test_snapshot_writes_report_bytes(self, metrics, workdir):
+        """Test that snapshot writes report their latency and size."""
+        # Arrange
+        repo = PersistentAssignmentRepository(str(workdir / "roster.json"))
+
+        # Act
+        repo.assign("alice", 1, 1)
+        size = (workdir / "roster.json").stat().st_size
+
+        # Assert
+        text = metrics.render()
+        assert 'roster_persistence_write_seconds_count{kind="snapshot"} 1' in text
+        assert f'roster_persistence_write_bytes_total{{kind="snapshot"}} {size}' in text
+
+    def test_journal_appends_are_timed(self, metrics, workdir):
+        """Test that journal mode reports one write per appended record."""
+        # Arrange
+        repo = PersistentAssignmentRepository(str(workdir / "roster.json"), mode="journal")
+
+        # Act
+        repo.assign("alice", 1, 1)
+        repo.assign("bob", 1, 2)
+        repo.close()
+
+        # Assert
+        assert 'roster_persistence_write_seconds_count{kind="journal"} 2' in metrics.render()
+
+
+class TestMetricsServer:
+    """Tests for the MetricsServer class."""
+
+    @pytest.fixture
+    def server(self, metrics):
+        """Serve the metrics on a free local port."""
+        server = MetricsServer(metrics, port=0)
+        server.start()
+        yield server
+        server.close()
+
+    def test_scrape_returns_exposition_format(self, server, metrics):
+        """Test that GET /metrics returns the rendered metrics as Prometheus text."""
+        # Arrange
+        metrics.record_command("parser", "list", "ok", 0.002)
+
+        # Act
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+            content_type = response.headers["Content-Type"]
+            body = response.read().decode()
+
+        # Assert
+        assert content_type.startswith("text/plain; version=0.0.4")
+        assert 'roster_commands_total{command="list",entry="parser",outcome="ok"} 1' in body
+
+    def test_other_paths_are_not_found(self, server):
+        """Test that only /metrics is served."""
+        # Act & Assert
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"http://127.0.0.1:{server.port}/")
+        assert error.value.code == 404
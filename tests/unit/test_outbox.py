@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from tests.fake_discord import FakeChannel, FakeClock, FakeInteraction
+from infrastructure.outbox import Outbox
+
+
+class TestOutbox:
+    """Tests for the Outbox class."""
+
+    @pytest.fixture
+    def clock(self):
+        """Create a fake clock starting at zero."""
+        return FakeClock()
+
+    @pytest.fixture
+    def outbox(self, clock):
+        """Create an outbox on the fake clock with a half-second window."""
+        return Outbox(window=0.5, deadline=2.0, clock=clock, sleep=clock.sleep)
+
+    def test_burst_of_confirmations_is_merged(self, clock, outbox):
+        """Test that replies arriving within the window go out as one message."""
+        # Arrange
+        channel = FakeChannel(1, clock)
+
+        async def drive():
+            await outbox.send(channel, "✅ alice assigned to Team 1 Lane 1")
+            return await asyncio.gather(*(outbox.send(channel, f"✅ user{n} assigned to Team 1 Lane {n}")
+                                          for n in range(2, 5)))
+
+        # Act
+        carriers = asyncio.run(drive())
+
+        # Assert
+        assert channel.sent == [
+            {"at": 0.0, "content": "✅ alice assigned to Team 1 Lane 1"},
+            {"at": 0.5, "content": "✅ user2 assigned to Team 1 Lane 2\n✅ user3 assigned to Team 1 Lane 3\n"
+                                   "✅ user4 assigned to Team 1 Lane 4"},
+        ]
+        assert carriers == [channel.messages[1]] * 3
+
+    def test_other_messages_keep_their_order(self, clock, outbox):
+        """Test that an embed is neither merged nor sent ahead of the replies queued before it."""
+        # Arrange
+        channel = FakeChannel(1, clock)
+
+        async def drive():
+            await asyncio.gather(outbox.send(channel, "✅ a"), outbox.send(channel, "❌ b"),
+                                 outbox.send(channel, embed="board"), outbox.send(channel, "✅ c"))
+
+        # Act
+        asyncio.run(drive())
+
+        # Assert
+        assert [(message.content, message.embed) for message in channel.messages] == [
+            ("✅ a\n❌ b", None), (None, "board"), ("✅ c", None)]
+
+    def test_channel_rate_limit_spaces_messages(self, clock):
+        """Test that messages beyond the channel's bucket wait for refills."""
+        # Arrange
+        outbox = Outbox(window=0.0, rate=2, per=10.0, clock=clock, sleep=clock.sleep)
+        channel = FakeChannel(1, clock)
+
+        async def drive():
+            for n in range(4):
+                await outbox.send(channel, embed=n)
+
+        # Act
+        asyncio.run(drive())
+
+        # Assert
+        assert [message["at"] for message in channel.sent] == [0.0, 0.0, 5.0, 10.0]
+
+    def test_send_failure_reaches_every_merged_caller(self, clock, outbox):
+        """Test that callers whose replies were merged all see the failed send."""
+        # Arrange
+        channel = FakeChannel(1, clock)
+
+        async def fail(content=None, **kwargs):
+            raise ConnectionError("gateway down")
+
+        channel.send = fail
+
+        async def drive():
+            return await asyncio.gather(outbox.send(channel, "✅ a"), outbox.send(channel, "✅ b"),
+                                        return_exceptions=True)
+
+        # Act
+        results = asyncio.run(drive())
+
+        # Assert
+        assert [type(result) for result in results] == [ConnectionError, ConnectionError]
+
+    def test_fast_reply_is_the_response(self, outbox):
+        """Test that a reply ready before the deadline is sent as the interaction response."""
+        # Arrange
+        interaction = FakeInteraction("alice", 1, FakeChannel(1))
+
+        async def reply():
+            return "✅ done"
+
+        # Act
+        asyncio.run(outbox.respond(interaction, reply()))
+
+        # Assert
+        assert not interaction.deferred
+        assert interaction.sent == [{"content": "✅ done", "ephemeral": False}]
+
+    def test_slow_reply_is_deferred_then_followed_up(self, clock, outbox):
+        """Test that a reply not ready by the deadline defers the interaction and follows up."""
+        # Arrange
+        interaction = FakeInteraction("alice", 1, FakeChannel(1))
+        ready = asyncio.Event()
+
+        async def reply():
+            await ready.wait()
+            return "✅ done"
+
+        async def drive():
+            responding = asyncio.create_task(outbox.respond(interaction, reply()))
+            for _ in range(5):
+                await asyncio.sleep(0)
+            deferred_at = clock()
+            ready.set()
+            await responding
+            return deferred_at
+
+        # Act
+        deferred_at = asyncio.run(drive())
+
+        # Assert
+        assert deferred_at == 2.0
+        assert interaction.deferred
+        assert interaction.sent == [{"content": "✅ done", "ephemeral": False}]
@@ -0,0 +1,124 @@
+import pstats
+import tracemalloc
+from types import SimpleNamespace
+
+import pytest
+
+from core.profiling import PROFILER, Profiler, profiled
+from core.repository import InMemoryAssignmentRepository
+from core.services import AssignmentService
+from infrastructure.discord_adapter import DiscordAdapter
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    """Point the process-wide profiler at a temporary directory, sampling every call."""
+    directory, keep, samples = PROFILER.directory, PROFILER.keep, PROFILER.samples
+    PROFILER.directory = str(tmp_path / "profiles")
+    PROFILER.enable(1.0)
+    yield PROFILER
+    PROFILER.disable()
+    PROFILER.directory, PROFILER.keep, PROFILER.samples = directory, keep, samples
+    PROFILER.recent.clear()
+
+
+@profiled("test.build")
+def build(n):
+    """Allocate something worth reporting."""
+    return [str(i) * 10 for i in range(n)]
+
+
+@profiled("test.outer")
+def outer():
+    return build(10)
+
+
+class TestProfiler:
+    """Tests for the Profiler class and the profiled decorator."""
+
+    def test_disabled_writes_nothing(self, tmp_path, monkeypatch):
+        """Test that decorated calls run unsampled while profiling is off."""
+        # Arrange
+        monkeypatch.setattr(PROFILER, "directory", str(tmp_path / "off"))
+
+        # Act
+        result = build(3)
+
+        # Assert
+        assert result == ["0" * 10, "1" * 10, "2" * 10]
+        assert not (tmp_path / "off").exists()
+
+    def test_sample_writes_stats_snapshot_and_summary(self, profiler, tmp_path):
+        """Test that a sampled call leaves a pstats file, a tracemalloc snapshot and a summary."""
+        # Act
+        build(1000)
+
+        # Assert
+        files = sorted(p.suffix for p in (tmp_path / "profiles").iterdir())
+        assert files == [".pstats", ".tracemalloc", ".txt"]
+        pstats_file = next((tmp_path / "profiles").glob("*.pstats"))
+        assert any(func == "build" for _, _, func in pstats.Stats(str(pstats_file)).stats)
+        snapshot = tracemalloc.Snapshot.load(str(next((tmp_path / "profiles").glob("*.tracemalloc"))))
+        assert snapshot.statistics("lineno")
+        assert profiler.recent[-1].startswith("test.build: ")
+        assert "Top 10 allocation sites:" in profiler.recent[-1]
+        assert not tracemalloc.is_tracing()
+
+    def test_nested_calls_are_one_sample(self, profiler):
+        """Test that a call made inside a sampled call is not sampled separately."""
+        # Act
+        outer()
+
+        # Assert
+        assert profiler.samples == 1
+        assert profiler.recent[-1].startswith("test.outer: ")
+
+    def test_rotation_keeps_newest_samples(self, profiler, tmp_path):
+        """Test that only the newest ``keep`` samples stay on disk."""
+        # Arrange
+        profiler.keep = 2
+
+        # Act
+        for _ in range(5):
+            build(10)
+
+        # Assert
+        stems = sorted(p.stem for p in (tmp_path / "profiles").glob("*.pstats"))
+        assert len(stems) == 2
+        assert stems[-1].split("-")[3] == "000005"
+
+    def test_rate_must_be_a_fraction(self):
+        """Test that sample rates outside (0, 1] are rejected."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            Profiler().enable(1.5)
+
+    def test_toggled_at_runtime_from_adapter(self, tmp_path, monkeypatch):
+        """Test that the profile command switches sampling of service calls on and off."""
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+        adapter = DiscordAdapter()
+        ctx = SimpleNamespace(guild=None, channel=SimpleNamespace(id=1), author=SimpleNamespace(name="a"))
+        service = AssignmentService(InMemoryAssignmentRepository())
+        monkeypatch.setattr(PROFILER, "directory", str(tmp_path / "profiles"))
+        monkeypatch.setattr(PROFILER, "rate", PROFILER.rate)
+
+        # Act
+        try:
+            on = adapter.handle_profile(ctx, "--on --rate 1")
+            service.assign_user("alice", 1, 1)
+            status = adapter.handle_profile(ctx, "")
+            off = adapter.handle_profile(ctx, "--off")
+            service.assign_user("bob", 1, 2)
+            invalid = adapter.handle_profile(ctx, "--rate 2")
+        finally:
+            PROFILER.disable()
+            PROFILER.recent.clear()
+            adapter.close()
+
+        # Assert
+        assert on.startswith("🔬 Profiling 100% of calls")
+        assert "service.assign_user" in status
+        assert off.startswith("🔬 Profiling is off.")
+        assert len(list((tmp_path / "profiles").glob("*service.assign_user.pstats"))) == 1
+        assert invalid.startswith("❗ Sample rate must be above 0")
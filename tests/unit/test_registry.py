@@ -0,0 +1,144 @@
+import pytest
+
+from core.registry import RepositoryRegistry
+from core.repository import InMemoryAssignmentRepository
+from tests.fake_discord import FakeClock
+
+
+class ClosingRepository(InMemoryAssignmentRepository):
+    """In-memory repository that records when it is closed."""
+
+    def __init__(self, key, closed):
+        super().__init__()
+        self.key = key
+        self._closed = closed
+
+    def close(self):
+        self._closed.append(self.key)
+
+
+class TestRepositoryRegistry:
+    """Tests for the RepositoryRegistry class."""
+
+    @pytest.fixture
+    def clock(self):
+        """Create a fake clock."""
+        return FakeClock()
+
+    @pytest.fixture
+    def closed(self):
+        """Keys of repositories that have been closed."""
+        return []
+
+    @pytest.fixture
+    def make_registry(self, clock, closed):
+        """Build a registry with the given budget."""
+        def make(**budget):
+            return RepositoryRegistry(lambda key: ClosingRepository(key, closed), clock=clock, **budget)
+        return make
+
+    def test_loads_roster_on_first_use(self, make_registry):
+        """Test that a roster is created once and then reused."""
+        # Arrange
+        registry = make_registry()
+
+        # Act
+        first = registry.get("guild1")
+        second = registry.get("guild1")
+
+        # Assert
+        assert first is second
+        assert len(registry) == 1
+
+    def test_rosters_are_partitioned(self, make_registry):
+        """Test that different keys get independent repositories."""
+        # Arrange
+        registry = make_registry()
+
+        # Act
+        registry.get("guild1").assign("user1", 1, 1)
+
+        # Assert
+        assert registry.get("guild2").assign("user2", 1, 1) is True
+
+    def test_idle_rosters_are_evicted(self, make_registry, clock, closed):
+        """Test that rosters idle past the timeout are closed and dropped."""
+        # Arrange
+        registry = make_registry(idle_timeout=60)
+        registry.get("guild1")
+        clock.now = 30
+        registry.get("guild2")
+
+        # Act
+        clock.now = 75
+        registry.evict_idle()
+
+        # Assert
+        assert closed == ["guild1"]
+        assert "guild1" not in registry
+        assert "guild2" in registry
+
+    def test_least_recently_used_roster_is_evicted(self, make_registry, closed):
+        """Test that exceeding the resident budget evicts the LRU roster."""
+        # Arrange
+        registry = make_registry(max_resident=2)
+        registry.get("guild1")
+        registry.get("guild2")
+        registry.get("guild1")
+
+        # Act
+        registry.get("guild3")
+
+        # Assert
+        assert closed == ["guild2"]
+
+    def test_entry_budget(self, make_registry, closed):
+        """Test that the assignment budget evicts rosters but keeps the one in use."""
+        # Arrange
+        registry = make_registry(max_entries=3)
+        for lane in range(1, 4):
+            registry.get("guild1").assign(f"user{lane}", 1, lane)
+
+        # Act
+        registry.get("guild2").assign("user4", 1, 1)
+        registry.get("guild2")
+
+        # Assert
+        assert closed == ["guild1"]
+
+    def test_entry_budget_counts_only_rosters_in_use(self, clock, closed):
+        """Test that each check counts the rosters handed out since the last one, not every resident roster."""
+        # Arrange
+        counted = []
+
+        class CountingRepository(ClosingRepository):
+            def assignment_count(self):
+                counted.append(self.key)
+                return super().assignment_count()
+
+        registry = RepositoryRegistry(lambda key: CountingRepository(key, closed), max_entries=100, clock=clock)
+        for guild in range(5):
+            registry.get(guild)
+        registry.get(0)
+        counted.clear()
+
+        # Act
+        registry.get(0).assign("user1", 1, 1)
+        registry.get(0)
+
+        # Assert
+        assert counted == [0, 0]
+
+    def test_close_all(self, make_registry, closed):
+        """Test that shutting down closes every resident roster."""
+        # Arrange
+        registry = make_registry()
+        registry.get("guild1")
+        registry.get("guild2")
+
+        # Act
+        registry.close_all()
+
+        # Assert
+        assert sorted(closed) == ["guild1", "guild2"]
+        assert len(registry) == 0
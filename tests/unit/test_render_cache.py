@@ -0,0 +1,75 @@
+import pytest
+
+from core.repository import InMemoryAssignmentRepository
+from interfaces.presentation import format_assignments, to_discord_embed
+from interfaces.render_cache import RenderCache
+
+
+class TestRenderCache:
+    """Tests for the RenderCache class."""
+
+    @pytest.fixture
+    def repository(self):
+        """Create a repository with two members."""
+        repo = InMemoryAssignmentRepository()
+        repo.assign("alice", 1, 3)
+        repo.assign("bob", 2, 5)
+        return repo
+
+    @pytest.fixture
+    def cache(self):
+        """Create an empty cache."""
+        return RenderCache()
+
+    def test_matches_uncached_renderers(self, cache, repository):
+        """Test that cached output is identical to the plain renderers."""
+        # Arrange
+        assignments = list(repository.assignments.values())
+
+        # Act
+        text = cache.render(repository, "text")
+        embed = cache.render(repository, "embed")
+
+        # Assert
+        assert text == format_assignments(assignments)
+        assert embed.to_dict() == to_discord_embed(assignments).to_dict()
+
+    def test_unchanged_roster_is_a_hit(self, cache, repository):
+        """Test that repeated renders of an unchanged roster reuse the output."""
+        # Act
+        first = cache.render(repository, "text")
+        second = cache.render(repository, "text")
+
+        # Assert
+        assert first is second
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_only_changed_rows_are_rendered(self, cache, repository):
+        """Test that a mutation re-renders only the affected team."""
+        # Arrange
+        cache.render(repository, "text")
+
+        # Act
+        repository.assign("carol", 3, 1)
+        output = cache.render(repository, "text")
+
+        # Assert
+        assert "carol" in output
+        assert cache.stats()["misses"] == 2
+        assert cache.stats()["row_misses"] == 4
+        assert cache.stats()["row_hits"] == 2
+
+    def test_formats_and_rosters_are_separate(self, cache, repository):
+        """Test that each roster and format is cached on its own."""
+        # Arrange
+        other = InMemoryAssignmentRepository()
+
+        # Act
+        mine = cache.render(repository, "text")
+        theirs = cache.render(other, "text")
+
+        # Assert
+        assert "alice" in mine
+        assert "alice" not in theirs
+        assert cache.stats()["misses"] == 2
@@ -0,0 +1,161 @@
+import json
+
+import pytest
+
+from core.repository import InMemoryAssignmentRepository, PersistentAssignmentRepository
+
+
+class TestInMemoryAssignmentRepository:
+    """Tests for the InMemoryAssignmentRepository class."""
+
+    @pytest.fixture
+    def repository(self):
+        """Create a repository for testing."""
+        return InMemoryAssignmentRepository()
+
+    def test_assign_moves_user_out_of_previous_lane(self, repository):
+        """Test that reassigning a user frees their previous lane."""
+        # Arrange
+        repository.assign("user1", 1, 1)
+
+        # Act
+        assigned = repository.assign("user1", 2, 4)
+
+        # Assert
+        assert assigned is True
+        assert "1-1" not in repository.assignments
+        assert repository.find_assignment("user1").team == 2
+        assert repository.find_first_empty() == (1, 1)
+
+    def test_assign_to_occupied_lane_keeps_current_lane(self, repository):
+        """Test that a failed assign leaves the user where they were."""
+        # Arrange
+        repository.assign("user1", 1, 1)
+        repository.assign("user2", 1, 2)
+
+        # Act
+        assigned = repository.assign("user2", 1, 1)
+
+        # Assert
+        assert assigned is False
+        assert repository.find_assignment("user2").lane == 2
+
+    def test_find_first_empty_skips_full_teams(self, repository):
+        """Test that the first free lane is found past a full team."""
+        # Arrange
+        for lane in range(1, 9):
+            repository.assign(f"user{lane}", 1, lane)
+        repository.assign("user9", 2, 1)
+
+        # Act
+        slot = repository.find_first_empty()
+
+        # Assert
+        assert slot == (2, 2)
+
+    def test_remove_frees_lane(self, repository):
+        """Test that removing a user makes their lane available again."""
+        # Arrange
+        repository.assign("user1", 1, 1)
+
+        # Act
+        removed = repository.remove("user1")
+
+        # Assert
+        assert removed is True
+        assert repository.find_assignment("user1") is None
+        assert repository.find_first_empty() == (1, 1)
+        assert len(repository.assignments) == 0
+
+    def test_find_first_empty_when_full(self, repository):
+        """Test that a full grid has no empty lane."""
+        # Arrange
+        for team in range(1, 4):
+            for lane in range(1, 9):
+                repository.assign(f"user{team}_{lane}", team, lane)
+
+        # Act & Assert
+        assert repository.find_first_empty() is None
+
+    def test_clear(self, repository):
+        """Test that clearing empties every index."""
+        # Arrange
+        repository.assign("user1", 3, 8)
+
+        # Act
+        repository.clear()
+
+        # Assert
+        assert repository.find_assignment("user1") is None
+        assert repository.assign("user2", 3, 8) is True
+
+
+class TestPersistentAssignmentRepository:
+    """Tests for the PersistentAssignmentRepository class."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that assignments survive a reload."""
+        # Arrange
+        path = tmp_path / "assignments.json"
+        repository = PersistentAssignmentRepository(str(path))
+        repository.assign("user1", 2, 3)
+        repository.assign("user2", 1, 1)
+        repository.remove("user2")
+
+        # Act
+        reloaded = PersistentAssignmentRepository(str(path))
+
+        # Assert
+        assert json.loads(path.read_text()) == [{"user": "user1", "team": 2, "lane": 3}]
+        assert reloaded.find_assignment("user1").lane == 3
+        assert reloaded.find_first_empty() == (1, 1)
+
+
+class TestDeferredMode:
+    """Tests for the deferred mode of PersistentAssignmentRepository."""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        """Path of the snapshot file."""
+        return tmp_path / "assignments.json"
+
+    def test_mutations_only_mark_dirty(self, path):
+        """Test that mutations are not written until a flush."""
+        # Arrange
+        repository = PersistentAssignmentRepository(str(path), mode="deferred", flush_interval=60)
+
+        # Act
+        repository.assign("user1", 1, 1)
+        repository.assign("user2", 1, 2)
+
+        # Assert
+        assert not path.exists()
+        repository.flush()
+        assert len(json.loads(path.read_text())) == 2
+        repository.close()
+
+    def test_background_flush_coalesces_writes(self, path):
+        """Test that the flusher writes a burst of mutations on its own."""
+        # Arrange
+        repository = PersistentAssignmentRepository(str(path), mode="deferred", flush_interval=0.01)
+
+        # Act
+        for lane in range(1, 9):
+            repository.assign(f"user{lane}", 1, lane)
+        repository._stop_flusher.wait(0.2)
+
+        # Assert
+        assert len(json.loads(path.read_text())) == 8
+        repository.close()
+
+    def test_close_flushes_pending_mutations(self, path):
+        """Test that shutting down writes whatever is still pending."""
+        # Arrange
+        repository = PersistentAssignmentRepository(str(path), mode="deferred", flush_interval=60)
+        repository.assign("user1", 3, 3)
+
+        # Act
+        repository.close()
+
+        # Assert
+        assert PersistentAssignmentRepository(str(path)).find_assignment("user1").team == 3
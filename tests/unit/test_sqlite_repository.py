@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+from core.models import Assignment, GridConfig
+from core.services import AssignmentService
+from core.sqlite_repository import SqliteAssignmentRepository
+
+
+class TestSqliteAssignmentRepository:
+    """Tests for the SqliteAssignmentRepository class."""
+
+    @pytest.fixture
+    def repository(self, tmp_path):
+        """Create a repository backed by a temporary database."""
+        repo = SqliteAssignmentRepository(str(tmp_path / "assignments.db"))
+        yield repo
+        repo.close()
+
+    def test_uses_wal_mode(self, repository):
+        """Test that the database runs in WAL mode."""
+        assert repository._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_assign_and_find(self, repository):
+        """Test assigning a user and looking them up."""
+        # Act
+        assigned = repository.assign("user1", 2, 5)
+
+        # Assert
+        assert assigned is True
+        assignment = repository.find_assignment("user1")
+        assert (assignment.team, assignment.lane) == (2, 5)
+        assert repository.assignments["2-5"].user == "user1"
+
+    def test_assign_to_occupied_lane(self, repository):
+        """Test that an occupied lane is refused and the user keeps their lane."""
+        # Arrange
+        repository.assign("user1", 1, 1)
+        repository.assign("user2", 1, 2)
+
+        # Act
+        assigned = repository.assign("user2", 1, 1)
+
+        # Assert
+        assert assigned is False
+        assert repository.find_assignment("user2").lane == 2
+
+    def test_reassign_moves_user(self, repository):
+        """Test that assigning an already assigned user moves them."""
+        # Arrange
+        repository.assign("user1", 1, 1)
+
+        # Act
+        repository.assign("user1", 3, 8)
+
+        # Assert
+        assert list(repository.assignments) == ["3-8"]
+        assert repository.find_first_empty() == (1, 1)
+
+    def test_find_first_empty_and_remove(self, repository):
+        """Test first-empty queries across teams and after removals."""
+        # Arrange
+        for lane in range(1, 9):
+            repository.assign(f"user{lane}", 1, lane)
+
+        # Act & Assert
+        assert repository.find_first_empty() == (2, 1)
+        assert repository.remove("user4") is True
+        assert repository.remove("user4") is False
+        assert repository.find_first_empty() == (1, 4)
+
+    def test_find_least_loaded(self, repository):
+        """Test that the emptiest team with room is chosen, counting teams without rows."""
+        # Arrange
+        repository.assign("user1", 1, 1)
+        repository.assign("user2", 3, 1)
+
+        # Act & Assert
+        assert repository.find_least_loaded() == (2, 1)
+        repository.assign("user3", 2, 1)
+        assert repository.find_least_loaded() == (1, 2)
+
+    def test_invalid_lane_raises(self, repository):
+        """Test that out-of-range lanes are rejected like the other backends."""
+        with pytest.raises(ValueError):
+            repository.assign("user1", 1, 9)
+
+    def test_rosters_are_isolated(self, tmp_path):
+        """Test that two rosters in one database do not see each other."""
+        # Arrange
+        path = str(tmp_path / "shared.db")
+        first = SqliteAssignmentRepository(path, roster="first")
+        second = SqliteAssignmentRepository(path, roster="second")
+
+        # Act
+        first.assign("user1", 1, 1)
+        second.clear()
+
+        # Assert
+        assert second.assign("user1", 1, 1) is True
+        assert first.find_assignment("user1") is not None
+        first.close()
+        second.close()
+
+    def test_import_json(self, repository, tmp_path):
+        """Test the one-shot import from assignments.json."""
+        # Arrange
+        source = tmp_path / "assignments.json"
+        source.write_text(json.dumps([{"user": "user1", "team": 1, "lane": 3}, {"user": "user2", "team": 2, "lane": 5}]))
+
+        # Act
+        count = repository.import_json(str(source))
+
+        # Assert
+        assert count == 2
+        assert repository.find_assignment("user2").lane == 5
+
+    def test_import_json_on_a_larger_grid(self, tmp_path):
+        """Test that the import reads the JSON store on the roster's own grid."""
+        # Arrange
+        source = tmp_path / "assignments.json"
+        source.write_text(json.dumps([{"user": "user1", "team": 5, "lane": 15}]))
+        repository = SqliteAssignmentRepository(str(tmp_path / "assignments.db"), grid=GridConfig(12, 20))
+
+        # Act
+        count = repository.import_json(str(source))
+
+        # Assert
+        assert count == 1
+        assert repository.find_assignment("user1") == Assignment("user1", 5, 15, grid=GridConfig(12, 20))
+        repository.close()
+
+    def test_works_with_service(self, repository):
+        """Test that AssignmentService runs unchanged on top of SQLite."""
+        # Arrange
+        service = AssignmentService(repository)
+        service.assign_user("user1", 1, 3)
+
+        # Act
+        success, suggestions = service.assign_user("user2", 1, 3)
+
+        # Assert
+        assert success is False
+        assert suggestions
+        assert service.get_team_status()[1][3] == "user1"
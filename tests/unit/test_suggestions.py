@@ -0,0 +1,89 @@
+import pytest
+
+from core.models import GridConfig
+from core.repository import InMemoryAssignmentRepository
+from core.services import AssignmentService
+from core.suggestions import SuggestionEngine, any_free, least_loaded_team, nearest_in_team
+
+
+class TestSuggestionEngine:
+    """Tests for the SuggestionEngine class and its policies."""
+
+    @pytest.fixture
+    def repository(self):
+        """Create a 3x8 roster with team 1 lanes 2-5 and team 3 lane 1 taken."""
+        repo = InMemoryAssignmentRepository()
+        for lane in range(2, 6):
+            repo.assign(f"t1_{lane}", 1, lane)
+        repo.assign("t3_1", 3, 1)
+        return repo
+
+    def test_nearest_in_team_ranks_by_distance(self, repository):
+        """Test that lanes closest to the requested one come first, lower lane on a tie."""
+        # Act
+        ranked = list(nearest_in_team(repository.occupancy(), 1, 4))
+
+        # Assert
+        assert ranked == [(1, 6), (1, 1), (1, 7), (1, 8)]
+
+    def test_least_loaded_team_prefers_emptiest(self, repository):
+        """Test that other teams are offered from the least filled upward."""
+        # Act
+        ranked = list(least_loaded_team(repository.occupancy(), 1, 4))
+
+        # Assert
+        assert ranked == [(2, 1), (3, 2)]
+
+    def test_any_free_skips_full_teams(self):
+        """Test that a full team is never offered."""
+        # Arrange
+        repo = InMemoryAssignmentRepository(GridConfig(2, 2))
+        repo.assign("a", 1, 1)
+        repo.assign("b", 1, 2)
+
+        # Act
+        ranked = list(any_free(repo.occupancy(), 1, 1))
+
+        # Assert
+        assert ranked == [(2, 1)]
+
+    def test_policies_merge_without_duplicates(self, repository):
+        """Test that the default ranking chains policies and respects the limit."""
+        # Arrange
+        engine = SuggestionEngine()
+
+        # Act
+        ranked = engine.suggest(repository.occupancy(), 1, 4, limit=6)
+
+        # Assert
+        assert ranked == [(1, 6), (1, 1), (1, 7), (1, 8), (2, 1), (3, 2)]
+
+    def test_exclude_skips_lanes(self, repository):
+        """Test that excluded lanes are never suggested."""
+        # Act
+        ranked = SuggestionEngine().suggest(repository.occupancy(), 1, 4, limit=1, exclude=[(1, 6)])
+
+        # Assert
+        assert ranked == [(1, 1)]
+
+    def test_unknown_policy_name(self):
+        """Test that an unknown policy name is rejected."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            SuggestionEngine.from_names(["nearest", "closest"])
+
+    def test_taken_lane_leaves_roster_untouched(self, repository):
+        """Test that a refused assignment neither moves the user nor bumps the version."""
+        # Arrange
+        service = AssignmentService(repository)
+        repository.assign("alice", 2, 7)
+        version = repository.version
+
+        # Act
+        success, suggestions = service.assign_user("alice", 1, 3)
+
+        # Assert
+        assert not success
+        assert suggestions == [(1, 1), (1, 6), (1, 7)]
+        assert repository.version == version
+        assert repository.find_assignment("alice").team == 2
@@ -0,0 +1,205 @@
+import pytest
+
+from core.models import GridConfig
+from core.repository import InMemoryAssignmentRepository, PersistentAssignmentRepository
+from core.services import AssignmentService
+from core.sqlite_repository import SqliteAssignmentRepository
+from core.waitlist import Waitlist
+
+
+class TestWaitlist:
+    """Tests for the Waitlist class."""
+
+    @pytest.fixture
+    def waitlist(self):
+        """Create a queue of five members."""
+        return Waitlist(["a", "b", "c", "d", "e"])
+
+    def test_pops_in_arrival_order(self, waitlist):
+        """Test that members leave the queue first come, first served."""
+        # Act
+        popped = [waitlist.pop() for _ in range(6)]
+
+        # Assert
+        assert popped == ["a", "b", "c", "d", "e", None]
+
+    def test_positions_skip_departed_members(self, waitlist):
+        """Test that positions close up when members ahead leave."""
+        # Act
+        waitlist.leave("b")
+        waitlist.leave("d")
+
+        # Assert
+        assert [waitlist.position(m) for m in ("a", "c", "e")] == [1, 2, 3]
+        assert waitlist.position("b") is None
+        assert list(waitlist) == ["a", "c", "e"]
+
+    def test_leaving_head_keeps_positions(self, waitlist):
+        """Test that positions stay right when the head leaves or is popped."""
+        # Act
+        waitlist.leave("a")
+        waitlist.pop()
+
+        # Assert
+        assert waitlist.position("c") == 1
+        assert len(waitlist) == 3
+
+    def test_departed_entries_are_compacted(self):
+        """Test that members leaving from the middle do not pile up in the queue."""
+        # Arrange
+        waitlist = Waitlist(f"m{n}" for n in range(1000))
+
+        # Act
+        for n in range(1, 999):
+            waitlist.leave(f"m{n}")
+
+        # Assert
+        assert list(waitlist) == ["m0", "m999"]
+        assert waitlist.position("m999") == 2
+        assert len(waitlist._queue) <= 2 * len(waitlist) + 1
+
+    def test_positions_after_many_departures(self):
+        """Test that positions stay right with thousands of departed tickets ahead, before any compaction."""
+        # Arrange
+        waitlist = Waitlist(f"m{n}" for n in range(10_000))
+        expected = [f"m{n}" for n in range(10_000)]
+
+        # Act
+        for n in range(0, 8000, 2):
+            waitlist.leave(f"m{n}")
+            expected.remove(f"m{n}")
+        waitlist.pop()
+        del expected[0]
+
+        # Assert
+        assert len(waitlist._departed) > 3000
+        assert [waitlist.position(member) for member in expected] == list(range(1, len(expected) + 1))
+
+    def test_rejoin_goes_to_the_back(self, waitlist):
+        """Test that a member who leaves and rejoins loses their place."""
+        # Act
+        waitlist.leave("a")
+        position = waitlist.join("a")
+
+        # Assert
+        assert position == 5
+        assert list(waitlist) == ["b", "c", "d", "e", "a"]
+
+    def test_join_twice_keeps_place(self, waitlist):
+        """Test that joining again does not move a waiting member."""
+        # Act & Assert
+        assert waitlist.join("b") == 2
+        assert len(waitlist) == 5
+
+
+class TestWaitlistPromotion:
+    """Tests for waitlist promotion on every repository backend."""
+
+    @pytest.fixture(params=["memory", "json", "journal", "sqlite"])
+    def repository(self, request, tmp_path):
+        """Create a full 1x2 roster with two members waiting."""
+        grid = GridConfig(1, 2)
+        if request.param == "memory":
+            repo = InMemoryAssignmentRepository(grid)
+        elif request.param == "sqlite":
+            repo = SqliteAssignmentRepository(str(tmp_path / "roster.db"), grid=grid)
+        else:
+            mode = "journal" if request.param == "journal" else "snapshot"
+            repo = PersistentAssignmentRepository(str(tmp_path / "roster.json"), mode=mode, grid=grid)
+        repo.assign("alice", 1, 1)
+        repo.assign("bob", 1, 2)
+        repo.join_waitlist("carol")
+        repo.join_waitlist("dave")
+        yield repo
+        repo.close()
+
+    @pytest.fixture
+    def service(self, repository):
+        """Create a service for testing."""
+        return AssignmentService(repository)
+
+    def test_remove_promotes_head(self, service, repository):
+        """Test that removing a member hands their lane to the head of the queue."""
+        # Act
+        result = service.release_user("bob")
+
+        # Assert
+        assert result.removed
+        assert result.promoted == (("carol", 1, 2),)
+        assert repository.find_assignment("carol").lane == 2
+        assert repository.waiting() == ["dave"]
+        assert repository.waitlist_position("dave") == 1
+
+    def test_plain_remove_does_not_promote(self, repository):
+        """Test that repository removals outside the service leave the queue alone."""
+        # Act
+        repository.remove("bob")
+
+        # Assert
+        assert repository.find_assignment("carol") is None
+        assert repository.waiting() == ["carol", "dave"]
+
+    def test_reset_promotes_queue(self, service, repository):
+        """Test that a reset refills the emptied grid from the queue."""
+        # Act
+        promoted = service.reset()
+
+        # Assert
+        assert [member for member, _, _ in promoted] == ["carol", "dave"]
+        assert repository.waiting() == []
+        assert repository.find_assignment("alice") is None
+
+    def test_claim_leaves_queue(self, repository):
+        """Test that a waiting member who gets a lane leaves the queue."""
+        # Arrange
+        repository.remove("alice")
+
+        # Act
+        repository.assign("dave", 1, 1)
+
+        # Assert
+        assert repository.waiting() == ["carol"]
+
+    def test_assigned_member_cannot_wait(self, service):
+        """Test that a member holding a lane is not queued."""
+        # Act & Assert
+        assert service.join_waitlist("alice") is None
+        assert service.leave_waitlist("alice") is False
+
+
+class TestWaitlistPersistence:
+    """Tests for the waitlist surviving restarts of a JSON roster."""
+
+    @pytest.mark.parametrize("mode", ["snapshot", "journal", "deferred"])
+    def test_queue_and_promotion_survive_restart(self, tmp_path, mode):
+        """Test that the queue order and promotions are reloaded."""
+        # Arrange
+        path = str(tmp_path / "roster.json")
+        grid = GridConfig(1, 1)
+        repo = PersistentAssignmentRepository(path, mode=mode, grid=grid)
+        repo.assign("alice", 1, 1)
+        for member in ("bob", "carol", "dave"):
+            repo.join_waitlist(member)
+        repo.leave_waitlist("carol")
+        repo.release("alice", promote=True)
+        repo.close()
+
+        # Act
+        reloaded = PersistentAssignmentRepository(path, mode=mode, grid=grid)
+
+        # Assert
+        assert reloaded.find_assignment("bob").lane == 1
+        assert reloaded.waiting() == ["dave"]
+        reloaded.close()
+
+    def test_empty_queue_keeps_legacy_format(self, tmp_path):
+        """Test that a roster without waiting members is still saved as a bare list."""
+        # Arrange
+        path = tmp_path / "roster.json"
+        repo = PersistentAssignmentRepository(str(path))
+
+        # Act
+        repo.assign("alice", 1, 1)
+
+        # Assert
+        assert path.read_text().startswith("[")